@@ -1,4 +1,5 @@
 -- Simple create for employees (for other DBs)
+-- Generated from src/etl/schema.py; edit COLUMNS and INDEXES there, not here.
 CREATE TABLE employees (
 employee_id TEXT PRIMARY KEY,
 first_name TEXT,
@@ -11,4 +12,7 @@ salary REAL,
 bonus_percent REAL,
 performance_score REAL,
 source_file TEXT
-);
\ No newline at end of file
+);
+CREATE INDEX IF NOT EXISTS idx_auto_department_salary ON employees (department, salary);
+CREATE INDEX IF NOT EXISTS idx_auto_gender ON employees (gender);
+CREATE INDEX IF NOT EXISTS idx_auto_performance_salary ON employees (performance_score DESC, salary DESC);
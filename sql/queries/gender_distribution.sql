@@ -1,3 +1,4 @@
 SELECT gender, COUNT(*) as total
 FROM employees
-GROUP BY gender;
\ No newline at end of file
+GROUP BY gender
+ORDER BY gender;
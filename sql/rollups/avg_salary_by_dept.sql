@@ -0,0 +1,3 @@
+SELECT department, ROUND(avg_salary,2) as avg_salary, headcount
+FROM dept_salary_stats
+ORDER BY avg_salary DESC;
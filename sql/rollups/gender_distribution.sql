@@ -0,0 +1,3 @@
+SELECT gender, total
+FROM gender_counts
+ORDER BY gender;
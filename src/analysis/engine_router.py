@@ -0,0 +1,322 @@
+"""
+Run the shared employee aggregations on SQLite or pandas, whichever is cheaper.
+
+Each aggregation in AGGREGATIONS has a SQL form (read from sql/queries where
+the query already exists there) and an equivalent pandas form over the
+unified dataset (column_store.load_unified, only the columns it needs).
+aggregate(name) picks the engine from costs measured by calibrate() and
+stored in data/cache/engine_calibration.json. A calibration is tied to the
+database's data version and schema version and to the processed CSV it was
+compared with; after a reload, an index change or a new CSV it is stale and
+aggregate() uses DEFAULT_ENGINE (pandas) until --calibrate measures again.
+Routing itself never runs the benchmark.
+
+Calibrating runs both engines and checks that they return the same result.
+When they disagree (typically a database loaded from an older CSV), auto
+mode uses pandas, which reads the processed CSV the scripts always used, and
+warns that the database needs reloading.
+
+Run directly with --calibrate to measure every aggregation, or with an
+aggregation name to print its result.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DB_PATH = BASE_DIR / "data" / "employee_data.db"
+PROCESSED = BASE_DIR / "data" / "processed" / "employees_unified.csv"
+QUERIES_DIR = BASE_DIR / "sql" / "queries"
+CALIBRATION_PATH = BASE_DIR / "data" / "cache" / "engine_calibration.json"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.analysis.query_cache import data_version  # noqa: E402
+from src.etl.aggregates import has_views, query_text  # noqa: E402
+from src.etl.column_store import load_unified  # noqa: E402
+from src.etl.schema import widen_floats  # noqa: E402
+
+ENGINES = ("sqlite", "pandas")
+# Engine used while the calibration is missing or stale: pandas reads the
+# processed CSV the scripts always used, so its results are right for any database state
+DEFAULT_ENGINE = "pandas"
+DEFAULT_REPEAT = 3
+
+
+def _round_half_away(s: pd.Series, digits: int) -> pd.Series:
+    """Round like SQLite's ROUND() (half away from zero), not NumPy's half-to-even."""
+    factor = 10.0 ** digits
+    return np.sign(s) * np.floor(s.abs() * factor + 0.5) / factor
+
+
+def _avg_salary_by_dept(df: pd.DataFrame) -> pd.DataFrame:
+    g = df.groupby("department", dropna=False, observed=True)
+    out = pd.DataFrame({"avg_salary": _round_half_away(g["salary"].mean(), 2), "headcount": g.size()})
+    return out.reset_index().sort_values("avg_salary", ascending=False, kind="stable")
+
+
+def _headcount_by_dept(df: pd.DataFrame) -> pd.DataFrame:
+    counts = df["department"].value_counts(dropna=False)
+    return counts.rename_axis("department").rename("headcount").reset_index()
+
+
+def _gender_distribution(df: pd.DataFrame) -> pd.DataFrame:
+    counts = df["gender"].value_counts(dropna=False).sort_index(na_position="first")
+    return counts.rename_axis("gender").rename("total").reset_index()
+
+
+def _top_performers(df: pd.DataFrame) -> pd.DataFrame:
+    scored = df[df["performance_score"].notna()]
+    top = scored.sort_values(["performance_score", "salary"], ascending=False, kind="stable").head(10)
+    return top[["employee_id", "first_name", "department", "performance_score", "salary"]]
+
+
+def _salary_overview(df: pd.DataFrame) -> pd.DataFrame:
+    salary = df["salary"].dropna()
+    return pd.DataFrame({"employees": [len(df)], "avg_salary": [salary.mean()], "median_salary": [salary.median()]})
+
+
+@dataclass
+class Aggregation:
+    """One aggregation in both engines. key orders rows before results are compared."""
+    name: str
+    columns: list
+    pandas: object
+    key: list
+    sql: str = ""
+    sql_file: str = ""
+    # Same query over the rollup views, used instead of sql when the database has them
+    rollup_sql: str = ""
+    # Absolute tolerance for numeric columns (rounded SQL output differs by at most one unit)
+    atol: float = 1e-6
+
+    def query(self, rollups: bool = False) -> str:
+        if self.sql_file:
+            return query_text(QUERIES_DIR / self.sql_file, rollups)
+        return self.rollup_sql if rollups and self.rollup_sql else self.sql
+
+
+AGGREGATIONS = {a.name: a for a in [
+    Aggregation("avg_salary_by_dept", ["department", "salary"], _avg_salary_by_dept, ["department"],
+                sql_file="avg_salary_by_dept.sql", atol=0.011),
+    Aggregation("headcount_by_dept", ["department"], _headcount_by_dept, ["department"],
+                sql="SELECT department, COUNT(*) AS headcount FROM employees GROUP BY department "
+                    "ORDER BY headcount DESC",
+                rollup_sql="SELECT department, headcount FROM dept_salary_stats ORDER BY headcount DESC"),
+    Aggregation("gender_distribution", ["gender"], _gender_distribution, ["gender"],
+                sql_file="gender_distribution.sql"),
+    Aggregation("top_performers", ["employee_id", "first_name", "department", "performance_score", "salary"],
+                _top_performers, ["employee_id"], sql_file="top_performers.sql"),
+    Aggregation("salary_overview", ["salary"], _salary_overview, ["employees"],
+                sql="""SELECT COUNT(*) AS employees, AVG(salary) AS avg_salary,
+                    (SELECT AVG(salary) FROM (
+                        SELECT salary FROM employees WHERE salary IS NOT NULL ORDER BY salary
+                        LIMIT 2 - (SELECT COUNT(salary) FROM employees) % 2
+                        OFFSET (SELECT (COUNT(salary) - 1) / 2 FROM employees))) AS median_salary
+                FROM employees"""),
+]}
+
+
+def run_sqlite(agg: Aggregation, db_path: Path = DB_PATH) -> pd.DataFrame:
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return pd.read_sql_query(agg.query(has_views(conn)), conn)
+    finally:
+        conn.close()
+
+
+def run_pandas(agg: Aggregation, csv_path: Path = PROCESSED) -> pd.DataFrame:
+    """Pandas form on the needed columns of the unified dataset (float64, like SQLite)."""
+    return agg.pandas(widen_floats(load_unified(csv_path, columns=agg.columns))).reset_index(drop=True)
+
+
+def _sort_key(s: pd.Series) -> pd.Series:
+    # Numbers compare as floats and everything else as text, whichever dtype the engine returned
+    if pd.api.types.is_numeric_dtype(s):
+        return s.astype("float64").to_numpy()
+    return s.astype("string").to_numpy()
+
+
+def _normalized(df: pd.DataFrame, key: list) -> pd.DataFrame:
+    """Rows sorted by key (missing values last), missing values as None and categoricals as plain values."""
+    keys = pd.DataFrame({c: _sort_key(df[c]) for c in key})
+    order = keys.sort_values(key, na_position="last", kind="stable").index
+    df = df.iloc[order]
+    return pd.DataFrame({c: df[c].astype(object).where(df[c].notna(), None) for c in df.columns}) \
+             .reset_index(drop=True)
+
+
+def equivalent(agg: Aggregation, a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """Same columns and rows, numbers equal within the aggregation's tolerance."""
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    a, b = _normalized(a, agg.key), _normalized(b, agg.key)
+    for col in a.columns:
+        x, y = a[col], b[col]
+        if x.isna().ne(y.isna()).any():
+            return False
+        x, y = x[x.notna()], y[y.notna()]
+        if all(isinstance(v, (int, float, np.number)) for v in pd.concat([x, y])):
+            if not np.allclose(x.astype(float), y.astype(float), rtol=1e-6, atol=agg.atol):
+                return False
+        elif list(map(str, x)) != list(map(str, y)):
+            return False
+    return True
+
+
+def _fingerprint(db_path: Path, csv_path: Path) -> dict:
+    """What a calibration depends on: database data and schema version, processed CSV version."""
+    schema = version = None
+    try:
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+            version = data_version(db_path, conn)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass  # no database yet: only pandas can run
+    stat = Path(csv_path).stat()
+    return {"data_version": version, "schema_version": schema, "csv": f"{stat.st_mtime_ns}:{stat.st_size}"}
+
+
+def _timed(fn, repeat: int) -> tuple:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+class EngineRouter:
+    """Chooses an engine per aggregation from the calibration file (DEFAULT_ENGINE when it is stale)."""
+
+    def __init__(self, db_path: Path = DB_PATH, csv_path: Path = PROCESSED,
+                 calibration_path: Path = CALIBRATION_PATH, repeat: int = DEFAULT_REPEAT):
+        self.db_path, self.csv_path = Path(db_path), Path(csv_path)
+        self.calibration_path = Path(calibration_path)
+        self.repeat = repeat
+        self._fingerprint = None
+
+    def fingerprint(self) -> dict:
+        if self._fingerprint is None:
+            self._fingerprint = _fingerprint(self.db_path, self.csv_path)
+        return self._fingerprint
+
+    def load_calibration(self) -> dict:
+        try:
+            return json.loads(self.calibration_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, entries: dict):
+        calibration = self.load_calibration()
+        calibration.update(entries)
+        self.calibration_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.calibration_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(calibration, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.calibration_path)
+
+    def calibrate(self, names: list = None) -> dict:
+        """Time both engines on each aggregation, compare their results and record the costs."""
+        entries = {}
+        for name in names or AGGREGATIONS:
+            agg = AGGREGATIONS[name]
+            pandas_s, pandas_df = _timed(lambda: run_pandas(agg, self.csv_path), self.repeat)
+            try:
+                sqlite_s, sqlite_df = _timed(lambda: run_sqlite(agg, self.db_path), self.repeat)
+            except (sqlite3.Error, pd.errors.DatabaseError) as e:
+                sqlite_s, error = None, str(e).splitlines()[-1]
+                print(f"⚠️ {name}: SQLite engine unavailable ({error}); run to_sql.py. Using pandas.")
+            else:
+                error = ""
+            same = sqlite_s is not None and equivalent(agg, sqlite_df, pandas_df)
+            if sqlite_s is not None and not same:
+                print(f"⚠️ {name}: SQLite and pandas results differ; the database may be older than "
+                      f"{self.csv_path.name} (rerun to_sql.py). Using pandas.")
+            entries[name] = {
+                "db": str(self.db_path.resolve()),
+                "sqlite_ms": None if sqlite_s is None else round(sqlite_s * 1000, 3),
+                "pandas_ms": round(pandas_s * 1000, 3),
+                "equivalent": same,
+                "engine": "sqlite" if same and sqlite_s <= pandas_s else "pandas",
+                "error": error,
+                "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                **self.fingerprint(),
+            }
+        self._save(entries)
+        return entries
+
+    def current_entry(self, name: str) -> dict:
+        """Calibration entry for name if it was measured on the current data, else None."""
+        entry = self.load_calibration().get(name)
+        current = {"db": str(self.db_path.resolve()), **self.fingerprint()}
+        if entry is None or any(entry.get(k) != v for k, v in current.items()):
+            return None
+        return entry
+
+    def choose(self, name: str) -> str:
+        """
+        Engine the calibration file picks for name. Routing never measures:
+        without a current calibration (run --calibrate) it is DEFAULT_ENGINE.
+        """
+        entry = self.current_entry(name)
+        return DEFAULT_ENGINE if entry is None else entry["engine"]
+
+    def aggregate(self, name: str, engine: str = "auto") -> pd.DataFrame:
+        if name not in AGGREGATIONS:
+            raise KeyError(f"unknown aggregation {name!r}; choose from {sorted(AGGREGATIONS)}")
+        agg = AGGREGATIONS[name]
+        engine = self.choose(name) if engine == "auto" else engine
+        if engine == "sqlite":
+            return run_sqlite(agg, self.db_path)
+        if engine == "pandas":
+            return run_pandas(agg, self.csv_path)
+        raise ValueError(f"unknown engine {engine!r}; expected auto or one of {ENGINES}")
+
+
+def aggregate(name: str, engine: str = "auto", db_path: Path = DB_PATH, csv_path: Path = PROCESSED) -> pd.DataFrame:
+    """Result of one aggregation from the engine the calibration picks (or the one given)."""
+    return EngineRouter(db_path, csv_path).aggregate(name, engine)
+
+
+def calibration_table(entries: dict) -> str:
+    lines = [f"{'aggregation':<24}{'sqlite ms':>11}{'pandas ms':>11}  {'same':<6}engine"]
+    for name, e in entries.items():
+        sqlite_ms = "-" if e["sqlite_ms"] is None else f"{e['sqlite_ms']:.2f}"
+        lines.append(f"{name:<24}{sqlite_ms:>11}{e['pandas_ms']:>11.2f}  "
+                     f"{'yes' if e['equivalent'] else 'NO':<6}{e['engine']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run shared aggregations on the cheaper of SQLite and pandas.")
+    parser.add_argument("name", nargs="?", choices=sorted(AGGREGATIONS), help="aggregation to run and print")
+    parser.add_argument("--engine", choices=("auto",) + ENGINES, default="auto", help="engine to use")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="measure both engines on every aggregation and check their results agree")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per engine (median)")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--csv", type=Path, default=PROCESSED, help="processed CSV (pandas engine)")
+    args = parser.parse_args()
+
+    router = EngineRouter(args.db, args.csv, repeat=args.repeat)
+    if args.calibrate:
+        print(calibration_table(router.calibrate()))
+        print("📄 Calibration saved to:", router.calibration_path)
+    if args.name:
+        engine = router.choose(args.name) if args.engine == "auto" else args.engine
+        stale = args.engine == "auto" and router.current_entry(args.name) is None
+        print(f"▶️ {args.name} ({engine}{'; no current calibration, run --calibrate' if stale else ''})")
+        print(router.aggregate(args.name, engine).to_string(index=False))
+    if not (args.calibrate or args.name):
+        parser.print_help()
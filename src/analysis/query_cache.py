@@ -0,0 +1,143 @@
+"""
+On-disk result cache for SQL queries against employee_data.db.
+
+Entries are keyed on a hash of the normalized query text (comments and
+whitespace removed), the database path and its data version:
+
+- the load_generation counter that to_sql.py bumps in the same transaction
+  as every data change, and the load_id UUID it writes with it (so a
+  rebuilt database that restarts at generation 1 gets a new version), when
+  the database has them,
+- else the mtime and size of the database file and its WAL.
+
+Any reload therefore changes the key, and stale entries are never read
+again; they age out through the LRU. Results are stored as zlib-compressed
+pickles, one file per entry. A hit refreshes the file's mtime, and once the
+cache grows past its byte budget the least recently used files are removed.
+"""
+from __future__ import annotations
+from pathlib import Path
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import sys
+import zlib
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DB_PATH = BASE_DIR / "data" / "employee_data.db"
+CACHE_DIR = BASE_DIR / "data" / "cache" / "queries"
+DEFAULT_MAX_MB = 64
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.schema import META_TABLE  # noqa: E402
+from src.lazy_imports import lazy_import  # noqa: E402
+
+# Hits unpickle frames (importing pandas then); only misses need pd itself
+pd = lazy_import("pandas")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+
+
+def normalize_sql(sql: str) -> str:
+    """Query text without comments, surplus whitespace or trailing semicolons."""
+    return " ".join(_COMMENTS.sub(" ", sql).split()).rstrip("; ")
+
+
+def data_version(db_path: Path = DB_PATH, conn: sqlite3.Connection = None) -> str:
+    """Version string of the database contents (see module docstring)."""
+    db_path = Path(db_path)
+    try:
+        own = conn is None
+        conn = conn or sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            meta = dict(conn.execute(f"SELECT key, value FROM {META_TABLE} "
+                                     f"WHERE key IN ('load_generation', 'load_id')").fetchall())
+        finally:
+            if own:
+                conn.close()
+        if "load_generation" in meta:
+            return f"gen:{meta['load_generation']}:{meta.get('load_id', '')}"
+    except sqlite3.Error:
+        pass
+    parts = []
+    for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+        if path.exists():
+            stat = path.stat()
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return "stat:" + "/".join(parts)
+
+
+class QueryCache:
+    """Size-bounded LRU cache of query results (DataFrames) on local disk."""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_MB * 1024 ** 2):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+
+    def key(self, sql: str, db_path: Path, version: str) -> str:
+        text = "\0".join([normalize_sql(sql), str(Path(db_path).resolve()), version])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl.z"
+
+    def get(self, key: str):
+        """Cached DataFrame for key, or None."""
+        path = self._path(key)
+        try:
+            df = pickle.loads(zlib.decompress(path.read_bytes()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as most recently used
+        self.hits += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        if len(data) > self.max_bytes:
+            return
+        tmp = self._path(key).with_suffix(f".tmp{os.getpid()}")
+        tmp.write_bytes(data)
+        tmp.replace(self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its budget."""
+        entries = []
+        for path in self.cache_dir.glob("*.pkl.z"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for path in self.cache_dir.glob("*.pkl.z"):
+            path.unlink(missing_ok=True)
+
+
+def read_sql_cached(sql: str, db_path: Path = DB_PATH, cache: QueryCache = None) -> pd.DataFrame:
+    """pd.read_sql_query through the result cache, for notebooks and dashboards."""
+    cache = cache or QueryCache()
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        key = cache.key(sql, db_path, data_version(db_path, conn))
+        df = cache.get(key)
+        if df is None:
+            df = pd.read_sql_query(sql, conn)
+            cache.put(key, df)
+    finally:
+        conn.close()
+    return df
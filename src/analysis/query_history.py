@@ -0,0 +1,150 @@
+"""
+Execution history for the sql/queries workload.
+
+run_sql_queries.py appends one JSON line per query run to
+outputs/reports/query_history.jsonl: time, query file, status, wall time,
+rows returned, a digest of its EXPLAIN QUERY PLAN and the database's data
+version (query_cache.data_version). Cache hits are recorded too but never
+count towards a baseline.
+
+Run directly for a latency report: each query's latest execution is compared
+with the median of its previous --window executions and flagged when it is
+more than --threshold times slower (and slower by at least --min-ms, so
+sub-millisecond noise is ignored). The report notes whether the plan or the
+data version changed since the baseline runs. --check exits non-zero when
+anything regressed.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import sqlite3
+import statistics
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+HISTORY_PATH = BASE_DIR / "outputs" / "reports" / "query_history.jsonl"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.index_advisor import explain  # noqa: E402
+
+DEFAULT_WINDOW = 10
+DEFAULT_THRESHOLD = 1.5
+DEFAULT_MIN_MS = 5.0
+
+
+def plan_digest(conn: sqlite3.Connection, sql: str) -> str:
+    """Short hash of the query's EXPLAIN QUERY PLAN, or '' if it cannot be explained."""
+    try:
+        lines = explain(conn, sql)
+    except sqlite3.Error:
+        return ""
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()[:12]
+
+
+def append(results: list, db_path: Path, history_path: Path = HISTORY_PATH):
+    """Append one record per QueryResult from run_sql_queries.py."""
+    history_path = Path(history_path)
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with open(history_path, "a", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({
+                "time": now,
+                "query": r.name,
+                "status": r.status,
+                "ms": round(r.seconds * 1000, 3),
+                "rows": r.rows,
+                "plan": r.plan_digest,
+                "data_version": r.data_version,
+                "db": str(Path(db_path).resolve()),
+            }) + "\n")
+
+
+def load(history_path: Path = HISTORY_PATH) -> list:
+    """All history records, oldest first; unreadable lines are skipped."""
+    records = []
+    try:
+        with open(history_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def regressions(records: list, window: int = DEFAULT_WINDOW, threshold: float = DEFAULT_THRESHOLD,
+                min_ms: float = DEFAULT_MIN_MS) -> list:
+    """
+    One row per (database, query) with at least one earlier executed run:
+    dict of query, latest ms, baseline ms, ratio, regressed flag and what
+    changed since the baseline runs.
+    """
+    runs = {}
+    for rec in records:
+        if rec.get("status") == "ok":
+            runs.setdefault((rec.get("db"), rec["query"]), []).append(rec)
+
+    rows = []
+    for (db, query), recs in sorted(runs.items(), key=lambda item: item[0][1]):
+        latest, previous = recs[-1], recs[-1 - window:-1]
+        if not previous:
+            continue
+        baseline = statistics.median(r["ms"] for r in previous)
+        ratio = latest["ms"] / baseline if baseline > 0 else float("inf")
+        changed = []
+        if latest["plan"] not in {r["plan"] for r in previous}:
+            changed.append("plan")
+        if latest["data_version"] != previous[-1]["data_version"]:
+            changed.append("data")
+        if latest["rows"] != previous[-1]["rows"]:
+            changed.append(f"rows {previous[-1]['rows']:,}->{latest['rows']:,}")
+        rows.append({
+            "query": query,
+            "db": db,
+            "runs": len(previous),
+            "latest_ms": latest["ms"],
+            "baseline_ms": baseline,
+            "ratio": ratio,
+            "regressed": ratio > threshold and latest["ms"] - baseline >= min_ms,
+            "changed": changed,
+        })
+    return rows
+
+
+def format_report(rows: list) -> str:
+    lines = [f"{'query':<36}{'runs':>5}{'baseline ms':>13}{'latest ms':>11}{'ratio':>8}  note"]
+    for r in rows:
+        note = ("REGRESSED " if r["regressed"] else "") + ", ".join(r["changed"])
+        lines.append(f"{r['query']:<36}{r['runs']:>5}{r['baseline_ms']:>13.1f}{r['latest_ms']:>11.1f}"
+                     f"{r['ratio']:>7.2f}x  {note}".rstrip())
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report latency regressions from the SQL query history.")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH, help="query history JSONL file")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="previous executions forming each query's baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="flag queries slower than this multiple of their baseline")
+    parser.add_argument("--min-ms", type=float, default=DEFAULT_MIN_MS,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any query regressed")
+    args = parser.parse_args()
+
+    rows = regressions(load(args.history), args.window, args.threshold, args.min_ms)
+    if not rows:
+        print(f"ℹ️ Not enough executions in {args.history} for a baseline yet")
+        sys.exit(0)
+    print(format_report(rows))
+    regressed = [r for r in rows if r["regressed"]]
+    print(f"\n{'⚠️' if regressed else '✅'} {len(regressed)} of {len(rows)} queries regressed "
+          f"(> {args.threshold:g}x the median of the previous {args.window} runs)")
+    if args.check and regressed:
+        sys.exit(1)
@@ -1,53 +1,268 @@
 """
 Run all SQL files (schema + analytical queries) on employee_data.db
+
+Every .sql file in sql/queries is discovered and run concurrently (its
+sql/rollups variant when the database has the rollup views) on a pool
+of read-only connections (mode=ro URIs; with the WAL journal the loader sets,
+readers never block each other or a running load). Each query gets a
+timeout, its result is written to outputs/query_results/<name>.csv, and a
+summary table reports latency and row count per query. Results are served
+from the query cache (src/analysis/query_cache.py) while the database is
+unchanged.
+
+With --stream, rows are written as they are fetched (src/analysis/sql_export.py)
+instead of being collected into a DataFrame first, as CSV, gzipped CSV or
+Parquet; use this for row-level extracts such as SELECT * FROM employees.
+Streamed results bypass the cache.
+
+Every run is appended to the query history (src/analysis/query_history.py)
+with its latency, row count, plan digest and data version; run that module
+to see which queries regressed.
 """
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+import argparse
+import os
+import queue
 import sqlite3
-import pandas as pd
+import sys
+import time
 
 # --- Define paths ---
 BASE_DIR = Path(__file__).resolve().parents[2]  # Go 2 levels up from src/analysis
 SQL_DIR = BASE_DIR / "sql"
 QUERIES_DIR = SQL_DIR / "queries"
 DB_PATH = BASE_DIR / "data" / "employee_data.db"
+RESULTS_DIR = BASE_DIR / "outputs" / "query_results"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.analysis.query_history import append as append_history, plan_digest  # noqa: E402
+from src.analysis.query_cache import DEFAULT_MAX_MB, QueryCache, data_version  # noqa: E402
+from src.analysis.sql_export import (DEFAULT_FETCH_ROWS, FORMATS, ExportOptions, column_types,  # noqa: E402
+                                     export_cursor)
+from src.etl.aggregates import has_views, query_text  # noqa: E402
+from src.lazy_imports import lazy_import, load  # noqa: E402
+
+# Only needed once a result is collected into a frame; --help and --stream runs skip it
+pd = lazy_import("pandas")
 
-# --- Connect to database ---
-conn = sqlite3.connect(DB_PATH)
-print(f"✅ Connected to database: {DB_PATH}")
+DEFAULT_TIMEOUT = 30.0
+# SQLite VM instructions between timeout checks
+PROGRESS_STEPS = 10_000
 
-# --- Step 1: Run schema file (optional if already created) ---
-schema_path = SQL_DIR / "create_schema.sql"
-if schema_path.exists():
+
+@dataclass
+class QueryResult:
+    name: str
+    status: str
+    rows: int = 0
+    seconds: float = 0.0
+    output: Path = None
+    error: str = ""
+    plan_digest: str = ""
+    data_version: str = ""
+
+
+# --- Step 1: Check the schema (the loader creates it; the runner never writes) ---
+def check_schema(db_path: Path = DB_PATH) -> bool:
+    """
+    True when the database has the employees table (or star-schema view).
+    Without the rollup views from the loader the plain sql/queries files run.
+    """
+    try:
+        conn = connect_ro(db_path)
+    except sqlite3.OperationalError:
+        return False
     try:
-        with open(schema_path, "r") as file:
-            schema_sql = file.read()
-        conn.executescript(schema_sql)
-        print("📄 Executed create_schema.sql")
-    except sqlite3.OperationalError as e:
-        if "already exists" in str(e):
-            print("⚠️ Table already exists, skipping schema creation.")
-        else:
-            raise
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = 'employees'"
+        ).fetchone()
+        if exists and not has_views(conn):
+            print("⚠️ No rollup views; running the base-table queries. Reload with src/etl/to_sql.py to add them.")
+    finally:
+        conn.close()
+    return exists is not None
+
+
+def discover_queries(queries_dir: Path = QUERIES_DIR) -> list:
+    """Every .sql file in queries_dir, in name order."""
+    return sorted(Path(queries_dir).glob("*.sql"))
+
+
+def connect_ro(db_path: Path = DB_PATH) -> sqlite3.Connection:
+    """Read-only connection that may be handed between pool threads."""
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+
+class ConnectionPool:
+    """Fixed set of read-only connections shared by the worker threads."""
+
+    def __init__(self, db_path: Path = DB_PATH, size: int = 4):
+        self.db_path = Path(db_path)
+        self._idle = queue.Queue()
+        for _ in range(size):
+            conn = connect_ro(db_path)
+            # Parses the schema now, so no query's timing includes it
+            self.rollups = has_views(conn)
+            self._idle.put(conn)
+        self.size = size
+
+    def acquire(self) -> sqlite3.Connection:
+        return self._idle.get()
+
+    def release(self, conn: sqlite3.Connection):
+        conn.set_progress_handler(None, 0)
+        self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get().close()
 
 
 # --- Step 2: Function to run query files ---
-def run_sql(filename):
-    sql_path = QUERIES_DIR / filename
-    if not sql_path.exists():
-        print(f"⚠️ File not found: {sql_path}")
-        return
-    with open(sql_path, "r") as file:
-        query = file.read()
-    print(f"\n▶️ Running: {filename}")
-    df = pd.read_sql_query(query, conn)
-    print(df.head())
-    return df
+def write_result(df: pd.DataFrame, path: Path, out_dir: Path) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    output = out_dir / f"{path.stem}.csv"
+    df.to_csv(output, index=False)
+    return output
+
+
+def run_sql(path: Path, pool: ConnectionPool, out_dir: Path = RESULTS_DIR,
+            timeout: float = DEFAULT_TIMEOUT, cache: QueryCache = None, version: str = None,
+            export: ExportOptions = None) -> QueryResult:
+    """
+    Run one query file on a pooled connection (or take it from the cache) and
+    write its result to out_dir/<name>.csv. With export options the rows are
+    streamed to out_dir/<name><suffix> instead and the cache is not used.
+    """
+    path = Path(path)
+    query = query_text(path, pool.rollups)
+    if export is None:
+        # Load pandas (lazy, ~0.5s on first use) before the clock starts so
+        # the import is not charged to whichever query happens to run first
+        load(pd)
+    start = time.perf_counter()
+    if cache is not None and export is None:
+        key = cache.key(query, pool.db_path, version)
+        df = cache.get(key)
+        if df is not None:
+            elapsed = time.perf_counter() - start
+            return QueryResult(path.name, "cached", rows=len(df), seconds=elapsed,
+                               output=write_result(df, path, out_dir), data_version=version)
+
+    conn = pool.acquire()
+    plan = plan_digest(conn, query)
+    declared = column_types(conn, query) if export is not None and export.fmt == "parquet" else []
+    start = time.perf_counter()
+    deadline = start + timeout
+    # A non-zero return from the progress handler interrupts the statement
+    conn.set_progress_handler(lambda: time.perf_counter() > deadline, PROGRESS_STEPS)
+    try:
+        cursor = conn.execute(query)
+        if export is not None:
+            output = out_dir / f"{path.stem}{export.suffix()}"
+            rows = export_cursor(cursor, output, export, declared)
+            return QueryResult(path.name, "ok", rows=rows, seconds=time.perf_counter() - start, output=output,
+                               plan_digest=plan, data_version=version)
+        columns = [d[0] for d in cursor.description or ()]
+        df = pd.DataFrame(cursor.fetchall(), columns=columns)
+    except sqlite3.Error as e:
+        # Any SQLite failure (bad SQL, several statements in one file, ...)
+        # is this query's result; the other queries still run
+        elapsed = time.perf_counter() - start
+        if isinstance(e, sqlite3.OperationalError) and "interrupted" in str(e):
+            return QueryResult(path.name, "timeout", seconds=elapsed, error=f"exceeded {timeout:g}s",
+                               plan_digest=plan, data_version=version)
+        return QueryResult(path.name, "error", seconds=elapsed, error=str(e), plan_digest=plan,
+                           data_version=version)
+    except RuntimeError as e:
+        return QueryResult(path.name, "error", seconds=time.perf_counter() - start, error=str(e),
+                           plan_digest=plan, data_version=version)
+    finally:
+        pool.release(conn)
+    elapsed = time.perf_counter() - start
+
+    if cache is not None:
+        cache.put(key, df)
+    return QueryResult(path.name, "ok", rows=len(df), seconds=elapsed, output=write_result(df, path, out_dir),
+                       plan_digest=plan, data_version=version)
+
+
+def run_all(paths: list, db_path: Path = DB_PATH, workers: int = None, out_dir: Path = RESULTS_DIR,
+            timeout: float = DEFAULT_TIMEOUT, cache: QueryCache = None, export: ExportOptions = None) -> list:
+    """Run query files concurrently; results come back in the order of paths."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    pool = ConnectionPool(db_path, size=workers)
+    version = data_version(db_path)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda p: run_sql(p, pool, out_dir, timeout, cache, version, export), paths))
+    finally:
+        pool.close()
+
+
+def summary_table(results: list) -> str:
+    lines = [f"{'query':<36}{'status':<9}{'rows':>10}{'ms':>11}  output"]
+    for r in results:
+        detail = r.output or r.error
+        lines.append(f"{r.name:<36}{r.status:<9}{r.rows:>10,}{r.seconds * 1000:>11.1f}  {detail}")
+    return "\n".join(lines)
+
 
 # --- Step 3: Execute all .sql query files ---
-queries = ["avg_salary_by_dept.sql", "gender_distribution.sql", "top_performers.sql"]
-for q in queries:
-    run_sql(q)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every query in sql/queries against employee_data.db.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database file")
+    parser.add_argument("queries", nargs="*", type=Path,
+                        help="query files to run (default: every .sql file in --queries-dir)")
+    parser.add_argument("--queries-dir", type=Path, default=QUERIES_DIR, help="directory of .sql files")
+    parser.add_argument("--out-dir", type=Path, default=RESULTS_DIR, help="where result CSVs are written")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="concurrent queries / pooled connections (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per-query timeout in seconds")
+    parser.add_argument("--show", action="store_true", help="also print the first rows of every result")
+    parser.add_argument("--no-cache", action="store_true", help="always execute; bypass the result cache")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_MAX_MB, help="result cache size budget in MB")
+    parser.add_argument("--clear-cache", action="store_true", help="empty the result cache first")
+    parser.add_argument("--stream", action="store_true",
+                        help="write rows as they are fetched instead of building a DataFrame (no cache)")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="--stream output format")
+    parser.add_argument("--gzip", action="store_true", help="--stream: gzip CSV output / gzip Parquet pages")
+    parser.add_argument("--fetch-rows", type=int, default=DEFAULT_FETCH_ROWS, help="--stream: rows per fetchmany")
+    parser.add_argument("--no-history", action="store_true", help="do not append this run to the query history")
+    args = parser.parse_args()
+
+    export = ExportOptions(args.format, args.gzip, args.fetch_rows) if args.stream else None
+    cache = None if args.no_cache or export else QueryCache(max_bytes=int(args.cache_mb * 1024 ** 2))
+    if args.clear_cache:
+        QueryCache().clear()
+
+    if not check_schema(args.db):
+        print(f"❌ No employees table in {args.db}; load it with src/etl/to_sql.py first.")
+        sys.exit(1)
+    print(f"✅ Connected to database: {args.db}")
+    paths = args.queries or discover_queries(args.queries_dir)
+    print(f"▶️ Running {len(paths)} queries" + ("" if args.queries else f" from {args.queries_dir}"))
+
+    start = time.perf_counter()
+    results = run_all(paths, args.db, workers=args.workers, out_dir=args.out_dir, timeout=args.timeout,
+                      cache=cache, export=export)
+    wall = time.perf_counter() - start
+    if not args.no_history:
+        append_history(results, args.db)
 
-# --- Step 4: Close connection ---
-conn.close()
-print("\n✅ All queries executed successfully!")
+    if args.show:
+        for r in results:
+            if r.output and r.output.suffix != ".parquet":
+                print(f"\n▶️ {r.name}")
+                print(pd.read_csv(r.output, nrows=5))
+    print()
+    print(summary_table(results))
+    failed = [r for r in results if r.status not in ("ok", "cached")]
+    print(f"\n{'⚠️' if failed else '✅'} {len(results) - len(failed)}/{len(results)} queries succeeded "
+          f"in {wall:.2f}s wall time" + (f" ({cache.hits} from cache)" if cache else ""))
+    if failed:
+        sys.exit(1)
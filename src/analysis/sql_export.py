@@ -0,0 +1,183 @@
+"""
+Streaming export of SQL query results.
+
+export_cursor() pulls rows from a cursor with fetchmany() and appends each
+batch to the output file before fetching the next, so memory use is bounded
+by the batch size however many rows the query returns. Output is CSV
+(optionally gzip-compressed) or Parquet, written one row group per batch
+(needs pyarrow). Parquet column types come from the columns' declared
+SQLite types, so a column that is NULL in the first batch keeps its type.
+run_sql_queries.py --stream uses this for every query file.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+import csv
+import gzip
+import sqlite3
+import uuid
+
+FORMATS = ("csv", "parquet")
+DEFAULT_FETCH_ROWS = 50_000
+
+
+@dataclass
+class ExportOptions:
+    fmt: str = "csv"
+    compress: bool = False
+    fetch_rows: int = DEFAULT_FETCH_ROWS
+
+    def suffix(self) -> str:
+        if self.fmt == "parquet":
+            return ".parquet"
+        return ".csv.gz" if self.compress else ".csv"
+
+
+def _batches(cursor: sqlite3.Cursor, fetch_rows: int):
+    while True:
+        rows = cursor.fetchmany(fetch_rows)
+        if not rows:
+            return
+        yield rows
+
+
+def _write_csv(cursor: sqlite3.Cursor, columns: list, output: Path, options: ExportOptions,
+               declared: list = ()) -> int:
+    opener = gzip.open if options.compress else open
+    rows = 0
+    # compresslevel only applies to gzip; level 6 keeps exports fast
+    kwargs = {"compresslevel": 6} if options.compress else {}
+    with opener(output, "wt", newline="", encoding="utf-8", **kwargs) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for batch in _batches(cursor, options.fetch_rows):
+            writer.writerows(batch)
+            rows += len(batch)
+    return rows
+
+
+def column_types(conn: sqlite3.Connection, sql: str) -> list:
+    """
+    Declared type of each result column of sql ('' for expressions), read with
+    PRAGMA table_info on a temporary view (works on read-only connections).
+    Empty when sql cannot be wrapped in a view (e.g. several statements).
+    """
+    view = f"_export_{uuid.uuid4().hex}"
+    try:
+        conn.execute(f"CREATE TEMP VIEW {view} AS {sql.strip().rstrip(';')}")
+    except sqlite3.Error:
+        return []
+    try:
+        return [row[2] for row in conn.execute(f"PRAGMA temp.table_info({view})")]
+    finally:
+        conn.execute(f"DROP VIEW temp.{view}")
+
+
+def _declared_arrow_type(declared: str):
+    """Arrow type for a declared SQLite column type, by SQLite's affinity rules (None: no affinity)."""
+    import pyarrow as pa
+
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("CHAR", "CLOB", "TEXT")):
+        return pa.string()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return None
+
+
+def _arrow_type(values: list, declared: str = ""):
+    import pyarrow as pa
+
+    arrow_type = _declared_arrow_type(declared)
+    if arrow_type is not None:
+        return arrow_type
+    try:
+        inferred = pa.array(values).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed value types (e.g. numbers and text from a UNION)
+        return pa.string()
+    # Expressions that are NULL throughout the first batch are written as text
+    return pa.string() if pa.types.is_null(inferred) else inferred
+
+
+def _arrow_array(values: tuple, field):
+    """values as an array of the field's type, converting SQLite's per-value types where they differ."""
+    import pyarrow as pa
+
+    try:
+        return pa.array(values, type=field.type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+    if pa.types.is_string(field.type):
+        return pa.array([None if v is None else str(v) for v in values], type=field.type)
+    try:
+        # Numbers stored as text or as the other numeric class, e.g. 3.0 in an INTEGER column
+        return pa.array([None if v is None else float(v) for v in values], type=pa.float64()).cast(field.type)
+    except (ValueError, pa.ArrowInvalid) as e:
+        raise RuntimeError(f"column {field.name!r} holds values that are not {field.type} ({e}); "
+                           f"CAST it in the query") from None
+
+
+def _write_parquet(cursor: sqlite3.Cursor, columns: list, output: Path, options: ExportOptions,
+                   declared: list = ()) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from None
+
+    declared = list(declared) if len(declared) == len(columns) else [""] * len(columns)
+    writer = None
+    rows = 0
+    try:
+        for batch in _batches(cursor, options.fetch_rows):
+            values = list(zip(*batch))
+            if writer is None:
+                # Declared column types fix the schema; only expressions are inferred from the first batch
+                schema = pa.schema([(name, _arrow_type(list(col), decl))
+                                    for name, col, decl in zip(columns, values, declared)])
+                writer = pq.ParquetWriter(output, schema, compression="gzip" if options.compress else "snappy")
+            arrays = [_arrow_array(col, field) for col, field in zip(values, writer.schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+            rows += len(batch)
+        if writer is None:
+            # Empty result: still write a file with the column names (and declared types)
+            schema = pa.schema([(name, _declared_arrow_type(decl) or pa.string())
+                                for name, decl in zip(columns, declared)])
+            writer = pq.ParquetWriter(output, schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_cursor(cursor: sqlite3.Cursor, output: Path, options: ExportOptions = None, declared: list = ()) -> int:
+    """
+    Stream an executed cursor's remaining rows to output; returns the row
+    count. declared (see column_types) gives the Parquet column types; without
+    it they are inferred from the first batch. The file is written under a
+    temporary name and renamed at the end, so a failed or interrupted query
+    never leaves a partial result behind.
+    """
+    options = options or ExportOptions()
+    if options.fmt not in FORMATS:
+        raise ValueError(f"unknown export format {options.fmt!r}; expected one of {FORMATS}")
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    columns = [d[0] for d in cursor.description or ()]
+    tmp = output.with_name(output.name + ".part")
+    write = _write_parquet if options.fmt == "parquet" else _write_csv
+    try:
+        rows = write(cursor, columns, tmp, options, declared)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    tmp.replace(output)
+    return rows
+
+
+def export_query(conn: sqlite3.Connection, sql: str, output: Path, options: ExportOptions = None) -> int:
+    """Run sql on conn and stream its result to output; returns the row count."""
+    declared = column_types(conn, sql) if (options or ExportOptions()).fmt == "parquet" else []
+    return export_cursor(conn.execute(sql), output, options, declared)
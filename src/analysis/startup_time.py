@@ -0,0 +1,117 @@
+"""
+Import-time budget for the project's entry points.
+
+Each entry point is started --runs times in a fresh interpreter under
+python -X importtime with --help on its command line, executed with
+__name__ set to startup_probe (so `if __name__ == "__main__"` blocks do not
+run and argparse exits before any work); the probe imports nothing itself. The time is the sum of the top-level imports the
+script triggers; interpreter start-up itself is excluded. The median over
+the runs is compared with the entry point's budget and the slowest
+top-level imports are listed, so a new eager `import seaborn` shows up by
+name. --check exits non-zero when any entry point is over budget.
+
+Heavy libraries (matplotlib, seaborn, scipy and, on the SQL path, pandas)
+are bound with src/lazy_imports.py:lazy_import and load on first use.
+"""
+from pathlib import Path
+import argparse
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+
+# entry point -> import-time budget (ms). The SQL runner needs no pandas at
+# start-up; the others load pandas (~0.5s) but no plotting or scipy stack
+ENTRY_POINTS = {
+    "src/analysis/run_sql_queries.py": 300,
+    "src/analysis/summary_insights.py": 1000,
+    "src/viz/charts.py": 1000,
+    "visualizations/basic_visualizations.py": 1000,
+    "visualizations/basic_visualizations_1.py": 1000,
+    "visualizations/basic_visualizations_2.py": 1000,
+}
+DEFAULT_RUNS = 3
+DEFAULT_TOP = 5
+
+_MARKER = "--- startup probe ---"
+_PROBE = (
+    "import sys\n"
+    "code = compile(open({path!r}, encoding='utf-8').read(), {path!r}, 'exec')\n"
+    "sys.stderr.write({marker!r} + '\\n'); sys.stderr.flush()\n"
+    "sys.argv = [{path!r}, '--help']\n"
+    "try:\n"
+    "    exec(code, {{'__name__': 'startup_probe', '__file__': {path!r}}})\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, cumulative ms) of every top-level import after the probe marker."""
+    imports = []
+    lines = stderr.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1:]
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # Nested imports are indented by two spaces per level
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        imports.append((name.strip(), int(cumulative) / 1000))
+    return imports
+
+
+def probe(path: Path) -> list:
+    """Top-level imports of one fresh start of the script at path."""
+    path = Path(path)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE.format(marker=_MARKER, path=str(path))],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    return parse_importtime(proc.stderr)
+
+
+def measure(entry: str, budget: float, runs: int = DEFAULT_RUNS, top: int = DEFAULT_TOP) -> dict:
+    """Median import time of entry over runs, whether it is within budget, and the slowest imports."""
+    samples = [probe(BASE_DIR / entry) for _ in range(runs)]
+    totals = [sum(ms for _, ms in imports) for imports in samples]
+    median = statistics.median(totals)
+    # Offenders from the run closest to the median
+    typical = samples[min(range(runs), key=lambda i: abs(totals[i] - median))]
+    return {
+        "entry": entry,
+        "ms": median,
+        "budget_ms": budget,
+        "over": median > budget,
+        "slowest": sorted(typical, key=lambda item: -item[1])[:top],
+    }
+
+
+def format_report(rows: list) -> str:
+    lines = [f"{'entry point':<44}{'import ms':>10}{'budget':>8}  slowest imports"]
+    for r in rows:
+        slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in r["slowest"])
+        lines.append(f"{r['entry']:<44}{r['ms']:>10.0f}{r['budget_ms']:>8.0f}  "
+                     f"{'OVER BUDGET ' if r['over'] else ''}{slowest}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure entry-point import time against its budget.")
+    parser.add_argument("entries", nargs="*", help=f"entry points to measure (default: all of {len(ENTRY_POINTS)})")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="fresh interpreters per entry point")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="slowest top-level imports to list")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any entry point is over budget")
+    args = parser.parse_args()
+
+    unknown = [e for e in args.entries if e not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"no budget for {unknown}; known: {sorted(ENTRY_POINTS)}")
+    rows = [measure(e, ENTRY_POINTS[e], args.runs, args.top) for e in (args.entries or ENTRY_POINTS)]
+    print(format_report(rows))
+    over = [r for r in rows if r["over"]]
+    print(f"\n{'⚠️' if over else '✅'} {len(over)} of {len(rows)} entry points over their import-time budget "
+          f"(median of {args.runs} runs)")
+    if args.check and over:
+        sys.exit(1)
@@ -0,0 +1,413 @@
+"""
+Single-pass, chunked statistics for the EDA and statistical summary reports.
+
+summarize() reads a stream of DataFrame chunks (the processed CSV, the
+SQLite employees table or an in-memory frame, see *_chunks below) once and
+keeps, per column:
+
+- numeric columns: a Moments accumulator (count, mean, central moment sums
+  M2..M4, min, max), updated with a few vectorized NumPy reductions per
+  chunk and merged with the pairwise update formulas of Chan et al./Pebay,
+  so variance, skew and kurtosis need no second pass; plus a QuantileSketch
+  for the median;
+- other columns: exact value counts (for the top values);
+- every column: its missing-value count.
+
+Summaries of separate chunk streams can be combined with merge(). Skew and
+kurtosis follow pandas (bias-corrected, kurtosis in excess of 3), and all
+moments are accumulated in float64 (float32 columns are first widened to the
+decimals they were parsed from, schema.widen_float). Medians are exact until a column holds
+more than DEFAULT_SKETCH_SIZE values, then estimated with a rank error of
+roughly log2(n / size) / size.
+
+eda_report() and statistical_summary() produce the eda_summary.txt and
+statistical_summary.csv layouts of visualizations/basic_visualizations_1.py.
+Run directly to write both reports from the CSV or the database in chunks:
+
+    python src/analysis/stream_stats.py [--source csv|sqlite] [--chunksize 100000]
+"""
+from pathlib import Path
+import argparse
+import sqlite3
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DB_PATH = BASE_DIR / "data" / "employee_data.db"
+OUTPUT_REPORTS = BASE_DIR / "outputs" / "reports"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.schema import COLUMN_NAMES, TABLE, UNIFIED_CSV, apply_dtypes, read_csv_kwargs, widen_float  # noqa: E402
+
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_SKETCH_SIZE = 32_768
+
+
+def _zero_out_fperr(m: float, tolerance: float) -> float:
+    # Like pandas: sums this close to zero are rounding error on constant data
+    return 0.0 if abs(m) < tolerance else m
+
+
+class Moments:
+    """Count, mean, central moment sums, min and max of a stream of values."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = self.m2 = self.m3 = self.m4 = 0.0
+        self.min = self.max = np.nan
+
+    @classmethod
+    def of(cls, values: np.ndarray) -> "Moments":
+        """Moments of one chunk of non-missing float64 values."""
+        m = cls()
+        if len(values):
+            m.count = len(values)
+            m.mean = float(values.mean())
+            d = values - m.mean
+            d2 = d * d
+            m.m2, m.m3, m.m4 = float(d2.sum()), float((d2 * d).sum()), float((d2 * d2).sum())
+            m.min, m.max = float(values.min()), float(values.max())
+        return m
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Combine other's values into self (in place); returns self."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.__dict__.update(other.__dict__)
+            return self
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        d_n = delta / n
+        m2, m3 = self.m2, self.m3
+        self.m4 += (other.m4 + delta * d_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+                    + 6 * d_n * d_n * (na * na * other.m2 + nb * nb * m2) + 4 * d_n * (na * other.m3 - nb * m3))
+        self.m3 += other.m3 + delta * d_n * d_n * na * nb * (na - nb) + 3 * d_n * (na * other.m2 - nb * m2)
+        self.m2 += other.m2 + delta * d_n * na * nb
+        self.mean += d_n * nb
+        self.count = n
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    @property
+    def var(self) -> float:
+        """Sample variance (ddof=1), as Series.var()."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.var))
+
+    def _tolerance(self, power: int) -> float:
+        max_abs = max(abs(self.min), abs(self.max))
+        return (np.finfo(np.float64).eps * max_abs) ** power * self.count
+
+    @property
+    def skew(self) -> float:
+        """Bias-corrected sample skewness, as Series.skew()."""
+        n = self.count
+        if n < 3:
+            return np.nan
+        m2, m3 = _zero_out_fperr(self.m2, self._tolerance(2)), _zero_out_fperr(self.m3, self._tolerance(3))
+        if m2 == 0:
+            return 0.0
+        return n * (n - 1) ** 0.5 / (n - 2) * (m3 / m2 ** 1.5)
+
+    @property
+    def kurt(self) -> float:
+        """Bias-corrected excess kurtosis, as Series.kurt()."""
+        n = self.count
+        if n < 4:
+            return np.nan
+        m2, m4 = _zero_out_fperr(self.m2, self._tolerance(2)), _zero_out_fperr(self.m4, self._tolerance(4))
+        denominator = (n - 2) * (n - 3) * m2 ** 2
+        if denominator == 0:
+            return 0.0
+        return n * (n + 1) * (n - 1) * m4 / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch (a KLL-style hierarchy of compactors).
+
+    levels[h] holds values standing for 2**h observations each. When a level
+    grows past `size` values it is sorted and every other value moves up a
+    level (alternating which half, so no side is favoured); an odd value out
+    stays behind. Until the first compaction the sketch holds every value and
+    quantiles are exact.
+    """
+
+    def __init__(self, size: int = DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.levels = []
+        self._offsets = []
+
+    def _add(self, h: int, values: np.ndarray):
+        while h < len(self.levels) or len(values):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+                self._offsets.append(0)
+            level = np.concatenate([self.levels[h], values]) if len(self.levels[h]) else values
+            if len(level) <= self.size:
+                self.levels[h] = level
+                return
+            level = np.sort(level)
+            keep = len(level) % 2
+            self.levels[h] = level[:keep]
+            values = level[keep + self._offsets[h]::2]
+            self._offsets[h] ^= 1
+            h += 1
+
+    def update(self, values: np.ndarray):
+        """Add a chunk of non-missing values."""
+        if len(values):
+            self._add(0, np.asarray(values, dtype="float64"))
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add other's values into self (in place); returns self."""
+        for h, values in enumerate(other.levels):
+            if len(values):
+                self._add(h, values)
+        return self
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) <= 1
+
+    def quantile(self, q: float) -> float:
+        """q-th quantile, linearly interpolated like Series.quantile() when exact."""
+        if self.exact:
+            return float(np.quantile(self.levels[0], q)) if self.levels and len(self.levels[0]) else np.nan
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 2.0 ** h) for h, v in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        # Each value is the midpoint of the ranks it stands for
+        ranks = np.cumsum(weights) - weights / 2
+        return float(np.interp(q * weights.sum(), ranks, values))
+
+
+class StreamSummary:
+    """Per-column statistics of a stream of DataFrame chunks with the same columns."""
+
+    def __init__(self, sketch_size: int = DEFAULT_SKETCH_SIZE):
+        self.sketch_size = sketch_size
+        self.rows = 0
+        self.columns = []
+        self.numeric_columns = []
+        self.categorical_columns = []
+        self.moments = {}
+        self.sketches = {}
+        self.missing = None
+        self._counts = {}
+
+    def _start(self, chunk: pd.DataFrame):
+        self.columns = chunk.columns.tolist()
+        self.numeric_columns = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_columns = [c for c in self.columns if c not in self.numeric_columns]
+        self.moments = {c: Moments() for c in self.numeric_columns}
+        self.sketches = {c: QuantileSketch(self.sketch_size) for c in self.numeric_columns}
+        self.missing = pd.Series(0, index=self.columns, dtype="int64")
+        self._counts = {c: [] for c in self.categorical_columns}
+
+    def update(self, chunk: pd.DataFrame) -> "StreamSummary":
+        """Fold one chunk into the summary."""
+        if not self.columns:
+            self._start(chunk)
+        self.rows += len(chunk)
+        self.missing += chunk.isna().sum()
+        for col in self.numeric_columns:
+            # float32 columns (the compact load dtypes) are widened to the decimals the
+            # CSV holds, so the statistics do not pick up float32 rounding
+            v = widen_float(chunk[col]).to_numpy(dtype="float64", na_value=np.nan)
+            v = v[~np.isnan(v)]
+            self.moments[col].merge(Moments.of(v))
+            self.sketches[col].update(v)
+        for col in self.categorical_columns:
+            s = chunk[col]
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                # Counts of the observed categories in order of first appearance,
+                # like value_counts(sort=False) of the same column as text
+                codes = s.cat.codes.to_numpy()
+                codes = codes[codes >= 0]
+                seen = pd.unique(codes)
+                vc = pd.Series(np.bincount(codes, minlength=len(s.cat.categories))[seen],
+                               index=s.cat.categories[seen])
+            else:
+                vc = s.value_counts(sort=False, dropna=True)
+            self._add_counts(col, [vc])
+        return self
+
+    def _add_counts(self, col: str, parts: list):
+        counts = self._counts[col]
+        counts.extend(parts)
+        # Fold the per-chunk counts now and then, so a long stream keeps one Series per column
+        if len(counts) >= 16:
+            self._counts[col] = [self._fold(counts)]
+
+    @staticmethod
+    def _fold(parts: list) -> pd.Series:
+        if len(parts) == 1:
+            return parts[0]
+        # sort=False keeps first-appearance order, which value_counts breaks ties by
+        return pd.concat(parts).groupby(level=0, sort=False).sum()
+
+    def merge(self, other: "StreamSummary") -> "StreamSummary":
+        """Combine the summary of a later part of the stream into self (in place)."""
+        if not other.columns:
+            return self
+        if not self.columns:
+            self.__dict__.update(other.__dict__)
+            return self
+        self.rows += other.rows
+        self.missing += other.missing
+        for col in self.numeric_columns:
+            self.moments[col].merge(other.moments[col])
+            self.sketches[col].merge(other.sketches[col])
+        for col in self.categorical_columns:
+            self._add_counts(col, list(other._counts[col]))
+        return self
+
+    # --- results ---
+    def median(self, col: str) -> float:
+        return self.sketches[col].quantile(0.5)
+
+    def value_counts(self, col: str) -> pd.Series:
+        """
+        Counts of a non-numeric column, ordered like Series.value_counts() of the
+        whole stream as text: ties by first appearance, categorical or not.
+        """
+        return self._fold(self._counts[col]).sort_values(ascending=False, kind="stable")
+
+    def eda_report(self) -> str:
+        """Text of eda_summary.txt."""
+        lines = []
+        lines.append("Exploratory Data Analysis (EDA) Summary")
+        lines.append("=" * 60)
+        lines.append(f"Rows: {self.rows}, Columns: {len(self.columns)}")
+        lines.append(f"Numeric columns: {self.numeric_columns}")
+        lines.append(f"Categorical columns: {self.categorical_columns}")
+        lines.append("")
+
+        if self.numeric_columns:
+            lines.append("Numeric summaries (mean, median, std, min, max, non-null):")
+            for col in self.numeric_columns:
+                m = self.moments[col]
+                if not m.count:
+                    lines.append(f"{col}: no valid numeric values")
+                    continue
+                lines.append(
+                    f"{col}: mean={m.mean:.2f}, median={self.median(col):.2f}, std={m.std:.2f}, "
+                    f"min={m.min:.2f}, max={m.max:.2f}, count={m.count}"
+                )
+            lines.append("")
+
+        if self.categorical_columns:
+            lines.append("Categorical summaries (top 3 values):")
+            for col in self.categorical_columns:
+                top = self.value_counts(col).head(3)
+                top_str = "; ".join([f"{idx}({val})" for idx, val in top.items()])
+                lines.append(f"{col}: {top_str}")
+            lines.append("")
+
+        lines.append("Missing values (per column):")
+        for col, cnt in self.missing.items():
+            if cnt > 0:
+                lines.append(f"{col}: {cnt}")
+        return "\n".join(lines)
+
+    def statistical_summary(self) -> pd.DataFrame:
+        """Rows of statistical_summary.csv: mean, median, std, skew and kurtosis per numeric column."""
+        rows = []
+        for col in self.numeric_columns:
+            m = self.moments[col]
+            if not m.count:
+                continue
+            rows.append({
+                "column": col,
+                "mean": m.mean,
+                "median": self.median(col),
+                "std": m.std,
+                "skew": m.skew,
+                "kurtosis": m.kurt
+            })
+        return pd.DataFrame(rows)
+
+
+# -----------------------
+# Sources
+# -----------------------
+def frame_chunks(df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Row slices (views) of an in-memory frame."""
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def csv_chunks(csv_path: Path = UNIFIED_CSV, chunksize: int = DEFAULT_CHUNKSIZE, columns: list = None):
+    """The unified CSV in chunks, with the schema dtypes."""
+    yield from pd.read_csv(csv_path, chunksize=chunksize, **read_csv_kwargs(columns))
+
+
+def sqlite_chunks(db_path: Path = DB_PATH, chunksize: int = DEFAULT_CHUNKSIZE, columns: list = None):
+    """The employees table (or star-schema view) in chunks, cast to the schema dtypes."""
+    columns = COLUMN_NAMES if columns is None else [c for c in COLUMN_NAMES if c in columns]
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        for chunk in pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {TABLE}", conn, chunksize=chunksize):
+            yield apply_dtypes(chunk)
+    finally:
+        conn.close()
+
+
+def summarize(chunks, prepare=None, sketch_size: int = DEFAULT_SKETCH_SIZE) -> StreamSummary:
+    """One pass over chunks (each passed through prepare(chunk) first, if given)."""
+    summary = StreamSummary(sketch_size)
+    for chunk in chunks:
+        summary.update(prepare(chunk) if prepare else chunk)
+    return summary
+
+
+def summarize_frame(df: pd.DataFrame) -> StreamSummary:
+    """Summary of an in-memory frame, e.g. as a shared ChartData aggregation."""
+    return summarize(frame_chunks(df))
+
+
+def write_reports(summary: StreamSummary, out_dir: Path = OUTPUT_REPORTS) -> tuple:
+    """Write eda_summary.txt and statistical_summary.csv; returns their paths."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    eda, stats_csv = out_dir / "eda_summary.txt", out_dir / "statistical_summary.csv"
+    with eda.open("w", encoding="utf-8") as f:
+        f.write(summary.eda_report())
+    summary.statistical_summary().to_csv(stats_csv, index=False)
+    return eda, stats_csv
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the EDA and statistical summary reports in one chunked pass.")
+    parser.add_argument("--source", choices=["csv", "sqlite"], default="csv", help="read the processed CSV or the database")
+    parser.add_argument("--csv", type=Path, default=UNIFIED_CSV, help="unified CSV (--source csv)")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database (--source sqlite)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows per chunk")
+    parser.add_argument("--sketch-size", type=int, default=DEFAULT_SKETCH_SIZE,
+                        help="values per median sketch level (medians are exact up to this many values)")
+    parser.add_argument("--out-dir", type=Path, default=OUTPUT_REPORTS, help="directory for the reports")
+    args = parser.parse_args()
+
+    # The reports describe the frame the visualization pipeline prepares
+    # (canonical names, stripped departments, lower-case gender)
+    from src.viz.registry import prepare_frame
+
+    start = time.perf_counter()
+    chunks = (csv_chunks(args.csv, args.chunksize) if args.source == "csv"
+              else sqlite_chunks(args.db, args.chunksize))
+    summary = summarize(chunks, prepare_frame, args.sketch_size)
+    eda, stats_csv = write_reports(summary, args.out_dir)
+    approximate = [c for c in summary.numeric_columns if not summary.sketches[c].exact]
+    print(f"📊 {summary.rows:,} rows from {args.source} in {time.perf_counter() - start:.2f}s"
+          + (f"; estimated medians: {', '.join(approximate)}" if approximate else ""))
+    print(f"✅ Saved {eda} and {stats_csv}")
@@ -1,15 +1,21 @@
-import pandas as pd
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 PROCESSED = BASE_DIR / 'data' / 'processed' / 'employees_unified.csv'
 
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.analysis.engine_router import aggregate  # noqa: E402
+
 def basic_insights():
-    df = pd.read_csv(PROCESSED)
-    print('Total employees:', len(df))
-    print('Average salary:', df['salary'].dropna().mean())
-    print('Median salary:', df['salary'].dropna().median())
-    print('\nTop departments by headcount:\n', df['department'].value_counts().head())
+    # SQLite or pandas, whichever engine_router measured as cheaper for this data
+    overview = aggregate('salary_overview', csv_path=PROCESSED).iloc[0]
+    print('Total employees:', int(overview['employees']))
+    print('Average salary:', overview['avg_salary'])
+    print('Median salary:', overview['median_salary'])
+    headcount = aggregate('headcount_by_dept', csv_path=PROCESSED).dropna(subset=['department'])
+    print('\nTop departments by headcount:\n', headcount.set_index('department')['headcount'].head())
 
 if __name__ == '__main__':
     basic_insights()
\ No newline at end of file
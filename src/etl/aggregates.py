@@ -0,0 +1,251 @@
+"""
+Materialized department and gender rollups of the employees table.
+
+dept_salary_summary keeps headcount and the count, sum and sum of squares of
+salary per department; gender_summary keeps headcount per gender. Triggers
+on employees maintain both row by row, so the upsert path in to_sql.py keeps
+them current at the cost of a few updates per changed row. Bulk loads swap
+in a new table without triggers and call install(), which recreates the
+triggers and rebuilds the rollups with a single GROUP BY.
+
+The views dept_salary_stats (department, headcount, avg_salary,
+salary_variance) and gender_counts (gender, total) turn the sql/queries
+rollups into O(#groups) lookups. The files in sql/queries read the base
+table, so they run on any copy of the database; a file of the same name in
+sql/rollups answers the same query from the views and is used instead (see
+query_text) when the database has them. Missing departments/genders are kept
+under a NULL key, which the triggers match with IS, so they never merge with
+a real '' value. In the star layout
+(star_schema.py) the triggers sit on the fact table and look the department
+and gender names up in their dimension tables. install() recreates any
+rollup table, view or trigger whose definition differs from the one here.
+
+Run directly with --check to recompute the rollups from employees and
+report drift (exit status 1 if any), or --rebuild to recompute them.
+"""
+from pathlib import Path
+import argparse
+import math
+import sqlite3
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DB_PATH = BASE_DIR / "data" / "employee_data.db"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.schema import TABLE  # noqa: E402
+from src.etl.star_schema import DIMENSIONS, FACT_TABLE, column_expr, fact_column, is_star  # noqa: E402
+
+DEPT_SUMMARY = "dept_salary_summary"
+GENDER_SUMMARY = "gender_summary"
+DEPT_VIEW = "dept_salary_stats"
+GENDER_VIEW = "gender_counts"
+ROLLUP_QUERIES_DIR = BASE_DIR / "sql" / "rollups"
+
+# Relative tolerance for salary sums in --check (incremental float sums drift slightly)
+SUM_REL_TOL = 1e-9
+
+# Rollup columns computed from the base table, in summary-table order
+DEPT_AGGREGATES = "COUNT(*), COUNT(salary), IFNULL(SUM(salary), 0), IFNULL(SUM(salary * salary), 0)"
+GENDER_AGGREGATES = "COUNT(*)"
+
+# Rollup tables and views by name; NULL keys are unique too (the triggers match keys with IS)
+TABLES_SQL = {
+    DEPT_SUMMARY: f"""CREATE TABLE {DEPT_SUMMARY} (
+        department_key TEXT UNIQUE,
+        headcount INTEGER NOT NULL,
+        salary_count INTEGER NOT NULL,
+        salary_sum REAL NOT NULL,
+        salary_sumsq REAL NOT NULL
+    )""",
+    GENDER_SUMMARY: f"""CREATE TABLE {GENDER_SUMMARY} (
+        gender_key TEXT UNIQUE,
+        headcount INTEGER NOT NULL
+    )""",
+}
+
+VIEWS_SQL = {
+    DEPT_VIEW: f"""CREATE VIEW {DEPT_VIEW} AS
+    SELECT department_key AS department,
+           headcount,
+           salary_sum / NULLIF(salary_count, 0) AS avg_salary,
+           CASE WHEN salary_count > 1
+                THEN (salary_sumsq - salary_sum * salary_sum / salary_count) / (salary_count - 1)
+           END AS salary_variance
+    FROM {DEPT_SUMMARY}""",
+    GENDER_VIEW: f"""CREATE VIEW {GENDER_VIEW} AS
+    SELECT gender_key AS gender, headcount AS total
+    FROM {GENDER_SUMMARY}""",
+}
+
+
+def _add(row: str, col) -> str:
+    """Statements adding one employees row (NEW/OLD) to the rollups; col(name, row) gives column SQL."""
+    department, gender = col("department", row), col("gender", row)
+    return f"""
+        INSERT INTO {DEPT_SUMMARY} SELECT {department}, 0, 0, 0, 0
+        WHERE NOT EXISTS (SELECT 1 FROM {DEPT_SUMMARY} WHERE department_key IS {department});
+        UPDATE {DEPT_SUMMARY} SET
+            headcount = headcount + 1,
+            salary_count = salary_count + ({row}.salary IS NOT NULL),
+            salary_sum = salary_sum + IFNULL({row}.salary, 0),
+            salary_sumsq = salary_sumsq + IFNULL({row}.salary * {row}.salary, 0)
+        WHERE department_key IS {department};
+        INSERT INTO {GENDER_SUMMARY} SELECT {gender}, 0
+        WHERE NOT EXISTS (SELECT 1 FROM {GENDER_SUMMARY} WHERE gender_key IS {gender});
+        UPDATE {GENDER_SUMMARY} SET headcount = headcount + 1 WHERE gender_key IS {gender};"""
+
+
+def _remove(row: str, col) -> str:
+    """Statements removing one employees row (NEW/OLD) from the rollups."""
+    department, gender = col("department", row), col("gender", row)
+    return f"""
+        UPDATE {DEPT_SUMMARY} SET
+            headcount = headcount - 1,
+            salary_count = salary_count - ({row}.salary IS NOT NULL),
+            salary_sum = salary_sum - IFNULL({row}.salary, 0),
+            salary_sumsq = salary_sumsq - IFNULL({row}.salary * {row}.salary, 0)
+        WHERE department_key IS {department};
+        DELETE FROM {DEPT_SUMMARY} WHERE department_key IS {department} AND headcount = 0;
+        UPDATE {GENDER_SUMMARY} SET headcount = headcount - 1 WHERE gender_key IS {gender};
+        DELETE FROM {GENDER_SUMMARY} WHERE gender_key IS {gender} AND headcount = 0;"""
+
+
+def triggers_sql(table: str = TABLE, star: bool = False) -> dict:
+    """
+    Trigger name -> CREATE TRIGGER statement keeping the rollups in sync with
+    table, or with the fact table when star.
+    """
+    if star:
+        table, col = FACT_TABLE, column_expr
+    else:
+        def col(name, row):
+            return f"{row}.{name}"
+    watched = ", ".join(fact_column(c) if star else c for c in ("department", "salary", "gender"))
+    return {
+        f"{table}_rollup_ai": f"AFTER INSERT ON {table} BEGIN{_add('NEW', col)}\nEND",
+        f"{table}_rollup_ad": f"AFTER DELETE ON {table} BEGIN{_remove('OLD', col)}\nEND",
+        f"{table}_rollup_au": f"AFTER UPDATE OF {watched} ON {table} "
+                              f"BEGIN{_remove('OLD', col)}{_add('NEW', col)}\nEND",
+    }
+
+
+def _grouped_sql(conn: sqlite3.Connection, table: str, column: str, aggregates: str) -> str:
+    """SELECT key, aggregates ... GROUP BY column; groups on the integer key in the star layout."""
+    if is_star(conn, table):
+        dim = DIMENSIONS[column]
+        return (f"SELECT {dim}.name, {aggregates} FROM {FACT_TABLE} "
+                f"LEFT JOIN {dim} ON {dim}.id = {FACT_TABLE}.{fact_column(column)} "
+                f"GROUP BY {FACT_TABLE}.{fact_column(column)}")
+    return f"SELECT {column}, {aggregates} FROM {table} GROUP BY {column}"
+
+
+def rebuild(conn: sqlite3.Connection, table: str = TABLE):
+    """Recompute both rollups from the base table."""
+    conn.execute(f"DELETE FROM {DEPT_SUMMARY}")
+    conn.execute(f"INSERT INTO {DEPT_SUMMARY} " + _grouped_sql(conn, table, "department", DEPT_AGGREGATES))
+    conn.execute(f"DELETE FROM {GENDER_SUMMARY}")
+    conn.execute(f"INSERT INTO {GENDER_SUMMARY} " + _grouped_sql(conn, table, "gender", GENDER_AGGREGATES))
+
+
+def install(conn: sqlite3.Connection, table: str = TABLE, rebuild_all: bool = False) -> bool:
+    """
+    Create the rollup tables, views and triggers that are missing or defined
+    differently. The rollups are rebuilt when asked or when anything had to
+    be (re)created, since rows may have changed while no trigger was
+    watching. Returns whether a rebuild ran. No COMMIT is issued.
+    """
+    triggers = triggers_sql(table, is_star(conn, table))
+    wanted = {**TABLES_SQL, **VIEWS_SQL, **{name: f"CREATE TRIGGER {name} {body}" for name, body in triggers.items()}}
+    stored = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'view', 'trigger')"))
+    changed = [name for name, sql in wanted.items() if stored.get(name) != sql]
+    for name in changed:
+        if name in stored:
+            # "CREATE TABLE ...", "CREATE VIEW ...", "CREATE TRIGGER ..."
+            conn.execute(f"DROP {wanted[name].split()[1]} {name}")
+        conn.execute(wanted[name])
+    if rebuild_all or changed:
+        rebuild(conn, table)
+        return True
+    return False
+
+
+def has_views(conn: sqlite3.Connection) -> bool:
+    """True when the database has the rollup views."""
+    found = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'view' AND name IN (?, ?)",
+                         (DEPT_VIEW, GENDER_VIEW)).fetchone()[0]
+    return found == 2
+
+
+def query_text(path: Path, rollups: bool) -> str:
+    """
+    SQL of a sql/queries file: its sql/rollups variant when rollups (the
+    database has the views, see has_views) and one exists, else the file.
+    """
+    path = Path(path)
+    variant = ROLLUP_QUERIES_DIR / path.name
+    if rollups and variant.exists():
+        path = variant
+    return path.read_text(encoding="utf-8")
+
+
+def check(conn: sqlite3.Connection, table: str = TABLE) -> list:
+    """
+    Recompute the rollups from the base table and return drift as
+    (rollup, key, column, stored, actual) tuples.
+    """
+    drift = []
+    comparisons = [
+        (DEPT_SUMMARY, "department_key", "department", ["headcount", "salary_count", "salary_sum", "salary_sumsq"],
+         DEPT_AGGREGATES),
+        (GENDER_SUMMARY, "gender_key", "gender", ["headcount"], GENDER_AGGREGATES),
+    ]
+    for summary, key, column, columns, aggregates in comparisons:
+        stored = {row[0]: row[1:] for row in conn.execute(f"SELECT {key}, {', '.join(columns)} FROM {summary}")}
+        actual = {row[0]: row[1:] for row in conn.execute(_grouped_sql(conn, table, column, aggregates))}
+        # The NULL key first
+        for k in sorted(stored.keys() | actual.keys(), key=lambda k: (k is not None, k or "")):
+            s_row, a_row = stored.get(k), actual.get(k)
+            for i, col in enumerate(columns):
+                s = s_row[i] if s_row else None
+                a = a_row[i] if a_row else None
+                if s is None or a is None:
+                    same = s == a
+                elif isinstance(a, float):
+                    same = math.isclose(s, a, rel_tol=SUM_REL_TOL, abs_tol=1e-6)
+                else:
+                    same = s == a
+                if not same:
+                    drift.append((summary, k, col, s, a))
+    return drift
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain and verify the materialized rollup tables.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--check", action="store_true",
+                        help="recompute the rollups from employees and report drift (exit 1 on drift)")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the rollups from employees")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    conn.execute("BEGIN IMMEDIATE")
+    rebuilt = install(conn, rebuild_all=args.rebuild)
+    conn.execute("COMMIT")
+    if rebuilt:
+        print("🔁 Rebuilt rollups from", TABLE)
+
+    if args.check:
+        drift = check(conn)
+        for summary, key, col, stored, actual in drift:
+            print(f"⚠️ {summary}[{'NULL' if key is None else repr(key)}].{col}: stored {stored}, actual {actual}")
+        print(f"{'⚠️' if drift else '✅'} Rollup check: {len(drift)} mismatches")
+        conn.close()
+        sys.exit(1 if drift else 0)
+
+    for name, view in (("Department salary", DEPT_VIEW), ("Gender", GENDER_VIEW)):
+        print(f"\n{name} rollup:")
+        for row in conn.execute(f"SELECT * FROM {view} ORDER BY 1"):
+            print("  ", row)
+    conn.close()
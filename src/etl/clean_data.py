@@ -1,22 +1,104 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
 import pandas as pd
 import sys
 import numpy as np
 
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
 # --- Paths (project-root aware) ---
 BASE_DIR = Path(__file__).resolve().parents[2]
 RAW_DIR = BASE_DIR / "data" / "raw"
 PROCESSED_DIR = BASE_DIR / "data" / "processed"
+MANIFEST_PATH = PROCESSED_DIR / "manifest.json"
+INTERMEDIATE_DIR = PROCESSED_DIR / "intermediate"
+LINKAGE_REPORT = PROCESSED_DIR / "dedupe_decisions.csv"
+SOURCES_FILE = RAW_DIR / "sources.json"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.column_store import ColumnStoreWriter, store_dir_for, write_store  # noqa: E402
+from src.etl.schema import SOURCE_COLUMNS, apply_dtypes  # noqa: E402
+from src.etl.dedupe import link_records  # noqa: E402
+from src.etl.external_merge import DEFAULT_PARTITIONS, external_merge  # noqa: E402
+from src.etl.id_registry import REGISTRY_DB, IdRegistry, assign_ids  # noqa: E402
+from src.etl.validation import PERFORMANCE_SCALE, Quarantine, validate  # noqa: E402
+
+# Bump whenever the per-source cleaning changes so cached intermediates are rebuilt
+PIPELINE_VERSION = 5
+
+
+# ---------------------------------------------------------------------
+# Source registry
+# ---------------------------------------------------------------------
+@dataclass
+class Source:
+    """
+    One raw export: its header mapping, provenance label, the natural-key
+    columns fingerprinted for generated IDs (default: every attribute column)
+    and the scale its performance scores are on (10 or 100).
+    """
+    file: str
+    renames: dict = field(default_factory=dict)
+    label: str = ""
+    key_columns: list = None
+    performance_scale: int = PERFORMANCE_SCALE
 
-REQUIRED_FILES = [
-    "employees_cleaned_data.csv",
-    "employees.csv",
-    "employees_project_cleaned.csv",
+    def __post_init__(self):
+        self.label = self.label or self.file
+        self.key_columns = self.key_columns or [c for c in SOURCE_COLUMNS if c != "employee_id"]
+
+
+# Standardized raw headers that map onto canonical column names in every source
+COMMON_RENAMES = {
+    "employeeid": "employee_id",
+    "joblevel": "job_level",
+    "yearsexperience": "years_experience",
+    "performancescore": "performance_score",
+}
+
+# Order matters: earlier sources win when employee_ids collide
+SOURCES = [
+    Source("employees_cleaned_data.csv"),
+    Source("employees.csv", renames={"team": "department"}),
+    Source("employees_project_cleaned.csv"),
 ]
 
+REQUIRED_FILES = [s.file for s in SOURCES]
+
+
+def load_sources(path: Path = SOURCES_FILE) -> list:
+    """
+    Return the source registry: data/raw/sources.json when present (a list of
+    {"file", "renames", "label", "key_columns", "performance_scale"} objects),
+    else the built-in SOURCES.
+    """
+    if not path.exists():
+        return SOURCES
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    print(f"🗂️ Loaded {len(entries)} sources from {path.name}")
+    return [Source(**entry) for entry in entries]
 
-def check_files():
-    missing = [f for f in REQUIRED_FILES if not (RAW_DIR / f).exists()]
+
+# Streaming mode defaults
+DEFAULT_CHUNKSIZE = 100_000
+DEFAULT_MEMORY_BUDGET_MB = 1024
+# Share of the memory budget the seen-key index may use (merging it briefly needs twice that)
+KEY_INDEX_BUDGET_SHARE = 0.25
+
+
+def check_files(sources: list = SOURCES):
+    missing = [s.file for s in sources if not (RAW_DIR / s.file).exists()]
     if missing:
         print("❌ Error: Missing files in:", RAW_DIR)
         for m in missing:
@@ -46,94 +128,391 @@ def standardize(df: pd.DataFrame) -> pd.DataFrame:
 
 def ensure_cols(df: pd.DataFrame):
     """Ensure all canonical columns exist."""
-    cols = [
-        "employee_id",
-        "first_name",
-        "age",
-        "gender",
-        "department",
-        "job_level",
-        "years_experience",
-        "salary",
-        "bonus_percent",
-        "performance_score",
-    ]
+    cols = SOURCE_COLUMNS
     for c in cols:
         if c not in df.columns:
             df[c] = pd.NA
     return df[cols]
 
 
-def generate_ids(df: pd.DataFrame, start=1000) -> pd.DataFrame:
-    """Generate missing employee IDs."""
-    if df["employee_id"].isna().all() or df["employee_id"].dtype == object:
-        mask = df["employee_id"].isna()
-        n = mask.sum()
-        df.loc[mask, "employee_id"] = [f"GEN_{i}" for i in range(start, start + n)]
-    return df
+def generate_ids(df: pd.DataFrame, source: Source, registry: IdRegistry) -> pd.DataFrame:
+    """Fill missing employee IDs with stable IDs from the persistent registry."""
+    return assign_ids(df, registry, source.key_columns, source=source.label)
+
+
+def prepare(df: pd.DataFrame, source: Source) -> tuple:
+    """
+    Apply header mapping, canonical columns and provenance, then validate.
+    Returns validate()'s (valid rows, quarantined rows, rule stats).
+    """
+    df = standardize(df)
+    df = df.rename(columns={**COMMON_RENAMES, **source.renames})
+    df = ensure_cols(df)
+    df["source_file"] = source.label
+    return validate(df, performance_scale=source.performance_scale)
+
+
+def load_source(source: Source) -> tuple:
+    """
+    Read one raw file and return its (valid, quarantined, stats) triple
+    (IDs are assigned by the caller).
+    """
+    return prepare(read_csv_safe(RAW_DIR / source.file), source)
+
+
+# ---------------------------------------------------------------------
+# Raw-file manifest (incremental rebuilds)
+# ---------------------------------------------------------------------
+def file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        try:
+            manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+            if manifest.get("pipeline_version") == PIPELINE_VERSION:
+                return manifest
+        except (ValueError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable manifest {MANIFEST_PATH}: {e}")
+    return {"pipeline_version": PIPELINE_VERSION, "sources": {}}
+
+
+def save_manifest(manifest: dict):
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    tmp.replace(MANIFEST_PATH)
+
+
+def intermediate_path(source: Source) -> Path:
+    return INTERMEDIATE_DIR / f"{Path(source.file).stem}.pkl"
+
+
+def quarantine_path(source: Source) -> Path:
+    return INTERMEDIATE_DIR / f"{Path(source.file).stem}.quarantine.pkl"
+
+
+def is_fresh(source: Source, manifest: dict) -> bool:
+    """
+    True when the cached intermediate for a source is still valid: its size and
+    mtime match the manifest, or (for touched files) its content hash does.
+    """
+    path = RAW_DIR / source.file
+    stat = path.stat()
+    entry = manifest["sources"].get(source.file)
+    if (not entry or entry.get("source") != vars(source)
+            or not intermediate_path(source).exists() or not quarantine_path(source).exists()):
+        return False
+    if entry["size"] != stat.st_size:
+        return False
+    # Touched but identical files only cost a hash, not a parse
+    if entry["mtime_ns"] != stat.st_mtime_ns and entry["sha256"] != file_hash(path):
+        return False
+    entry["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def record_source(source: Source, df: pd.DataFrame, rejected: pd.DataFrame, manifest: dict):
+    """Write the normalized and quarantined intermediates for a source and update its manifest entry."""
+    path = RAW_DIR / source.file
+    stat = path.stat()
+    INTERMEDIATE_DIR.mkdir(parents=True, exist_ok=True)
+    df.to_pickle(intermediate_path(source))
+    rejected.to_pickle(quarantine_path(source))
+    manifest["sources"][source.file] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_hash(path),
+        "source": vars(source),
+        "intermediate": intermediate_path(source).relative_to(PROCESSED_DIR).as_posix(),
+        "rows": len(df),
+        "quarantined": len(rejected),
+    }
+
+
+def load_all_sources(sources: list, manifest: dict, quarantine: Quarantine,
+                     full: bool = False, workers: int = None) -> list:
+    """
+    Return the validated frame of every source in registry order; rejected
+    rows go to quarantine. Stale sources are parsed in a process pool; fresh
+    ones come from their cached intermediates. The result order never depends
+    on completion order, so drop_duplicates(keep="first") keeps the same rows
+    as a serial run. Missing IDs are resolved in the parent, in registry
+    order, against the ID registry.
+    """
+    stale = [s for s in sources if full or not is_fresh(s, manifest)]
+    for s in sources:
+        if s not in stale:
+            print(f"♻️ Unchanged, using cached intermediate: {s.file}")
+
+    workers = min(workers or os.cpu_count() or 1, len(stale)) if stale else 0
+    if workers > 1:
+        print(f"⚙️ Parsing {len(stale)} sources on {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = dict(zip((s.file for s in stale), pool.map(load_source, stale)))
+    else:
+        parsed = {s.file: load_source(s) for s in stale}
+
+    frames = []
+    with IdRegistry(REGISTRY_DB) as registry:
+        for s in stale:
+            df, rejected, stats = parsed[s.file]
+            parsed[s.file] = generate_ids(df, s, registry), rejected, stats
+    for s in sources:
+        if s.file in parsed:
+            df, rejected, stats = parsed[s.file]
+            record_source(s, df, rejected, manifest)
+            quarantine.add(rejected, stats)
+            frames.append(df)
+        else:
+            quarantine.add(pd.read_pickle(quarantine_path(s)))
+            frames.append(pd.read_pickle(intermediate_path(s)))
+    return frames
+
 
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
 
-def main():
+
+class SeenKeys:
+    """
+    Bounded-memory set of employee_id keys seen so far.
+
+    Keys are kept as a sorted array of 64-bit hashes (8 bytes per key) instead
+    of Python strings, so millions of IDs fit in a few tens of MB. With
+    max_bytes set, first_seen() raises MemoryError before the index would grow
+    past it; the index is the one structure in streaming mode that grows with
+    the number of distinct IDs rather than with the chunk size.
+    """
+
+    def __init__(self, max_bytes: float = None):
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self.max_bytes = max_bytes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._hashes.nbytes
+
+    def first_seen(self, keys: pd.Series) -> np.ndarray:
+        """Boolean mask of keys not seen before (first occurrence wins)."""
+        h = pd.util.hash_pandas_object(keys.astype(str), index=False).to_numpy()
+        first = np.zeros(len(h), dtype=bool)
+        first[np.unique(h, return_index=True)[1]] = True
+        if len(self._hashes):
+            pos = np.searchsorted(self._hashes, h).clip(max=len(self._hashes) - 1)
+            first &= self._hashes[pos] != h
+        needed = (len(self._hashes) + int(first.sum())) * self._hashes.itemsize
+        if self.max_bytes is not None and needed > self.max_bytes:
+            raise MemoryError(
+                f"The seen-key index would need {needed / 1024 ** 2:,.1f} MB, more than its "
+                f"{self.max_bytes / 1024 ** 2:,.1f} MB share of the memory budget; raise "
+                f"--memory-budget-mb or use --external, which dedupes on disk."
+            )
+        self._hashes = np.union1d(self._hashes, h[first])
+        return first
+
+
+def iter_source_chunks(sources: list, quarantine: Quarantine, chunksize: int = DEFAULT_CHUNKSIZE):
+    """
+    Yield (source, chunk) for every raw file in registry order, each chunk
+    cleaned and validated by prepare() (rejected rows go to quarantine) and
+    with missing IDs resolved by the ID registry.
+    """
+    with IdRegistry(REGISTRY_DB) as registry:
+        for source in sources:
+            print(f"Reading: {source.file}")
+            # Read everything as text so IDs hash the same in every chunk
+            for chunk in pd.read_csv(RAW_DIR / source.file, chunksize=chunksize, dtype=str):
+                chunk, rejected, stats = prepare(chunk, source)
+                quarantine.add(rejected, stats)
+                yield source, generate_ids(chunk, source, registry)
+
+
+def check_memory(memory_budget_mb: float, where: str):
+    peak = peak_rss_mb()
+    if peak is not None and peak > memory_budget_mb:
+        raise MemoryError(
+            f"Peak RSS {peak:,.0f} MB exceeded the memory budget of "
+            f"{memory_budget_mb:,.0f} MB while processing {where}; "
+            f"lower --chunksize or raise --memory-budget-mb."
+        )
+
+
+def stream_main(chunksize: int = DEFAULT_CHUNKSIZE,
+                memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+                sources: list = None):
+    """
+    Bounded-memory variant of main(): read each raw file in chunks, apply the
+    same cleaning per chunk, dedupe on employee_id across chunks and files,
+    and append to the unified CSV as it goes. Peak RSS is checked after every
+    chunk; the seen-key index is capped at KEY_INDEX_BUDGET_SHARE of the budget
+    before it grows.
+    """
+    print("📂 Looking for raw files at:", RAW_DIR)
+    print(f"🌊 Streaming mode: chunksize={chunksize:,}, memory budget={memory_budget_mb:,.0f} MB")
+    sources = sources or load_sources()
+    check_files(sources)
+
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    out_file = PROCESSED_DIR / "employees_unified.csv"
+    tmp_file = out_file.with_suffix(".csv.tmp")
+
+    seen = SeenKeys(max_bytes=memory_budget_mb * 1024 ** 2 * KEY_INDEX_BUDGET_SHARE)
+    store = ColumnStoreWriter(store_dir_for(out_file))
+    quarantine = Quarantine()
+    total_out = 0
+    header = True
+    try:
+        for source, chunk in iter_source_chunks(sources, quarantine, chunksize):
+            chunk = chunk[seen.first_seen(chunk["employee_id"])]
+            chunk.to_csv(tmp_file, mode="w" if header else "a", header=header, index=False)
+            store.append(chunk)
+            header = False
+
+            total_out += len(chunk)
+            check_memory(memory_budget_mb, source.file)
+        tmp_file.replace(out_file)
+        store.close(out_file)
+        quarantine.close()
+    finally:
+        for tmp in (tmp_file, quarantine.tmp):
+            if tmp.exists():
+                tmp.unlink()
+
+    peak = peak_rss_mb()
+    print(quarantine.summary())
+    print("✅ Unified dataset saved to:", out_file)
+    print("📊 Total records:", total_out)
+    print("🗃️ Column store saved to:", store.store_dir)
+    print(f"🔑 Seen-key index: {len(seen):,} keys, {seen.nbytes / 1024 ** 2:,.1f} MB")
+    if peak is not None:
+        print(f"🧠 Peak RSS: {peak:,.0f} MB (budget {memory_budget_mb:,.0f} MB)")
+
+
+def external_main(chunksize: int = DEFAULT_CHUNKSIZE, partitions: int = DEFAULT_PARTITIONS,
+                  workers: int = None, sources: list = None):
+    """
+    Out-of-core variant of main(): spill cleaned chunks into hash partitions
+    on disk, dedupe the partitions in parallel (keeping source priority), and
+    append each deduplicated partition to the unified CSV.
+    """
+    print("📂 Looking for raw files at:", RAW_DIR)
+    print(f"💽 External merge: {partitions} partitions, chunksize={chunksize:,}")
+    sources = sources or load_sources()
+    check_files(sources)
+
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    out_file = PROCESSED_DIR / "employees_unified.csv"
+    tmp_file = out_file.with_suffix(".csv.tmp")
+    spill_dir = Path(tempfile.mkdtemp(prefix="spill-", dir=PROCESSED_DIR))
+
+    store = ColumnStoreWriter(store_dir_for(out_file))
+    quarantine = Quarantine()
+    total_in = total_out = 0
+    header = True
+    try:
+        chunks = (chunk for _, chunk in iter_source_chunks(sources, quarantine, chunksize))
+        for part, rows_in, rows_out in external_merge(chunks, spill_dir, partitions, workers):
+            part = apply_dtypes(part)
+            part.to_csv(tmp_file, mode="w" if header else "a", header=header, index=False)
+            store.append(part)
+            header = False
+            total_in += rows_in
+            total_out += rows_out
+        tmp_file.replace(out_file)
+        store.close(out_file)
+        quarantine.close()
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        for tmp in (tmp_file, quarantine.tmp):
+            if tmp.exists():
+                tmp.unlink()
+
+    print(quarantine.summary())
+    print("✅ Unified dataset saved to:", out_file)
+    print(f"📊 Total records: {total_out} ({total_in - total_out} duplicates dropped)")
+    print("🗃️ Column store saved to:", store.store_dir)
+    peak = peak_rss_mb()
+    if peak is not None:
+        print(f"🧠 Peak RSS: {peak:,.0f} MB")
+
+
+def main(full: bool = False, workers: int = None, link: bool = True):
     print("📂 Looking for raw files at:", RAW_DIR)
 
     # Check required CSVs
-    check_files()
-
-    # --- Read all datasets ---
-    df1 = read_csv_safe(RAW_DIR / REQUIRED_FILES[0])
-    df2 = read_csv_safe(RAW_DIR / REQUIRED_FILES[1])
-    df3 = read_csv_safe(RAW_DIR / REQUIRED_FILES[2])
-
-    # --- Standardize headers ---
-    df1 = standardize(df1)
-    df2 = standardize(df2)
-    df3 = standardize(df3)
-
-    # Rename "team" column to "department" in df2
-    if "team" in df2.columns:
-        df2 = df2.rename(columns={"team": "department"})
-
-    # --- Ensure consistent columns ---
-    df1 = ensure_cols(df1)
-    df2 = ensure_cols(df2)
-    df3 = ensure_cols(df3)
-
-    # --- Cast numeric columns ---
-    num_cols = ["age", "years_experience", "salary", "bonus_percent", "performance_score"]
-    for df in [df1, df2, df3]:
-        for col in num_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    # --- Add provenance ---
-    df1["source_file"] = REQUIRED_FILES[0]
-    df2["source_file"] = REQUIRED_FILES[1]
-    df3["source_file"] = REQUIRED_FILES[2]
-
-    # --- Generate missing IDs ---
-    df1 = generate_ids(df1, start=1000)
-    df2 = generate_ids(df2, start=2000)
-    df3 = generate_ids(df3, start=3000)
+    sources = load_sources()
+    check_files(sources)
+
+    # --- Read, normalize and ID each source (in parallel, cached per raw file) ---
+    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest()
+    quarantine = Quarantine()
+    frames = load_all_sources(sources, manifest, quarantine, full=full, workers=workers)
+    quarantine.close()
+    print(quarantine.summary())
 
     # --- Combine and deduplicate ---
-    unified = pd.concat([df1, df2, df3], ignore_index=True, sort=False)
+    unified = pd.concat(frames, ignore_index=True, sort=False)
     unified = unified.drop_duplicates(subset=["employee_id"], keep="first")
+    # Categoricals with differing categories concat to object; re-apply the schema
+    unified = apply_dtypes(unified)
 
-    # Fill missing performance_score with random realistic values (e.g. 60–100)
-    if 'performance_score' in unified.columns:
-        mask = unified['performance_score'].isna()
-        unified.loc[mask, 'performance_score'] = np.random.randint(60, 101, size=mask.sum())
-    else:
-        unified['performance_score'] = np.random.randint(60, 101, size=len(unified))
+    # --- Record linkage: same person under different (generated) IDs ---
+    if link:
+        unified, decisions = link_records(unified)
+        decisions.to_csv(LINKAGE_REPORT, index=False)
+        counts = decisions["rule"].value_counts()
+        print(f"🔗 Record linkage merged {len(decisions)} records "
+              f"({counts.get('exact', 0)} exact, {counts.get('near', 0)} near); decisions: {LINKAGE_REPORT}")
 
     # --- Save unified dataset ---
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     out_file = PROCESSED_DIR / "employees_unified.csv"
     unified.to_csv(out_file, index=False)
+    store_dir = write_store(unified, out_file)
+    save_manifest(manifest)
 
     print("✅ Unified dataset saved to:", out_file)
+    print("🗃️ Column store saved to:", store_dir)
     print("📊 Total records:", len(unified))
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Clean and unify the raw employee CSV files.")
+    parser.add_argument("--stream", action="store_true",
+                        help="process raw files in chunks with bounded memory")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="rows per chunk in streaming mode")
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET_MB,
+                        help="abort streaming mode if peak RSS exceeds this many MB")
+    parser.add_argument("--external", action="store_true",
+                        help="out-of-core merge: hash-partition rows to disk and dedupe partitions in parallel")
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS,
+                        help="number of spill partitions in external mode")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore the raw-file manifest and re-parse every source")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes used to parse sources (default: CPU count)")
+    parser.add_argument("--no-linkage", action="store_true",
+                        help="skip record-linkage dedupe of records without natural IDs")
+    args = parser.parse_args()
+
+    if args.stream:
+        stream_main(chunksize=args.chunksize, memory_budget_mb=args.memory_budget_mb)
+    elif args.external:
+        external_main(chunksize=args.chunksize, partitions=args.partitions, workers=args.workers)
+    else:
+        main(full=args.full, workers=args.workers, link=not args.no_linkage)
@@ -0,0 +1,292 @@
+"""
+Typed, memory-mappable column store for the unified employee dataset.
+
+clean_data.py writes one binary file per column next to employees_unified.csv
+(numeric columns as raw NumPy arrays, categorical columns as int32 dictionary
+codes, free-text "string" columns such as employee_id as UTF-8 bytes, int64
+offsets and a missing-value mask, i.e. Arrow's large_string layout) plus a
+small schema.json whose size does not grow with the number of distinct IDs.
+load_unified() memory-maps those files so loading is close to zero-copy
+(text columns are wrapped as Arrow arrays when pyarrow is installed) and
+concurrent readers share the OS page cache. It falls back to parsing the CSV
+whenever the store is missing or older than the CSV; both paths return the
+dtypes of schema.read_csv_kwargs().
+"""
+from pathlib import Path
+import json
+import sys
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+UNIFIED_CSV = BASE_DIR / "data" / "processed" / "employees_unified.csv"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.schema import DTYPES, read_csv_kwargs  # noqa: E402
+
+STORE_VERSION = 4
+
+
+def store_dir_for(csv_path: Path) -> Path:
+    """Column store directory that caches a given CSV (employees_unified.cols/)."""
+    return Path(csv_path).with_suffix(".cols")
+
+
+def _csv_stat(csv_path: Path) -> dict:
+    stat = Path(csv_path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class ColumnStoreWriter:
+    """
+    Append DataFrame chunks to a column store; call close() once the source CSV
+    is final so the schema records which CSV version the store mirrors.
+    """
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        # Drop the schema first so concurrent readers fall back to the CSV
+        (self.store_dir / "schema.json").unlink(missing_ok=True)
+        for old in self.store_dir.glob("*"):
+            old.unlink()
+        self.columns = None
+        self.rows = 0
+        self._dicts = {}
+        self._text_bytes = {}
+
+    def _init_columns(self, df: pd.DataFrame):
+        self.columns = []
+        for i, col in enumerate(df.columns):
+            s = df[col]
+            if isinstance(s.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(s):
+                # Nullable integers keep their width; the dtype minimum marks NA
+                dtype = s.dtype.numpy_dtype
+                self.columns.append({"name": col, "kind": "nullable_int", "dtype": dtype.str, "file": f"c{i}.bin"})
+            elif pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                # Integers are widened to float64 so later chunks may contain NaN
+                dtype = s.to_numpy().dtype if pd.api.types.is_float_dtype(s) else np.dtype("float64")
+                self.columns.append({"name": col, "kind": "numeric", "dtype": dtype.str, "file": f"c{i}.bin"})
+            elif DTYPES.get(col) == "string":
+                # Unique-per-row text: a dictionary would be as large as the data.
+                # The offsets file starts with a 0, so it holds rows + 1 offsets
+                meta = {"name": col, "kind": "text", "dtype": "<i8", "file": f"c{i}.bin",
+                        "data": f"c{i}.txt", "mask": f"c{i}.na"}
+                self.columns.append(meta)
+                np.zeros(1, dtype=np.int64).tofile(self.store_dir / meta["file"])
+                self._text_bytes[col] = 0
+            else:
+                self.columns.append({"name": col, "kind": "dict", "dtype": "<i4", "file": f"c{i}.bin"})
+                self._dicts[col] = {}
+
+    def append(self, df: pd.DataFrame):
+        if self.columns is None:
+            self._init_columns(df)
+        for meta in self.columns:
+            s = df[meta["name"]]
+            if meta["kind"] == "numeric":
+                values = pd.to_numeric(s, errors="coerce").to_numpy(dtype=meta["dtype"], na_value=np.nan)
+            elif meta["kind"] == "nullable_int":
+                na = np.iinfo(meta["dtype"]).min
+                values = pd.to_numeric(s, errors="coerce").to_numpy(dtype=meta["dtype"], na_value=na)
+            elif meta["kind"] == "text":
+                values = self._encode_text(meta, s)
+            else:
+                values = self._encode(meta["name"], s)
+            with open(self.store_dir / meta["file"], "ab") as f:
+                f.write(np.ascontiguousarray(values).tobytes())
+        self.rows += len(df)
+
+    def _encode(self, col: str, s: pd.Series) -> np.ndarray:
+        """Dictionary-encode a chunk against the column's running dictionary (-1 = missing)."""
+        codes, uniques = pd.factorize(s)
+        mapping = self._dicts[col]
+        # Values are stored as text so the store matches what read_csv returns
+        remap = np.array([mapping.setdefault(str(u), len(mapping)) for u in uniques] + [-1], dtype=np.int32)
+        return remap[codes]
+
+    def _encode_text(self, meta: dict, s: pd.Series) -> np.ndarray:
+        """Append a chunk's UTF-8 bytes and missing mask; returns the rows' end offsets."""
+        lengths, data, missing = _utf8_buffers(s)
+        with open(self.store_dir / meta["data"], "ab") as f:
+            f.write(data)
+        with open(self.store_dir / meta["mask"], "ab") as f:
+            f.write(missing.astype(np.uint8).tobytes())
+        ends = self._text_bytes[meta["name"]] + np.cumsum(lengths, dtype=np.int64)
+        if len(ends):
+            self._text_bytes[meta["name"]] = int(ends[-1])
+        return ends
+
+    def _sort_categories(self, meta: dict) -> list:
+        """
+        Recode a dictionary column so its categories are sorted, matching the
+        categoricals read_csv(dtype="category") produces.
+        """
+        categories = list(self._dicts[meta["name"]])
+        order = np.argsort(np.array(categories, dtype=object), kind="stable")
+        if self.rows and (order != np.arange(len(order))).any():
+            remap = np.empty(len(order) + 1, dtype=np.int32)
+            remap[order] = np.arange(len(order), dtype=np.int32)
+            remap[-1] = -1
+            codes = np.memmap(self.store_dir / meta["file"], dtype=np.int32, mode="r+", shape=(self.rows,))
+            codes[:] = remap[codes]
+            codes.flush()
+            del codes
+        return [categories[i] for i in order]
+
+    def close(self, source_csv: Path):
+        schema = {
+            "version": STORE_VERSION,
+            "rows": self.rows,
+            "columns": [
+                {**meta, "categories": self._sort_categories(meta)} if meta["kind"] == "dict" else meta
+                for meta in (self.columns or [])
+            ],
+            "source": _csv_stat(source_csv),
+        }
+        tmp = self.store_dir / "schema.json.tmp"
+        tmp.write_text(json.dumps(schema), encoding="utf-8")
+        tmp.replace(self.store_dir / "schema.json")
+
+
+def write_store(df: pd.DataFrame, csv_path: Path = UNIFIED_CSV):
+    """
+    Write the column store for an already-saved CSV (and a Parquet copy when
+    pyarrow is installed).
+    """
+    writer = ColumnStoreWriter(store_dir_for(csv_path))
+    writer.append(df)
+    writer.close(csv_path)
+    write_parquet(df, csv_path)
+    return writer.store_dir
+
+
+def write_parquet(df: pd.DataFrame, csv_path: Path = UNIFIED_CSV):
+    """Optional Parquet copy of the dataset; skipped silently without pyarrow."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    out = Path(csv_path).with_suffix(".parquet")
+    df.astype({c: "string" for c in df.select_dtypes(include="object").columns}).to_parquet(out, index=False)
+    return out
+
+
+def read_schema(csv_path: Path = UNIFIED_CSV):
+    path = store_dir_for(csv_path) / "schema.json"
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+
+def is_fresh(csv_path: Path = UNIFIED_CSV) -> bool:
+    """True when the column store exists and was written from the current CSV."""
+    schema = read_schema(csv_path)
+    return (
+        schema is not None
+        and schema.get("version") == STORE_VERSION
+        and Path(csv_path).exists()
+        and schema["source"] == _csv_stat(csv_path)
+    )
+
+
+def load_store(csv_path: Path = UNIFIED_CSV, columns: list = None) -> pd.DataFrame:
+    """
+    Memory-map the column store. Pages are mapped copy-on-write, so callers may
+    modify the frame without touching the files on disk.
+    """
+    store_dir = store_dir_for(csv_path)
+    schema = read_schema(csv_path)
+    metas = schema["columns"]
+    if columns is not None:
+        metas = [m for m in metas if m["name"] in set(columns)]
+    rows = schema["rows"]
+
+    data = {}
+    for meta in metas:
+        if meta["kind"] == "text":
+            data[meta["name"]] = _load_text(store_dir, meta, rows)
+            continue
+        dtype = np.dtype(meta["dtype"])
+        if rows:
+            values = np.memmap(store_dir / meta["file"], dtype=dtype, mode="c", shape=(rows,)).view(np.ndarray)
+        else:
+            values = np.empty(0, dtype=dtype)
+        if meta["kind"] == "dict":
+            values = pd.Categorical.from_codes(values, categories=meta["categories"], validate=False)
+        elif meta["kind"] == "nullable_int":
+            values = pd.arrays.IntegerArray(values, values == np.iinfo(dtype).min)
+        data[meta["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _pyarrow():
+    """pyarrow when installed, else None (text columns then take the NumPy code paths)."""
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _utf8_buffers(s: pd.Series) -> tuple:
+    """
+    (byte length of every value, the values' UTF-8 bytes back to back, missing
+    mask) for a chunk of a text column; missing values are stored as ''.
+    """
+    s = s.astype("string")
+    missing = s.isna().to_numpy()
+    pa = _pyarrow()
+    if pa is None:
+        # NumPy fallback: fixed-width bytes, then keep each row's first `length` bytes
+        encoded = np.char.encode(s.to_numpy(dtype=object, na_value="").astype(str), "utf-8")
+        lengths = np.char.str_len(encoded)
+        width = encoded.dtype.itemsize
+        rows = encoded.view(np.uint8).reshape(len(encoded), width)
+        return lengths, rows[np.arange(width) < lengths[:, None]].tobytes(), missing
+    arr = pa.array(s, type=pa.large_string(), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    offsets = np.frombuffer(arr.buffers()[1], dtype=np.int64)[arr.offset:arr.offset + len(arr) + 1]
+    data = arr.buffers()[2]
+    return np.diff(offsets), b"" if data is None else memoryview(data)[offsets[0]:offsets[-1]], missing
+
+
+def _load_text(store_dir: Path, meta: dict, rows: int):
+    """A text column's values as the "string" dtype read_csv gives it."""
+    offsets = np.memmap(store_dir / meta["file"], dtype=np.int64, mode="r", shape=(rows + 1,))
+    data_path = store_dir / meta["data"]
+    data = np.memmap(data_path, dtype=np.uint8, mode="r") if data_path.stat().st_size else np.empty(0, np.uint8)
+    missing = np.fromfile(store_dir / meta["mask"], dtype=np.uint8).astype(bool)
+    pa = _pyarrow()
+    if pa is None:
+        # NumPy fallback: scatter the bytes into fixed-width rows and decode them in one call
+        lengths = np.diff(offsets)
+        width = max(int(lengths.max()) if rows else 0, 1)
+        fixed = np.zeros((rows, width), dtype=np.uint8)
+        fixed[np.arange(width) < lengths[:, None]] = data
+        values = np.char.decode(fixed.view(f"S{width}").ravel(), "utf-8").astype(object)
+        values[missing] = None
+        return pd.array(values, dtype="string")
+    # Zero-copy: Arrow reads the mapped offsets and bytes in place
+    validity = np.packbits(~missing, bitorder="little")
+    arr = pa.LargeStringArray.from_buffers(rows, pa.py_buffer(offsets), pa.py_buffer(data),
+                                           pa.py_buffer(validity), int(missing.sum()))
+    return pd.StringDtype().__from_arrow__(arr)
+
+
+def load_unified(csv_path: Path = UNIFIED_CSV, columns: list = None) -> pd.DataFrame:
+    """
+    Load the unified dataset from the column store when it is fresh, else parse
+    the CSV (only the requested columns).
+    """
+    csv_path = Path(csv_path)
+    if is_fresh(csv_path):
+        return load_store(csv_path, columns=columns)
+    if store_dir_for(csv_path).exists():
+        print(f"⚠️ Column store is stale, reading CSV instead: {csv_path.name}")
+    return pd.read_csv(csv_path, **read_csv_kwargs(columns))
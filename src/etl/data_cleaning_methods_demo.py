@@ -4,15 +4,19 @@ based on EmployeeDataAnalysis1.py, adapted for unified dataset.
 """
 
 from pathlib import Path
-import pandas as pd
+import sys
 
 # --- Paths ---
 BASE_DIR = Path(__file__).resolve().parents[2]
 PROCESSED = BASE_DIR / "data" / "processed" / "employees_unified.csv"
 
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.column_store import load_unified  # noqa: E402
+
 # --- Load data ---
 print(f"📂 Loading processed data from: {PROCESSED}")
-df = pd.read_csv(PROCESSED)
+df = load_unified(PROCESSED)
 print(f"✅ Data loaded: {df.shape[0]} rows, {df.shape[1]} columns\n")
 
 # --- Show initial overview ---
@@ -26,7 +30,11 @@ def drop_missing_rows():
 
 # --- 2️⃣ Fill missing values with mean ---
 def fill_missing_mean():
-    df_filled = df.fillna(df.mean(numeric_only=True))
+    means = df.mean(numeric_only=True)
+    # Nullable integer columns (e.g. Int16 age) take the rounded mean
+    ints = df.select_dtypes(include="integer").columns
+    means[ints] = means[ints].round()
+    df_filled = df.fillna(means)
     print("\n📈 Missing numeric values filled with column mean.")
     return df_filled
 
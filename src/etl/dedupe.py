@@ -0,0 +1,202 @@
+"""
+Record-linkage deduplication for records without a natural employee_id.
+
+drop_duplicates(subset=["employee_id"]) cannot see that a GEN_* record from
+one export is the same person as a record in another. This stage finds them
+without comparing every pair of rows:
+
+1. Exact duplicates: a vectorized hash of every attribute column (everything
+   except employee_id and source_file) groups identical records in O(n).
+2. Near duplicates: rows are blocked on department + gender + salary bucket
+   (twice, the second time with buckets shifted by half a width so pairs on a
+   bucket edge are not missed), sorted by salary inside each block, and each
+   row is compared with the next `window` rows only, so the work is
+   O(n * window) instead of O(n²).
+
+Two records are merged only when at least one of them has a generated ID,
+and two different natural IDs always stay distinct people, also when
+generated records link them (E1 ~ GEN_1 ~ E2): generated records are
+clustered among themselves first and each cluster then joins the earliest
+natural-ID record it matches, if any. The earliest record
+(highest source priority) survives and missing fields are filled in from the
+records merged into it. Every decision is returned for the report.
+"""
+import numpy as np
+import pandas as pd
+
+GENERATED_PREFIX = "GEN_"
+
+ID_COLUMN = "employee_id"
+IGNORED_COLUMNS = [ID_COLUMN, "source_file"]
+BLOCK_COLUMNS = ["department", "gender"]
+
+# Near-duplicate tolerances: salary relative, the other numerics absolute
+SALARY_REL_TOL = 0.005
+NUMERIC_TOL = {"bonus_percent": 0.01, "age": 0, "years_experience": 0, "performance_score": 0}
+SALARY_BUCKET = 5_000
+WINDOW = 5
+
+
+def _is_generated(ids: pd.Series) -> np.ndarray:
+    return ids.astype("string").str.startswith(GENERATED_PREFIX).fillna(True).to_numpy(dtype=bool)
+
+
+def _resolve(parent: np.ndarray) -> np.ndarray:
+    """Follow parent links (always pointing to an earlier row) to each cluster root."""
+    while True:
+        nxt = parent[parent]
+        if (nxt == parent).all():
+            return parent
+        parent = nxt
+
+
+def _link(parent: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Union row pairs into parent with vectorized label propagation; every
+    cluster keeps its earliest row as the root.
+    """
+    while len(left):
+        parent = _resolve(parent)
+        ra, rb = parent[left], parent[right]
+        todo = ra != rb
+        if not todo.any():
+            break
+        left, right, ra, rb = left[todo], right[todo], ra[todo], rb[todo]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+    return parent
+
+
+def exact_groups(df: pd.DataFrame) -> np.ndarray:
+    """Position of the first row with identical attributes, for every row."""
+    attrs = [c for c in df.columns if c not in IGNORED_COLUMNS]
+    h = pd.util.hash_pandas_object(df[attrs], index=False).to_numpy()
+    return pd.Series(np.arange(len(df))).groupby(h).transform("first").to_numpy()
+
+
+def exact_pairs(df: pd.DataFrame, generated: np.ndarray, first: np.ndarray = None) -> tuple:
+    """(duplicate row, first row) position pairs of records with identical attributes."""
+    first = exact_groups(df) if first is None else first
+    dup = np.flatnonzero(first != np.arange(len(df)))
+    first = first[dup]
+    ok = generated[dup] | generated[first]
+    return dup[ok], first[ok]
+
+
+def _codes(s: pd.Series) -> np.ndarray:
+    """Integer codes for a text column (-1 = missing) so comparisons are vectorized."""
+    return pd.factorize(s)[0]
+
+
+def near_pairs(df: pd.DataFrame, generated: np.ndarray, window: int = WINDOW,
+               bucket: float = SALARY_BUCKET, salary_tol: float = SALARY_REL_TOL,
+               groups: np.ndarray = None) -> tuple:
+    """
+    (later row, earlier row) position pairs of near-duplicate records. Rows in
+    the same exact-duplicate group (see exact_groups) are not compared again.
+    """
+    salary = pd.to_numeric(df["salary"], errors="coerce").to_numpy(dtype="float64")
+    text_cols = [c for c in df.columns
+                 if c not in IGNORED_COLUMNS + BLOCK_COLUMNS and not pd.api.types.is_numeric_dtype(df[c])]
+    num_cols = [c for c in NUMERIC_TOL if c in df.columns]
+    text = {c: _codes(df[c]) for c in text_cols}
+    nums = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64") for c in num_cols}
+    block_base = df.groupby(BLOCK_COLUMNS, observed=True, dropna=True, sort=False).ngroup().to_numpy()
+    usable = ~np.isnan(salary) & (block_base >= 0)
+
+    lefts, rights = [], []
+    for offset in (0.0, bucket / 2):
+        bucket_id = np.floor((salary + offset) / bucket)
+        order = np.lexsort((salary, bucket_id, block_base))
+        order = order[usable[order]]
+        blk, bkt = block_base[order], bucket_id[order]
+        for j in range(1, window + 1):
+            if len(order) <= j:
+                break
+            a, b = order[:-j], order[j:]
+            m = (blk[:-j] == blk[j:]) & (bkt[:-j] == bkt[j:])
+            m &= generated[a] | generated[b]
+            if groups is not None:
+                m &= groups[a] != groups[b]
+            m &= np.abs(salary[a] - salary[b]) <= salary_tol * np.maximum(salary[a], salary[b])
+            shared = np.zeros(len(a), dtype=np.int32)
+            for c, v in text.items():
+                both = (v[a] >= 0) & (v[b] >= 0)
+                m &= ~both | (v[a] == v[b])
+                shared += both
+            for c, v in nums.items():
+                both = ~np.isnan(v[a]) & ~np.isnan(v[b])
+                m &= ~both | (np.abs(v[a] - v[b]) <= NUMERIC_TOL[c] + 1e-9)
+                shared += both
+            # Salary alone is not evidence enough; need one more shared attribute
+            m &= shared >= 1
+            lo, hi = np.minimum(a[m], b[m]), np.maximum(a[m], b[m])
+            lefts.append(hi)
+            rights.append(lo)
+    if not lefts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    # Both bucket passes can find the same pair; dedupe on a single int64 key
+    n = len(df)
+    pairs = np.sort(np.concatenate(lefts).astype(np.int64) * n + np.concatenate(rights))
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+    return pairs // n, pairs % n
+
+
+def link_records(df: pd.DataFrame, window: int = WINDOW, bucket: float = SALARY_BUCKET,
+                 salary_tol: float = SALARY_REL_TOL) -> tuple:
+    """
+    Merge duplicate and near-duplicate records.
+
+    Returns (deduplicated frame, decisions) where decisions has one row per
+    dropped record: kept_id, dropped_id, rule ("exact" or "near") and the
+    source files involved.
+    """
+    df = df.reset_index(drop=True)
+    n = len(df)
+    generated = _is_generated(df[ID_COLUMN])
+
+    groups = exact_groups(df)
+    ex_dup, ex_first = exact_pairs(df, generated, first=groups)
+    nr_dup, nr_first = near_pairs(df, generated, window=window, bucket=bucket,
+                                  salary_tol=salary_tol, groups=groups)
+
+    later, earlier = np.concatenate([ex_dup, nr_dup]), np.concatenate([ex_first, nr_first])
+    # Clusters of generated records only, which hold no natural ID yet
+    both = generated[later] & generated[earlier]
+    parent = _link(np.arange(n), later[both], earlier[both])
+    # Each cluster takes at most one natural ID: the earliest record it matches
+    gen_side = np.where(generated[later], later, earlier)[~both]
+    natural_side = np.where(generated[later], earlier, later)[~both]
+    label = pd.Series(natural_side).groupby(_resolve(parent)[gen_side]).min()
+    root = _resolve(_link(parent, label.index.to_numpy(), label.to_numpy()))
+
+    dropped = np.flatnonzero(root != np.arange(n))
+    rule = np.where(np.isin(dropped, ex_dup), "exact", "near")
+    decisions = pd.DataFrame({
+        "kept_id": df[ID_COLUMN].to_numpy()[root[dropped]],
+        "dropped_id": df[ID_COLUMN].to_numpy()[dropped],
+        "rule": rule,
+        "kept_source": df["source_file"].to_numpy()[root[dropped]] if "source_file" in df else None,
+        "dropped_source": df["source_file"].to_numpy()[dropped] if "source_file" in df else None,
+    })
+    if not len(dropped):
+        return df, decisions
+
+    # Survivors take missing fields (and a natural ID, if any) from their cluster
+    members = np.flatnonzero(np.isin(root, root[dropped]))
+    cluster = df.iloc[members]
+    filled = cluster.groupby(root[members], sort=False, observed=True).first()
+    natural = cluster[ID_COLUMN].where(~generated[members])
+    natural_first = natural.groupby(root[members], sort=False).first()
+    filled[ID_COLUMN] = natural_first.fillna(filled[ID_COLUMN].astype(object)).reindex(filled.index)
+
+    out = df.copy()
+    for col in df.columns:
+        values = filled[col]
+        if isinstance(out[col].dtype, pd.CategoricalDtype):
+            values = values.astype(object)
+            missing = ~values.isin(out[col].cat.categories) & values.notna()
+            if missing.any():
+                out[col] = out[col].cat.add_categories(values[missing].unique())
+        out.loc[filled.index, col] = values.to_numpy()
+    out = out.drop(index=dropped)
+    return out.reset_index(drop=True), decisions
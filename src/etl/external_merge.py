@@ -0,0 +1,102 @@
+"""
+Out-of-core merge and dedupe for inputs larger than RAM.
+
+Rows are hash-partitioned on employee_id into spill files on local disk, so
+every copy of an ID lands in the same partition. Each partition is then small
+enough to dedupe in memory on its own, and partitions are deduped in
+parallel worker processes.
+
+Every row carries a global sequence number (_seq) assigned in source-priority
+order before spilling; partitions are sorted on it before
+drop_duplicates(keep="first"), so the surviving row for each ID is the same
+one the in-memory pd.concat + drop_duplicates would keep. The merged output
+is grouped by partition; within a partition rows keep their source order.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+SEQ_COLUMN = "_seq"
+DEFAULT_PARTITIONS = 16
+
+
+def partition_of(ids: pd.Series, partitions: int) -> np.ndarray:
+    """Partition number of every employee_id (hash of its text form)."""
+    h = pd.util.hash_pandas_object(ids.astype(str), index=False).to_numpy()
+    return (h % np.uint64(partitions)).astype(np.int64)
+
+
+def spill_partitions(chunks, spill_dir: Path, partitions: int = DEFAULT_PARTITIONS) -> list:
+    """
+    Append each chunk's rows to one spill file per partition (a stream of
+    pickled frames) and return the spill file paths.
+    """
+    spill_dir = Path(spill_dir)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    paths = [spill_dir / f"part-{p:04d}.pkl" for p in range(partitions)]
+    files = [open(p, "wb") for p in paths]
+    seq = 0
+    try:
+        for chunk in chunks:
+            chunk = chunk.reset_index(drop=True)
+            chunk[SEQ_COLUMN] = np.arange(seq, seq + len(chunk), dtype=np.int64)
+            seq += len(chunk)
+            part = partition_of(chunk["employee_id"], partitions)
+            for p, rows in chunk.groupby(part, sort=False):
+                pickle.dump(rows, files[p], protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def read_spill(path: Path) -> pd.DataFrame:
+    """Concatenate every frame pickled into one spill file."""
+    frames = []
+    with open(path, "rb") as f:
+        while True:
+            try:
+                frames.append(pickle.load(f))
+            except EOFError:
+                break
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def dedupe_partition(path: Path) -> tuple:
+    """
+    Dedupe one spill file on employee_id, keeping the lowest _seq (source
+    priority). Writes <path>.dedup and returns (that path, rows in, rows out).
+    """
+    df = read_spill(path)
+    rows_in = len(df)
+    if rows_in:
+        df = df.sort_values(SEQ_COLUMN, kind="stable")
+        df = df.drop_duplicates(subset=["employee_id"], keep="first")
+    out = Path(path).with_suffix(".dedup")
+    df.to_pickle(out)
+    os.remove(path)
+    return out, rows_in, len(df)
+
+
+def external_merge(chunks, spill_dir: Path, partitions: int = DEFAULT_PARTITIONS, workers: int = None):
+    """
+    Spill chunks into hash partitions, dedupe the partitions in parallel and
+    yield the deduplicated partitions (without _seq) one at a time, so only a
+    single partition is held in memory by the caller.
+    """
+    paths = spill_partitions(chunks, spill_dir, partitions)
+    workers = min(workers or os.cpu_count() or 1, partitions)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(dedupe_partition, paths))
+    else:
+        results = [dedupe_partition(p) for p in paths]
+
+    for out, rows_in, rows_out in results:
+        df = pd.read_pickle(out)
+        os.remove(out)
+        if len(df):
+            yield df.drop(columns=[SEQ_COLUMN]), rows_in, rows_out
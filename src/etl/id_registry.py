@@ -0,0 +1,110 @@
+"""
+Persistent registry of generated employee IDs.
+
+Records without a natural EmployeeID used to get GEN_<n> IDs from their row
+position, so the same person got a different ID whenever a raw file was
+reordered or grew. The registry maps a fingerprint of each record's natural
+key columns to a permanent surrogate ID instead:
+
+- fingerprints are computed for a whole frame at once with
+  pd.util.hash_pandas_object (64-bit, stored as SQLite INTEGER keys),
+- known fingerprints are resolved with one join against a temp table,
+- new fingerprints get the next GEN_<n> numbers and are bulk-inserted,
+
+all inside one transaction per batch.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+import sqlite3
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+REGISTRY_DB = BASE_DIR / "data" / "processed" / "id_registry.db"
+
+ID_PREFIX = "GEN_"
+FIRST_SEQ = 1000
+
+
+def fingerprint(df: pd.DataFrame, key_columns: list) -> np.ndarray:
+    """Signed 64-bit fingerprint of every row's key columns (SQLite INTEGER range)."""
+    return pd.util.hash_pandas_object(df[key_columns], index=False).to_numpy().view(np.int64)
+
+
+class IdRegistry:
+    """SQLite-backed fingerprint -> employee_id map."""
+
+    def __init__(self, path: Path = REGISTRY_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS id_registry (
+                fingerprint INTEGER PRIMARY KEY,
+                seq INTEGER NOT NULL UNIQUE,
+                employee_id TEXT NOT NULL UNIQUE,
+                source TEXT,
+                first_seen TEXT
+            )""")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM id_registry").fetchone()[0]
+
+    def resolve(self, fingerprints: np.ndarray, source: str = None) -> np.ndarray:
+        """
+        Return the employee_id for every fingerprint, registering unseen ones
+        with new sequential IDs. Equal fingerprints always get the same ID.
+        """
+        if not len(fingerprints):
+            return np.empty(0, dtype=object)
+        uniq, inverse = np.unique(fingerprints, return_inverse=True)
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (fingerprint INTEGER PRIMARY KEY)")
+            self.conn.execute("DELETE FROM incoming")
+            self.conn.executemany("INSERT INTO incoming VALUES (?)", ((int(f),) for f in uniq))
+            known = pd.DataFrame(
+                self.conn.execute(
+                    "SELECT r.fingerprint, r.employee_id FROM incoming i "
+                    "JOIN id_registry r ON r.fingerprint = i.fingerprint"
+                ).fetchall(),
+                columns=["fingerprint", "employee_id"],
+            )
+            ids = pd.Series(known["employee_id"].to_numpy(), index=known["fingerprint"].to_numpy(dtype=np.int64))
+            ids = ids.reindex(uniq).to_numpy(dtype=object, copy=True)
+
+            new = pd.isna(ids)
+            if new.any():
+                start = self.conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, ?) FROM id_registry", (FIRST_SEQ,)
+                ).fetchone()[0]
+                seqs = np.arange(start, start + new.sum())
+                ids[new] = ID_PREFIX + seqs.astype(str).astype(object)
+                now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+                self.conn.executemany(
+                    "INSERT INTO id_registry (fingerprint, seq, employee_id, source, first_seen) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    zip(uniq[new].tolist(), seqs.tolist(), ids[new].tolist(),
+                        [source] * int(new.sum()), [now] * int(new.sum())),
+                )
+        return ids[inverse]
+
+
+def assign_ids(df: pd.DataFrame, registry: IdRegistry, key_columns: list, source: str = None) -> pd.DataFrame:
+    """Fill missing employee_id values with stable IDs from the registry."""
+    mask = df["employee_id"].isna().to_numpy()
+    if mask.any():
+        ids = registry.resolve(fingerprint(df.loc[mask], key_columns), source)
+        df = df.copy()
+        df.loc[mask, "employee_id"] = ids
+    return df
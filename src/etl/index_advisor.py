@@ -0,0 +1,135 @@
+"""
+Index management for the employees table and the sql/queries workload.
+
+ensure_indexes() creates the indexes declared in schema.INDEXES, drops the
+indexes it created earlier that are no longer declared (names starting with
+schema.INDEX_PREFIX, or retired names) while leaving any other index on the
+table alone, and refreshes planner statistics with ANALYZE; to_sql.py calls
+it after every load. In the star layout the indexes go on the fact table,
+over the dimension key columns.
+
+Run directly to capture EXPLAIN QUERY PLAN for every file in sql/queries
+(written to outputs/reports/query_plans.txt). Each query is flagged when its
+plan still contains a full table scan or a temp B-tree sort; --check exits
+non-zero in that case.
+"""
+from pathlib import Path
+import argparse
+import sqlite3
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DB_PATH = BASE_DIR / "data" / "employee_data.db"
+QUERIES_DIR = BASE_DIR / "sql" / "queries"
+PLANS_REPORT = BASE_DIR / "outputs" / "reports" / "query_plans.txt"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.aggregates import has_views, query_text  # noqa: E402
+from src.etl.schema import INDEX_PREFIX, INDEXES, RETIRED_INDEXES, TABLE, create_index_sql  # noqa: E402
+from src.etl.star_schema import FACT_TABLE, fact_column, is_star  # noqa: E402
+
+
+def ensure_indexes(conn: sqlite3.Connection, table: str = TABLE, analyze: bool = True) -> dict:
+    """
+    Bring the table's managed indexes in line with INDEXES and run ANALYZE;
+    indexes this module does not own are kept. Returns {"created": [...],
+    "dropped": [...]}. Call inside or outside a transaction; no COMMIT is
+    issued here.
+    """
+    rename = None
+    if is_star(conn, table):
+        table, rename = FACT_TABLE, fact_column
+    existing = {
+        name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        )
+    }
+    wanted = {name for name, _ in INDEXES}
+    owned = {name for name in existing if name.startswith(INDEX_PREFIX) or name in RETIRED_INDEXES}
+    dropped = sorted(owned - wanted)
+    for name in dropped:
+        conn.execute(f"DROP INDEX {name}")
+    for statement in create_index_sql(table, rename):
+        conn.execute(statement)
+    if analyze:
+        conn.execute(f"ANALYZE {table}")
+    return {"created": sorted(wanted - existing), "dropped": dropped}
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> list:
+    """EXPLAIN QUERY PLAN detail lines for one statement, indented by depth."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql.strip().rstrip(';')}").fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def plan_issues(lines: list, sql: str = "", table: str = TABLE) -> list:
+    """
+    Full table scans and temp B-tree sorts of table rows in a plan. An ORDER BY
+    sort in a GROUP BY query orders the aggregated groups, not rows, and a
+    sort in a query that never reads the table (e.g. one on the rollup views
+    from aggregates.py) orders summary rows; neither is reported.
+    """
+    grouped = "GROUP BY" in " ".join(sql.upper().split())
+    reads_table = any(line.strip().split(" ")[:2] in (["SCAN", table], ["SEARCH", table]) for line in lines)
+    issues = []
+    for line in lines:
+        detail = line.strip()
+        if detail == f"SCAN {table}":
+            issues.append("full table scan")
+        elif (detail.startswith("USE TEMP B-TREE") and reads_table
+              and not (grouped and detail.endswith("FOR ORDER BY"))):
+            issues.append(detail.lower())
+    return issues
+
+
+def advise(conn: sqlite3.Connection, queries_dir: Path = QUERIES_DIR) -> dict:
+    """Map every sql/queries file name to (plan lines, issues) of the SQL run_sql_queries.py runs for it."""
+    table = FACT_TABLE if is_star(conn) else TABLE
+    rollups = has_views(conn)
+    results = {}
+    for path in sorted(Path(queries_dir).glob("*.sql")):
+        sql = query_text(path, rollups)
+        lines = explain(conn, sql)
+        results[path.name] = (lines, plan_issues(lines, sql, table))
+    return results
+
+
+def format_report(results: dict) -> str:
+    out = []
+    for name, (lines, issues) in results.items():
+        out.append(f"{name}: {'OK' if not issues else 'CHECK (' + ', '.join(issues) + ')'}")
+        out.extend("    " + line for line in lines)
+        out.append("")
+    return "\n".join(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain indexes and report query plans for sql/queries.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--no-ensure", action="store_true",
+                        help="only report plans; do not create/drop indexes or run ANALYZE")
+    parser.add_argument("--check", action="store_true",
+                        help="exit with status 1 if any query still scans the table or sorts")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    if not args.no_ensure:
+        with conn:
+            changes = ensure_indexes(conn)
+        print(f"🗂️ Indexes created: {changes['created'] or 'none'}; dropped: {changes['dropped'] or 'none'}")
+    results = advise(conn)
+    conn.close()
+
+    report = format_report(results)
+    PLANS_REPORT.parent.mkdir(parents=True, exist_ok=True)
+    PLANS_REPORT.write_text(report, encoding="utf-8")
+    print(report)
+    print("📄 Plans saved to:", PLANS_REPORT)
+    if args.check and any(issues for _, issues in results.values()):
+        sys.exit(1)
@@ -0,0 +1,205 @@
+"""
+Single definition of the unified employee schema.
+
+Drives ensure_cols() in clean_data.py, the SQLite DDL in sql/create_schema.sql,
+and the dtype/usecols passed to every read of employees_unified.csv.
+Low-cardinality text columns are categoricals and numerics are downcast
+(Int16 age, float32 bonus/score/experience) to keep frames small.
+
+Run directly to regenerate sql/create_schema.sql, or with --report to compare
+the in-memory size of the unified dataset with and without these dtypes.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.lazy_imports import lazy_import  # noqa: E402
+
+# The schema constants are read by SQL-only tools that never build a frame
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+SCHEMA_SQL = BASE_DIR / "sql" / "create_schema.sql"
+UNIFIED_CSV = BASE_DIR / "data" / "processed" / "employees_unified.csv"
+
+TABLE = "employees"
+PRIMARY_KEY = "employee_id"
+PROVENANCE_COLUMN = "source_file"
+# Key/value table kept by the SQLite loader; load_generation grows on every data change
+META_TABLE = "etl_meta"
+
+# (column, pandas dtype, SQLite type) in canonical order
+COLUMNS = [
+    ("employee_id", "string", "TEXT"),
+    ("first_name", "category", "TEXT"),
+    ("age", "Int16", "INTEGER"),
+    ("gender", "category", "TEXT"),
+    ("department", "category", "TEXT"),
+    ("job_level", "category", "TEXT"),
+    ("years_experience", "float32", "REAL"),
+    # salary stays float64: totals and averages over millions of rows need the precision
+    ("salary", "float64", "REAL"),
+    ("bonus_percent", "float32", "REAL"),
+    ("performance_score", "float32", "REAL"),
+    ("source_file", "category", "TEXT"),
+]
+
+# Secondary indexes (name, columns) for the sql/queries workload, built after
+# bulk loads; see src/etl/index_advisor.py for the plans they produce. Names
+# carry INDEX_PREFIX: the advisor only ever drops indexes with that prefix
+# (or one of its RETIRED_INDEXES), never ones added by hand
+INDEX_PREFIX = "idx_auto_"
+INDEXES = [
+    # Department/gender rollups (aggregates.py rebuild and --check, ad-hoc GROUP BYs):
+    # GROUP BY department over salary and GROUP BY gender, both covered by the index
+    ("idx_auto_department_salary", ["department", "salary"]),
+    ("idx_auto_gender", ["gender"]),
+    # top_performers.sql: ORDER BY ... LIMIT 10 walks the index instead of sorting
+    ("idx_auto_performance_salary", ["performance_score DESC", "salary DESC"]),
+]
+# Names the loader used before INDEX_PREFIX; still removed from existing databases
+RETIRED_INDEXES = [
+    "idx_employees_department",
+    "idx_employees_department_salary",
+    "idx_employees_gender",
+    "idx_employees_performance_salary",
+]
+
+COLUMN_NAMES = [name for name, _, _ in COLUMNS]
+DTYPES = {name: dtype for name, dtype, _ in COLUMNS}
+SQL_TYPES = {name: sql_type for name, _, sql_type in COLUMNS}
+
+# Columns every raw source is mapped onto (provenance is added by the ETL)
+SOURCE_COLUMNS = [c for c in COLUMN_NAMES if c != PROVENANCE_COLUMN]
+NUMERIC_COLUMNS = [c for c in COLUMN_NAMES if SQL_TYPES[c] in ("INTEGER", "REAL")]
+CATEGORICAL_COLUMNS = [c for c in COLUMN_NAMES if DTYPES[c] == "category"]
+
+
+def read_csv_kwargs(columns: list = None) -> dict:
+    """usecols/dtype keyword arguments for pd.read_csv of the unified CSV."""
+    columns = COLUMN_NAMES if columns is None else [c for c in COLUMN_NAMES if c in columns]
+    return {"usecols": columns, "dtype": {c: DTYPES[c] for c in columns}}
+
+
+def _to_int(s: pd.Series, dtype: str) -> pd.Series:
+    """Nullable integer cast that turns fractional or out-of-range values into NA."""
+    info = np.iinfo(dtype.lower())
+    s = pd.to_numeric(s, errors="coerce")
+    return s.where(s.between(info.min, info.max) & (s % 1 == 0)).astype(dtype)
+
+
+def apply_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the schema columns present in df to their compact dtypes."""
+    df = df.copy()
+    for col in df.columns.intersection(COLUMN_NAMES):
+        dtype = DTYPES[col]
+        s = df[col]
+        if str(s.dtype) == dtype:
+            continue
+        if dtype.startswith("Int"):
+            df[col] = _to_int(s, dtype)
+        elif dtype.startswith("float"):
+            df[col] = pd.to_numeric(s, errors="coerce").astype(dtype)
+        elif dtype == "string" and pd.api.types.is_float_dtype(s) and (s.dropna() % 1 == 0).all():
+            # Numeric IDs read with NaNs become floats; keep "2724", not "2724.0"
+            df[col] = s.astype("Int64").astype("string")
+        else:
+            df[col] = s.astype(dtype)
+    return df
+
+
+def widen_float(s: pd.Series) -> pd.Series:
+    """
+    A float32 column as float64 holding the same shortest decimal (7.98, not
+    7.980000019073486); other columns are returned unchanged.
+    """
+    if s.dtype != "float32":
+        return s
+    return pd.to_numeric(s.astype(str), errors="coerce")
+
+
+def widen_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    df with its float32 columns widened by widen_float(), for writers such as
+    SQLite that only store doubles and for statistics that must match the
+    float64 values the CSV holds.
+    """
+    df = df.copy()
+    for col in df.select_dtypes(include="float32").columns:
+        df[col] = widen_float(df[col])
+    return df
+
+
+def widen_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    df with the dtypes a plain read_csv of the CSV gives, for reports that
+    must not change with the compact load dtypes: float32 columns widened
+    (widen_floats) and columns without any value as float64.
+    """
+    df = widen_floats(df)
+    for col in df.columns[df.isna().all()] if len(df) else []:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = np.nan
+    return df
+
+
+def create_table_sql(table: str = TABLE, extra: list = (), if_not_exists: bool = False) -> str:
+    """CREATE TABLE statement for SQLite generated from COLUMNS (plus extra column definitions)."""
+    lines = [
+        f"{name} {sql_type}{' PRIMARY KEY' if name == PRIMARY_KEY else ''}"
+        for name, _, sql_type in COLUMNS
+    ] + list(extra)
+    create = "CREATE TABLE IF NOT EXISTS" if if_not_exists else "CREATE TABLE"
+    return f"{create} {table} (\n" + ",\n".join(lines) + "\n);"
+
+
+def create_index_sql(table: str = TABLE, rename=None) -> list:
+    """
+    CREATE INDEX statements for INDEXES on the given table; rename maps a
+    column name to the one the table uses (e.g. star_schema.fact_column).
+    """
+    statements = []
+    for name, cols in INDEXES:
+        if rename is not None:
+            cols = [" ".join([rename(col.split()[0])] + col.split()[1:]) for col in cols]
+        statements.append(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(cols)});")
+    return statements
+
+
+def write_schema_sql(path: Path = SCHEMA_SQL):
+    path.write_text("-- Simple create for employees (for other DBs)\n"
+                    "-- Generated from src/etl/schema.py; edit COLUMNS and INDEXES there, not here.\n"
+                    + create_table_sql() + "\n" + "\n".join(create_index_sql()) + "\n", encoding="utf-8")
+    return path
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> str:
+    """Per-column memory_usage(deep=True) comparison of two frames."""
+    b = before.memory_usage(deep=True, index=False)
+    a = after.memory_usage(deep=True, index=False)
+    lines = [f"{'column':<20}{'before':>12}{'after':>12}  dtype"]
+    for col in before.columns:
+        lines.append(f"{col:<20}{b[col] / 1024:>10.1f}KB{a.get(col, 0) / 1024:>10.1f}KB  "
+                     f"{before[col].dtype} -> {after[col].dtype if col in after else '-'}")
+    saved = 1 - a.sum() / b.sum() if b.sum() else 0
+    lines.append(f"{'total':<20}{b.sum() / 1024 ** 2:>10.2f}MB{a.sum() / 1024 ** 2:>10.2f}MB  "
+                 f"({saved:.0%} smaller)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Employee schema utilities.")
+    parser.add_argument("--report", action="store_true",
+                        help="print a memory_usage(deep=True) before/after report for the unified CSV")
+    args = parser.parse_args()
+
+    if args.report:
+        before = pd.read_csv(UNIFIED_CSV)
+        after = pd.read_csv(UNIFIED_CSV, **read_csv_kwargs())
+        print(memory_report(before, after))
+    else:
+        print("📄 Wrote", write_schema_sql())
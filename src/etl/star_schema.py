@@ -0,0 +1,244 @@
+"""
+Star-schema layout of the employees data.
+
+department, gender, job_level and source_file are stored once in dimension
+tables (dim_<column>: id INTEGER PRIMARY KEY, name TEXT UNIQUE) and the
+narrow fact table employee_facts holds integer <column>_id keys in their
+place. A view named employees joins them back into the wide column layout,
+so sql/queries and every other reader keep working unchanged.
+
+to_sql.py --layout star bulk-loads this layout; --upsert, the rollups in
+aggregates.py and index_advisor.py detect it with is_star(). Dimension ids
+are never reused or renumbered, so they stay stable across star loads; a
+wide-layout load drops the dimension tables along with the fact table.
+
+Run directly with --benchmark to load the processed CSV (repeated --scale
+times) in both layouts and compare database size and query latency.
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+PROCESSED = BASE_DIR / "data" / "processed" / "employees_unified.csv"
+QUERIES_DIR = BASE_DIR / "sql" / "queries"
+BENCHMARK_REPORT = BASE_DIR / "outputs" / "reports" / "star_schema_benchmark.txt"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.schema import COLUMN_NAMES, COLUMNS, PRIMARY_KEY, TABLE  # noqa: E402
+from src.lazy_imports import lazy_import  # noqa: E402
+
+pd = lazy_import("pandas")
+
+FACT_TABLE = "employee_facts"
+# Low-cardinality text column -> dimension table
+DIMENSIONS = {
+    "department": "dim_department",
+    "gender": "dim_gender",
+    "job_level": "dim_job_level",
+    "source_file": "dim_source_file",
+}
+
+
+def fact_column(column: str) -> str:
+    """Column of the fact table that stores a wide-layout column."""
+    return f"{column}_id" if column in DIMENSIONS else column
+
+
+FACT_COLUMNS = [fact_column(c) for c in COLUMN_NAMES]
+
+
+def column_expr(column: str, row: str) -> str:
+    """SQL expression for a wide-layout column of fact row `row` (e.g. NEW)."""
+    if column in DIMENSIONS:
+        return f"(SELECT name FROM {DIMENSIONS[column]} WHERE id = {row}.{fact_column(column)})"
+    return f"{row}.{column}"
+
+
+def key_expr(column: str, row: str) -> str:
+    """SQL expression giving the dimension id of wide-layout column value `row`.column."""
+    if column in DIMENSIONS:
+        return f"(SELECT id FROM {DIMENSIONS[column]} WHERE name = {row}.{column})"
+    return f"{row}.{column}"
+
+
+def create_dimensions_sql() -> list:
+    return [f"CREATE TABLE IF NOT EXISTS {dim} (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+            for dim in DIMENSIONS.values()]
+
+
+def create_fact_sql(table: str = FACT_TABLE) -> str:
+    """CREATE TABLE statement for the fact table, generated from schema.COLUMNS."""
+    lines = []
+    for name, _, sql_type in COLUMNS:
+        if name in DIMENSIONS:
+            lines.append(f"{fact_column(name)} INTEGER REFERENCES {DIMENSIONS[name]}(id)")
+        else:
+            lines.append(f"{name} {sql_type}{' PRIMARY KEY' if name == PRIMARY_KEY else ''}")
+    return f"CREATE TABLE {table} (\n" + ",\n".join(lines) + "\n);"
+
+
+def create_view_sql(view: str = TABLE) -> str:
+    """Compatibility view with the wide employees columns, in schema order."""
+    columns = [f"{DIMENSIONS[c]}.name AS {c}" if c in DIMENSIONS else f"{FACT_TABLE}.{c}" for c in COLUMN_NAMES]
+    joins = [f"LEFT JOIN {dim} ON {dim}.id = {FACT_TABLE}.{fact_column(c)}" for c, dim in DIMENSIONS.items()]
+    return f"CREATE VIEW {view} AS SELECT {', '.join(columns)} FROM {FACT_TABLE} " + " ".join(joins)
+
+
+def is_star(conn: sqlite3.Connection, view: str = TABLE) -> bool:
+    """True when `view` is the compatibility view over the fact table."""
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (view,)).fetchone()
+    return row is not None and row[0] == "view"
+
+
+def drop_layout(conn: sqlite3.Connection, table: str = TABLE, dimensions: bool = False):
+    """
+    Drop the employees table or view and the fact table (with their triggers
+    and indexes). Dimension tables are kept so their ids stay stable across
+    star loads; pass dimensions=True when loading the wide layout over a star.
+    """
+    kind = "VIEW" if is_star(conn, table) else "TABLE"
+    conn.execute(f"DROP {kind} IF EXISTS {table}")
+    conn.execute(f"DROP TABLE IF EXISTS {FACT_TABLE}")
+    if dimensions:
+        for dim in DIMENSIONS.values():
+            conn.execute(f"DROP TABLE IF EXISTS {dim}")
+
+
+def add_dimension_values(conn: sqlite3.Connection, source: str):
+    """Insert the dimension values of a wide-layout table (e.g. temp.incoming) not seen yet."""
+    for column, dim in DIMENSIONS.items():
+        conn.execute(f"INSERT OR IGNORE INTO {dim} (name) SELECT DISTINCT {column} FROM {source} "
+                     f"WHERE {column} IS NOT NULL")
+
+
+class DimensionEncoder:
+    """Replace dimension values in DataFrame chunks by their ids, adding new values as they appear."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        for statement in create_dimensions_sql():
+            conn.execute(statement)
+        self.ids = {column: dict(conn.execute(f"SELECT name, id FROM {dim}")) for column, dim in DIMENSIONS.items()}
+
+    def encode(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Chunk with FACT_COLUMNS; call inside the transaction that inserts it."""
+        out = chunk.copy()
+        for column, dim in DIMENSIONS.items():
+            ids = self.ids[column]
+            new = [v for v in chunk[column].dropna().unique() if v not in ids]
+            if new:
+                self.conn.executemany(f"INSERT OR IGNORE INTO {dim} (name) VALUES (?)", [(v,) for v in new])
+                ids.update(self.conn.execute(f"SELECT name, id FROM {dim}"))
+            out[column] = chunk[column].map(ids).astype("Int64")
+        return out.rename(columns={c: fact_column(c) for c in DIMENSIONS})
+
+
+# --- Benchmark ---
+# The rollup-free forms of the shipped aggregate queries, so grouping on
+# TEXT (wide) vs INTEGER keys (star) is measured, not the rollup lookups
+BENCHMARK_QUERIES = {
+    "avg_salary_by_dept (base table)": {
+        "wide": "SELECT department, ROUND(AVG(salary), 2) AS avg_salary, COUNT(*) AS headcount "
+                "FROM employees GROUP BY department ORDER BY avg_salary DESC",
+        "star": f"SELECT d.name AS department, ROUND(AVG(salary), 2) AS avg_salary, COUNT(*) AS headcount "
+                f"FROM {FACT_TABLE} f LEFT JOIN dim_department d ON d.id = f.department_id "
+                f"GROUP BY f.department_id ORDER BY avg_salary DESC",
+    },
+    "gender_distribution (base table)": {
+        "wide": "SELECT gender, COUNT(*) AS total FROM employees GROUP BY gender ORDER BY gender",
+        "star": f"SELECT g.name AS gender, COUNT(*) AS total FROM {FACT_TABLE} f "
+                f"LEFT JOIN dim_gender g ON g.id = f.gender_id GROUP BY f.gender_id ORDER BY gender",
+    },
+    "headcount by department x job_level": {
+        "wide": "SELECT department, job_level, COUNT(*) FROM employees GROUP BY department, job_level",
+        "star": f"SELECT d.name, j.name, COUNT(*) FROM {FACT_TABLE} f "
+                f"LEFT JOIN dim_department d ON d.id = f.department_id "
+                f"LEFT JOIN dim_job_level j ON j.id = f.job_level_id "
+                f"GROUP BY f.department_id, f.job_level_id",
+    },
+}
+
+
+def _scaled_csv(csv_path: Path, scale: int, out: Path) -> Path:
+    """csv_path repeated `scale` times with suffixed employee ids."""
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    parts = []
+    for i in range(scale):
+        part = df.copy()
+        part[PRIMARY_KEY] = part[PRIMARY_KEY] + f"_{i}" if i else part[PRIMARY_KEY]
+        parts.append(part)
+    pd.concat(parts).to_csv(out, index=False)
+    return out
+
+
+def _time_query(db_path: Path, sql: str, repeat: int) -> tuple:
+    """Median seconds and result of running sql `repeat` times on a fresh read-only connection."""
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    times, rows = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        times.append(time.perf_counter() - start)
+    conn.close()
+    return statistics.median(times), rows
+
+
+def benchmark(csv_path: Path = PROCESSED, scale: int = 100, repeat: int = 5,
+              queries_dir: Path = QUERIES_DIR) -> str:
+    """Load csv_path (x scale) in both layouts and compare size and query latency."""
+    from src.etl.to_sql import LOAD_PRAGMAS, bulk_load, connect
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        csv = _scaled_csv(csv_path, scale, tmp / "scaled.csv") if scale > 1 else Path(csv_path)
+        dbs, sizes, rows = {}, {}, 0
+        for layout in ("wide", "star"):
+            dbs[layout] = tmp / f"{layout}.db"
+            conn = connect(dbs[layout], LOAD_PRAGMAS)
+            rows = bulk_load(conn, csv, layout=layout)
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.close()
+            sizes[layout] = dbs[layout].stat().st_size
+
+        cases = {p.name: {"wide": p.read_text(encoding="utf-8")} for p in sorted(Path(queries_dir).glob("*.sql"))}
+        for case in cases.values():
+            case["star"] = case["wide"]
+        cases.update(BENCHMARK_QUERIES)
+
+        lines = [f"Rows: {rows:,} (processed CSV x {scale})",
+                 f"Database size: wide {sizes['wide'] / 1024 ** 2:,.1f} MB, star {sizes['star'] / 1024 ** 2:,.1f} MB "
+                 f"({1 - sizes['star'] / sizes['wide']:.0%} smaller)", "",
+                 f"{'query':<40}{'wide ms':>10}{'star ms':>10}{'speedup':>9}  result"]
+        for name, sql in cases.items():
+            wide_s, wide_rows = _time_query(dbs["wide"], sql["wide"], repeat)
+            star_s, star_rows = _time_query(dbs["star"], sql["star"], repeat)
+            same = sorted(map(repr, wide_rows)) == sorted(map(repr, star_rows))
+            lines.append(f"{name:<40}{wide_s * 1000:>10.2f}{star_s * 1000:>10.2f}"
+                         f"{wide_s / max(star_s, 1e-9):>8.2f}x  {'same' if same else 'DIFFERENT'}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Star-schema layout utilities.")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compare database size and query latency of the wide and star layouts")
+    parser.add_argument("--csv", type=Path, default=PROCESSED, help="processed CSV to load")
+    parser.add_argument("--scale", type=int, default=100, help="times the CSV is repeated for --benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (median is reported)")
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.error("nothing to do; to_sql.py --layout star loads this layout, --benchmark compares it")
+    report = benchmark(args.csv, args.scale, args.repeat)
+    BENCHMARK_REPORT.parent.mkdir(parents=True, exist_ok=True)
+    BENCHMARK_REPORT.write_text(report + "\n", encoding="utf-8")
+    print(report)
+    print("📄 Benchmark saved to:", BENCHMARK_REPORT)
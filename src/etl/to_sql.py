@@ -1,32 +1,337 @@
 """
 Load processed CSV into SQLite and run example queries
+
+The default bulk load creates the employees table from src/etl/schema.py (so
+the PRIMARY KEY and column types survive), applies load-time pragmas, streams
+the CSV in chunks into a staging table with executemany (one transaction per
+chunk), then swaps the staging table in atomically and builds the indexes
+(index_advisor.ensure_indexes, followed by ANALYZE) and the rollup tables
+(aggregates.install).
+
+--upsert syncs the existing table instead: one transaction applies
+INSERT ... ON CONFLICT(employee_id) DO UPDATE for new and changed rows only
+(a per-row content hash, kept in employees_row_hash, detects unchanged rows)
+and --delete-missing removes rows no longer in the CSV. A table without the
+employee_id key (written by --pandas or an older loader) is first rebuilt
+with it in the same transaction.
+
+--layout star loads the star-schema layout instead (src/etl/star_schema.py):
+dimension tables with integer keys, the narrow employee_facts table, and a
+view named employees with the usual columns. Loading one layout drops the
+other's tables; --upsert keeps whichever layout the database has.
+
+--pandas runs the previous df.to_sql() path for comparison.
 """
 from pathlib import Path
+import argparse
 import sqlite3
+import sys
+import time
+import uuid
 import pandas as pd
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 DB_PATH = BASE_DIR / 'data' / 'employee_data.db'
 PROCESSED = BASE_DIR / 'data' / 'processed' / 'employees_unified.csv'
 
-if not PROCESSED.exists():
-    raise FileNotFoundError(f"Processed file not found: {PROCESSED}\nRun clean_data.py first.")
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.column_store import load_unified  # noqa: E402
+from src.etl.aggregates import install as install_rollups  # noqa: E402
+from src.etl.index_advisor import ensure_indexes  # noqa: E402
+from src.etl.star_schema import (  # noqa: E402
+    FACT_COLUMNS, FACT_TABLE, DimensionEncoder, add_dimension_values, create_fact_sql, create_view_sql,
+    drop_layout, is_star, key_expr,
+)
+from src.etl.schema import (  # noqa: E402
+    COLUMN_NAMES, META_TABLE, PRIMARY_KEY, SQL_TYPES, TABLE, create_table_sql, widen_floats,
+)
+
+DEFAULT_CHUNKSIZE = 100_000
 
-# Load
-df = pd.read_csv(PROCESSED)
-conn = sqlite3.connect(DB_PATH)
-df.to_sql('employees', conn, if_exists='replace', index=False)
-print('Loaded', len(df), 'rows into', DB_PATH)
+# Durability is traded for speed while loading: a crashed load is simply rerun
+LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -256 * 1024,  # negative = KiB, i.e. 256 MB
+    "temp_store": "MEMORY",
+    "wal_autocheckpoint": 0,  # checkpoint once after the load, not every 1000 pages
+}
 
-# Example query
-q = '''
-SELECT department, COUNT(*) AS total, ROUND(AVG(salary),2) AS avg_salary
-FROM employees
-GROUP BY department
+# Upserts modify the live table in place, so they keep crash-safe syncs
+UPSERT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -256 * 1024,
+}
+
+# Dtypes that bind straight to SQLite values (floats parsed directly to float64)
+SQL_READ_DTYPES = {"TEXT": "str", "INTEGER": "Int64", "REAL": "float64"}
+
+EXAMPLE_QUERY = '''
+SELECT department, headcount AS total, ROUND(avg_salary,2) AS avg_salary
+FROM dept_salary_stats
 ORDER BY total DESC
 LIMIT 10;
 '''
 
-print(pd.read_sql(q, conn))
-conn.close()
 
+def connect(db_path: Path = DB_PATH, pragmas: dict = None) -> sqlite3.Connection:
+    """Autocommit connection (transactions are explicit) with the given pragmas applied."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for name, value in (pragmas or {}).items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def read_chunks(csv_path: Path = PROCESSED, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Yield the processed CSV in chunks typed for SQLite binding."""
+    dtype = {c: SQL_READ_DTYPES[SQL_TYPES[c]] for c in COLUMN_NAMES}
+    yield from pd.read_csv(csv_path, usecols=COLUMN_NAMES, dtype=dtype, chunksize=chunksize)
+
+
+def row_hashes(chunk: pd.DataFrame) -> list:
+    """Signed 64-bit content hash of every row (all schema columns)."""
+    return pd.util.hash_pandas_object(chunk[COLUMN_NAMES], index=False).to_numpy().view("int64").tolist()
+
+
+def to_rows(chunk: pd.DataFrame, with_hash: bool = False, columns: list = COLUMN_NAMES):
+    """Row tuples of Python values (None for missing) in `columns` order, plus the row hash if asked."""
+    values = []
+    for col in columns:
+        s = chunk[col]
+        # float NaN binds as NULL in SQLite, so float columns need no conversion
+        values.append(s.tolist() if s.dtype == "float64" else s.to_numpy(dtype=object, na_value=None).tolist())
+    if with_hash:
+        values.append(row_hashes(chunk))
+    return zip(*values)
+
+
+def bump_load_generation(conn: sqlite3.Connection) -> int:
+    """
+    Increment the load_generation counter in META_TABLE (inside the caller's
+    transaction) so result caches keyed on it are invalidated by the commit.
+    A fresh load_id (UUID) is written alongside it: a database that is deleted
+    and rebuilt restarts at the same generation but never reuses an ID.
+    """
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value INTEGER)")
+    conn.execute(
+        f"INSERT INTO {META_TABLE} VALUES ('load_generation', 1) "
+        f"ON CONFLICT(key) DO UPDATE SET value = value + 1"
+    )
+    conn.execute(f"INSERT OR REPLACE INTO {META_TABLE} VALUES ('load_id', ?)", (str(uuid.uuid4()),))
+    return conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = 'load_generation'").fetchone()[0]
+
+
+def hash_table_sql(table: str) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {table} ({PRIMARY_KEY} TEXT PRIMARY KEY, row_hash INTEGER NOT NULL)"
+
+
+def bulk_load(conn: sqlite3.Connection, csv_path: Path = PROCESSED, table: str = TABLE,
+              chunksize: int = DEFAULT_CHUNKSIZE, layout: str = "wide") -> int:
+    """
+    Replace `table` with the contents of csv_path and return the row count.
+    With layout="star", `table` becomes a view over the fact table instead.
+    Readers keep seeing the old table until the final swap commits.
+    """
+    star = layout == "star"
+    target, columns = (FACT_TABLE, FACT_COLUMNS) if star else (table, COLUMN_NAMES)
+    stage, hashes, hash_stage = f"{target}__load", f"{table}_row_hash", f"{table}_row_hash__load"
+    insert = f"INSERT INTO {stage} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    for name in (stage, hash_stage):
+        conn.execute(f"DROP TABLE IF EXISTS {name}")
+    conn.execute(create_fact_sql(stage) if star else create_table_sql(stage))
+    conn.execute(hash_table_sql(hash_stage))
+    encoder = DimensionEncoder(conn) if star else None
+
+    rows = 0
+    for chunk in read_chunks(csv_path, chunksize):
+        conn.execute("BEGIN")
+        if star:
+            conn.executemany(insert, to_rows(encoder.encode(chunk), columns=columns))
+        else:
+            conn.executemany(insert, to_rows(chunk))
+        conn.executemany(f"INSERT OR REPLACE INTO {hash_stage} VALUES (?, ?)",
+                         zip(chunk[PRIMARY_KEY].tolist(), row_hashes(chunk)))
+        conn.execute("COMMIT")
+        rows += len(chunk)
+
+    conn.execute("BEGIN")
+    drop_layout(conn, table, dimensions=not star)
+    conn.execute(f"DROP TABLE IF EXISTS {hashes}")
+    conn.execute(f"ALTER TABLE {stage} RENAME TO {target}")
+    conn.execute(f"ALTER TABLE {hash_stage} RENAME TO {hashes}")
+    if star:
+        conn.execute(create_view_sql(table))
+    ensure_indexes(conn, table)
+    install_rollups(conn, table, rebuild_all=True)
+    bump_load_generation(conn)
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return rows
+
+
+def has_primary_key(conn: sqlite3.Connection, table: str = TABLE) -> bool:
+    """True when `table` is keyed on PRIMARY_KEY alone (as ON CONFLICT(employee_id) requires)."""
+    keyed = [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[5]]
+    if keyed == [PRIMARY_KEY]:
+        return True
+    for _, index, unique, *_ in conn.execute(f"PRAGMA index_list({table})"):
+        if unique and [row[2] for row in conn.execute(f"PRAGMA index_info({index})")] == [PRIMARY_KEY]:
+            return True
+    return False
+
+
+def rekey_table(conn: sqlite3.Connection, table: str = TABLE):
+    """
+    Rebuild a table written without the schema's PRIMARY KEY (e.g. by --pandas
+    or an older loader) through a keyed staging table, inside the caller's
+    transaction. Rows sharing an employee_id collapse to the last one, and the
+    row hashes are dropped since that table was not loaded through them.
+    """
+    present = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if PRIMARY_KEY not in present:
+        raise RuntimeError(f"{table} has no {PRIMARY_KEY} column; rerun to_sql.py without --upsert to rebuild it")
+    stage = f"{table}__rekey"
+    conn.execute(f"DROP TABLE IF EXISTS {stage}")
+    conn.execute(create_table_sql(stage))
+    conn.execute(
+        f"INSERT OR REPLACE INTO {stage} ({', '.join(COLUMN_NAMES)}) "
+        f"SELECT {', '.join(c if c in present else 'NULL' for c in COLUMN_NAMES)} FROM {table} "
+        f"WHERE {PRIMARY_KEY} IS NOT NULL ORDER BY rowid"
+    )
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {stage} RENAME TO {table}")
+    conn.execute(f"DROP TABLE IF EXISTS {table}_row_hash")
+
+
+def upsert_load(conn: sqlite3.Connection, csv_path: Path = PROCESSED, table: str = TABLE,
+                chunksize: int = DEFAULT_CHUNKSIZE, delete_missing: bool = False) -> dict:
+    """
+    Sync `table` with csv_path in a single transaction and return counts of
+    inserted, updated, unchanged and deleted rows. A star-layout database is
+    synced through its fact and dimension tables. Readers keep seeing the
+    previous snapshot until the commit.
+    """
+    hashes = f"{table}_row_hash"
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        star = is_star(conn, table)
+        if star:
+            target, columns = FACT_TABLE, FACT_COLUMNS
+            values = [key_expr(c, "temp.incoming") for c in COLUMN_NAMES]
+        else:
+            target, columns = table, COLUMN_NAMES
+            values = COLUMN_NAMES
+            conn.execute(create_table_sql(table, if_not_exists=True))
+            if not has_primary_key(conn, table):
+                rekey_table(conn, table)
+        conn.execute(hash_table_sql(hashes))
+        # Rollup triggers see every insert, update and delete below
+        install_rollups(conn, table)
+        conn.execute("DROP TABLE IF EXISTS temp.incoming")
+        conn.execute(create_table_sql("temp.incoming", extra=["row_hash INTEGER NOT NULL"]))
+
+        insert = f"INSERT OR REPLACE INTO temp.incoming VALUES ({', '.join('?' * (len(COLUMN_NAMES) + 1))})"
+        for chunk in read_chunks(csv_path, chunksize):
+            conn.executemany(insert, to_rows(chunk, with_hash=True))
+        total = conn.execute("SELECT COUNT(*) FROM temp.incoming").fetchone()[0]
+        if star:
+            add_dimension_values(conn, "temp.incoming")
+
+        inserted = conn.execute(
+            f"SELECT COUNT(*) FROM temp.incoming i "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {target} e WHERE e.{PRIMARY_KEY} = i.{PRIMARY_KEY})"
+        ).fetchone()[0]
+        deleted = 0
+        if delete_missing:
+            deleted = conn.execute(
+                f"DELETE FROM {target} WHERE {PRIMARY_KEY} NOT IN (SELECT {PRIMARY_KEY} FROM temp.incoming)"
+            ).rowcount
+            conn.execute(f"DELETE FROM {hashes} WHERE {PRIMARY_KEY} NOT IN (SELECT {PRIMARY_KEY} FROM temp.incoming)")
+
+        # Unchanged rows (same hash, still present) are dropped from the batch
+        unchanged = conn.execute(
+            f"DELETE FROM temp.incoming WHERE row_hash = "
+            f"(SELECT h.row_hash FROM {hashes} h WHERE h.{PRIMARY_KEY} = temp.incoming.{PRIMARY_KEY}) "
+            f"AND EXISTS (SELECT 1 FROM {target} e WHERE e.{PRIMARY_KEY} = temp.incoming.{PRIMARY_KEY})"
+        ).rowcount
+
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != PRIMARY_KEY)
+        conn.execute(
+            f"INSERT INTO {target} ({', '.join(columns)}) SELECT {', '.join(values)} FROM temp.incoming WHERE true "
+            f"ON CONFLICT({PRIMARY_KEY}) DO UPDATE SET {updates}"
+        )
+        conn.execute(
+            f"INSERT INTO {hashes} SELECT {PRIMARY_KEY}, row_hash FROM temp.incoming WHERE true "
+            f"ON CONFLICT({PRIMARY_KEY}) DO UPDATE SET row_hash = excluded.row_hash"
+        )
+        conn.execute("DROP TABLE temp.incoming")
+        ensure_indexes(conn, table)
+        if total - unchanged or deleted:
+            bump_load_generation(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return {
+        "inserted": inserted,
+        "updated": total - inserted - unchanged,
+        "unchanged": unchanged,
+        "deleted": deleted,
+    }
+
+
+def pandas_load(conn: sqlite3.Connection, csv_path: Path = PROCESSED, table: str = TABLE) -> int:
+    """Previous load path: df.to_sql replaces the table (dropping the schema's key and types)."""
+    df = widen_floats(load_unified(csv_path))
+    with conn:
+        drop_layout(conn, table, dimensions=True)
+    df.to_sql(table, conn, if_exists='replace', index=False)
+    with conn:
+        install_rollups(conn, table, rebuild_all=True)
+        bump_load_generation(conn)
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the processed CSV into SQLite.")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--csv", type=Path, default=PROCESSED, help="processed CSV to load")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="rows read and inserted per transaction")
+    parser.add_argument("--upsert", action="store_true",
+                        help="sync the existing table in one transaction instead of replacing it")
+    parser.add_argument("--delete-missing", action="store_true",
+                        help="with --upsert, delete rows that are no longer in the processed CSV")
+    parser.add_argument("--layout", choices=("wide", "star"), default="wide",
+                        help="bulk load one wide table or the star schema (dimension tables + fact table + view)")
+    parser.add_argument("--pandas", action="store_true",
+                        help="use the old df.to_sql() path (for throughput comparison)")
+    args = parser.parse_args()
+
+    if not args.csv.exists():
+        raise FileNotFoundError(f"Processed file not found: {args.csv}\nRun clean_data.py first.")
+
+    # Load
+    start = time.perf_counter()
+    if args.pandas:
+        conn = sqlite3.connect(args.db)
+        rows = pandas_load(conn, args.csv)
+    elif args.upsert:
+        conn = connect(args.db, UPSERT_PRAGMAS)
+        counts = upsert_load(conn, args.csv, chunksize=args.chunksize, delete_missing=args.delete_missing)
+        rows = counts["inserted"] + counts["updated"] + counts["unchanged"]
+        print(", ".join(f"{name}: {n:,}" for name, n in counts.items()))
+    else:
+        conn = connect(args.db, LOAD_PRAGMAS)
+        rows = bulk_load(conn, args.csv, chunksize=args.chunksize, layout=args.layout)
+        # Back to durable writes for anything else on this connection
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+    elapsed = time.perf_counter() - start
+    print(f'{"Synced" if args.upsert else "Loaded"} {rows:,} rows into {args.db} in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)')
+
+    # Example query
+    print(pd.read_sql(EXAMPLE_QUERY, conn))
+    conn.close()
@@ -0,0 +1,180 @@
+"""
+Declarative, vectorized validation of normalized employee records.
+
+Each rule is evaluated as one boolean mask over a whole frame (or chunk) —
+there are no per-row Python loops:
+
+- <column>:not_numeric   a value is present but does not parse as a number
+- <column>:out_of_range  a number falls outside RANGES
+- <column>:not_allowed   a category is not in ALLOWED
+- performance_score:scale  a 0–100 score in a column declared as 0–10
+
+Rows failing any rule are moved to a quarantine file together with a
+semicolon-separated list of reason codes and their raw (uncoerced) values;
+the remaining rows are coerced to the schema dtypes. RuleStats records rows,
+failures and time per rule so slow rules show up in the run output.
+"""
+from pathlib import Path
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+QUARANTINE_CSV = BASE_DIR / "data" / "processed" / "quarantine.csv"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.etl.schema import COLUMN_NAMES, NUMERIC_COLUMNS, apply_dtypes  # noqa: E402
+
+REASON_COLUMN = "reason"
+QUARANTINE_COLUMNS = COLUMN_NAMES + [REASON_COLUMN]
+
+# Canonical performance scale; sources on another scale are rescaled to it
+PERFORMANCE_SCALE = 10
+
+# Inclusive (min, max) per numeric column, on the canonical scale
+RANGES = {
+    "age": (16, 80),
+    "years_experience": (0, 60),
+    "salary": (1, 10_000_000),
+    "bonus_percent": (0, 100),
+    "performance_score": (0, PERFORMANCE_SCALE),
+}
+
+ALLOWED = {
+    "gender": {"Male", "Female", "Other"},
+    "job_level": {"Entry", "Mid", "Senior", "Lead"},
+    "department": {
+        "Business Development", "Client Services", "Distribution", "Engineering",
+        "Finance", "HR", "Human Resources", "Legal", "Marketing", "Operations",
+        "Product", "Sales",
+    },
+}
+
+
+class RuleStats:
+    """Rows checked, rows failed and seconds spent per rule, mergeable across chunks."""
+
+    def __init__(self):
+        self.rules = {}
+
+    def add(self, rule: str, rows: int, failed: int, seconds: float):
+        entry = self.rules.setdefault(rule, [0, 0, 0.0])
+        entry[0] += rows
+        entry[1] += failed
+        entry[2] += seconds
+
+    def merge(self, other: "RuleStats"):
+        for rule, (rows, failed, seconds) in other.rules.items():
+            self.add(rule, rows, failed, seconds)
+        return self
+
+    @property
+    def seconds(self) -> float:
+        return sum(seconds for _, _, seconds in self.rules.values())
+
+    def report(self) -> str:
+        lines = [f"{'rule':<34}{'rows':>12}{'failed':>9}{'ms':>9}{'rows/s':>14}"]
+        for rule, (rows, failed, seconds) in self.rules.items():
+            rate = f"{rows / seconds:,.0f}" if seconds else "-"
+            lines.append(f"{rule:<34}{rows:>12,}{failed:>9,}{seconds * 1000:>9.1f}{rate:>14}")
+        return "\n".join(lines)
+
+
+def _timed(stats: RuleStats, rule: str, rows: int, check):
+    start = time.perf_counter()
+    mask = np.asarray(check(), dtype=bool)
+    stats.add(rule, rows, int(mask.sum()), time.perf_counter() - start)
+    return mask
+
+
+def validate(df: pd.DataFrame, performance_scale: int = PERFORMANCE_SCALE) -> tuple:
+    """
+    Run every rule over df (raw values in the schema columns) and return
+    (valid rows cast to the schema dtypes, quarantined raw rows with a
+    reason column, RuleStats).
+    """
+    df = df.reset_index(drop=True)
+    n = len(df)
+    stats = RuleStats()
+    masks = {}
+    numbers = {}
+
+    for col in NUMERIC_COLUMNS:
+        raw = df[col]
+
+        def parse(raw=raw, col=col):
+            numbers[col] = pd.to_numeric(raw, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            return raw.notna().to_numpy() & np.isnan(numbers[col])
+        masks[f"{col}:not_numeric"] = _timed(stats, f"{col}:not_numeric", n, parse)
+
+    if performance_scale != PERFORMANCE_SCALE:
+        numbers["performance_score"] = numbers["performance_score"] * (PERFORMANCE_SCALE / performance_scale)
+    score = numbers["performance_score"]
+    masks["performance_score:scale"] = _timed(
+        stats, "performance_score:scale", n,
+        lambda: (score > PERFORMANCE_SCALE) & (score <= 100),
+    )
+
+    for col, (lo, hi) in RANGES.items():
+        v = numbers[col]
+        check = (lambda v=v, lo=lo, hi=hi: ~np.isnan(v) & ((v < lo) | (v > hi)))
+        if col == "performance_score":
+            # 0–100 scores are reported as a scale mismatch, not as out of range
+            check = (lambda c=check: c() & ~masks["performance_score:scale"])
+        masks[f"{col}:out_of_range"] = _timed(stats, f"{col}:out_of_range", n, check)
+
+    for col, allowed in ALLOWED.items():
+        raw = df[col]
+        masks[f"{col}:not_allowed"] = _timed(
+            stats, f"{col}:not_allowed", n,
+            lambda raw=raw, allowed=allowed: (raw.notna() & ~raw.isin(allowed)).to_numpy(),
+        )
+
+    bad = np.zeros(n, dtype=bool)
+    for mask in masks.values():
+        bad |= mask
+
+    clean = df.loc[~bad].copy()
+    for col in NUMERIC_COLUMNS:
+        clean[col] = numbers[col][~bad]
+    clean = apply_dtypes(clean).reset_index(drop=True)
+
+    rejected = df.loc[bad].copy()
+    reasons = np.full(int(bad.sum()), "", dtype=object)
+    for code, mask in masks.items():
+        reasons = reasons + np.where(mask[bad], code + ";", "")
+    rejected[REASON_COLUMN] = [r.rstrip(";") for r in reasons]
+    return clean, rejected.reset_index(drop=True), stats
+
+
+class Quarantine:
+    """Collects rejected rows into the quarantine CSV and totals their rule stats."""
+
+    def __init__(self, path: Path = QUARANTINE_CSV):
+        self.path = Path(path)
+        self.tmp = self.path.with_suffix(".csv.tmp")
+        self.stats = RuleStats()
+        self.rows = 0
+
+    def add(self, rejected: pd.DataFrame, stats: RuleStats = None):
+        if stats is not None:
+            self.stats.merge(stats)
+        if len(rejected):
+            rejected.reindex(columns=QUARANTINE_COLUMNS).to_csv(
+                self.tmp, mode="a" if self.rows else "w", header=not self.rows, index=False)
+            self.rows += len(rejected)
+
+    def close(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.rows:
+            pd.DataFrame(columns=QUARANTINE_COLUMNS).to_csv(self.tmp, index=False)
+        self.tmp.replace(self.path)
+
+    def summary(self) -> str:
+        if not self.stats.rules:
+            return f"🧪 Validation: sources unchanged, {self.rows:,} quarantined rows reused -> {self.path}"
+        checked = max(rows for rows, _, _ in self.stats.rules.values())
+        return (f"🧪 Validation: {checked:,} rows checked in {self.stats.seconds * 1000:,.1f} ms, "
+                f"{self.rows:,} quarantined -> {self.path}\n" + self.stats.report())
@@ -0,0 +1,64 @@
+"""
+Deferred imports for heavy optional-at-startup dependencies.
+
+    plt = lazy_import("matplotlib.pyplot")
+
+registers the module in sys.modules with importlib.util.LazyLoader, which
+runs the real import on first attribute access (plt.figure(...)), so entry
+points only pay for matplotlib, seaborn, scipy or pandas when a step that
+uses them runs. Parent packages are deferred the same way. load(module)
+runs the deferred import right away, e.g. before a timed region.
+Annotations that name a lazy module (df: pd.DataFrame) need
+`from __future__ import annotations` to stay unevaluated.
+
+src/analysis/startup_time.py measures entry-point import time against a budget.
+"""
+import importlib.util
+import sys
+import threading
+import types
+
+# LazyLoader (before Python 3.12) is not thread-safe: load() serializes first use
+_load_lock = threading.Lock()
+
+
+def _find_spec(name: str, path: list = None):
+    if path is None:
+        return importlib.util.find_spec(name)
+    for finder in sys.meta_path:
+        spec = finder.find_spec(name, path) if hasattr(finder, "find_spec") else None
+        if spec is not None:
+            return spec
+    return None
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Module `name`, imported on first attribute access (or by load())."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    parent_name, _, child = name.rpartition(".")
+    parent, path = None, None
+    if parent_name:
+        parent = lazy_import(parent_name)
+        # Read through ModuleType so a lazy parent is not loaded by the lookup
+        path = types.ModuleType.__getattribute__(parent, "__spec__").submodule_search_locations
+    spec = _find_spec(name, path)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    if parent is not None:
+        # As the import system does; kept when the parent loads later
+        setattr(parent, child, module)
+    return module
+
+
+def load(module: types.ModuleType) -> types.ModuleType:
+    """Run the deferred import of a lazy module now; returns the module."""
+    with _load_lock:
+        module.__spec__  # any attribute access runs the import
+    return module
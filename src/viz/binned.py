@@ -0,0 +1,208 @@
+"""
+Figures drawn from pre-aggregated bins instead of raw rows.
+
+sns.histplot(kde=True), boxplot, violinplot, scatterplot and pairplot hand
+every row to matplotlib (or to a KDE evaluated at every row), so at millions
+of rows they are slow, memory hungry and produce huge images. The helpers
+here reduce the data to NumPy aggregates in vectorized passes and draw only
+those:
+
+- histograms: np.histogram counts, drawn as seaborn bars
+- KDE curves: a Gaussian KDE over FINE_BINS bin centres weighted by their
+  counts, with the Scott bandwidth of the raw rows
+- box and violin shapes: percentiles plus a binned KDE per group
+- scatter and pairplot panels: np.histogram2d count grids (log colour scale)
+
+Drawing cost depends on the number of bins, not rows, and each helper keeps
+the look (colours, bandwidth, quartile lines, labels) of its seaborn
+counterpart.
+"""
+from colorsys import rgb_to_hls
+import numpy as np
+import pandas as pd
+from src.lazy_imports import lazy_import
+
+mpl = lazy_import("matplotlib")
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+stats = lazy_import("scipy.stats")
+
+# Row count from which the visualization scripts draw from bins by default
+LARGE_DATA_ROWS = 250_000
+FINE_BINS = 2048
+GRID_BINS = 120
+FLIER_BINS = 256
+
+
+def finite_values(s: pd.Series) -> np.ndarray:
+    """Values of a numeric column as float64, without missing or infinite values."""
+    v = s.to_numpy(dtype="float64", na_value=np.nan)
+    return v[np.isfinite(v)]
+
+
+def binned_kde(values: np.ndarray, gridsize: int = 200, cut: float = 0.0, bins: int = FINE_BINS) -> tuple:
+    """
+    (grid, density) of a Gaussian KDE of values, computed from a fine
+    histogram; the grid spans the data range extended by cut bandwidths.
+    Both are empty when values has fewer than two distinct values.
+    """
+    if len(values) < 2 or values.min() == values.max():
+        return np.empty(0), np.empty(0)
+    lo, hi = values.min(), values.max()
+    counts, edges = np.histogram(values, bins=bins, range=(lo, hi))
+    centers = (edges[:-1] + edges[1:]) / 2
+    occupied = counts > 0
+    # A scalar bw_method is the KDE factor: Scott's rule for the raw row count
+    kde = stats.gaussian_kde(centers[occupied], bw_method=len(values) ** -0.2, weights=counts[occupied])
+    bw = np.sqrt(kde.covariance[0, 0])
+    grid = np.linspace(lo - cut * bw, hi + cut * bw, gridsize)
+    return grid, kde(grid)
+
+
+def histplot(s: pd.Series, bins: int = 30, kde: bool = True, ax=None):
+    """sns.histplot(s, bins=bins, kde=kde) drawn from a histogram of s."""
+    ax = ax or plt.gca()
+    values = finite_values(s)
+    counts, edges = np.histogram(values, bins=bins)
+    # One weighted observation per bin reproduces seaborn's bars
+    sns.histplot(x=edges[:-1], weights=counts, bins=edges.tolist(), alpha=.5 if kde else .75, ax=ax)
+    if kde:
+        grid, density = binned_kde(values)
+        if len(grid):
+            color = ax.patches[-1].get_facecolor()[:3]
+            ax.plot(grid, density * len(values) * (edges[1] - edges[0]), color=color)
+    ax.set_xlabel(s.name)
+    return ax
+
+
+def boxplot(s: pd.Series, whis: float = 1.5, ax=None):
+    """
+    Horizontal sns.boxplot(x=s) drawn from percentiles. When there are more
+    than FLIER_BINS outliers, one marker is drawn per occupied outlier bin.
+    """
+    ax = ax or plt.gca()
+    values = finite_values(s)
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    lo, hi = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    inside = (values >= lo) & (values <= hi)
+    outliers = values[~inside]
+    if len(outliers) > FLIER_BINS:
+        counts, edges = np.histogram(outliers, bins=FLIER_BINS)
+        outliers = ((edges[:-1] + edges[1:]) / 2)[counts > 0]
+    box = {"med": med, "q1": q1, "q3": q3, "whislo": values[inside].min(), "whishi": values[inside].max(),
+           "fliers": outliers}
+    color = sns.desaturate(sns.color_palette()[0], .75)
+    line = _line_color([color])
+    lw = 1.25 * mpl.rcParams["patch.linewidth"]
+    line_kws = {"color": line, "linewidth": lw}
+    ax.bxp([box], positions=[0], widths=.8, vert=False, patch_artist=True,
+           boxprops={"facecolor": color, "edgecolor": line, "linewidth": lw},
+           whiskerprops=line_kws, capprops=line_kws, medianprops=line_kws,
+           flierprops={"markerfacecolor": line, "markeredgecolor": line, "marker": "d", "markersize": 5})
+    ax.set_yticks([])
+    ax.set_xlabel(s.name)
+    return ax
+
+
+def _line_color(colors: list) -> tuple:
+    """The grey seaborn draws violin and box outlines in for these fill colours."""
+    lum = min(rgb_to_hls(*mpl.colors.to_rgb(c))[1] for c in colors) * .6
+    return lum, lum, lum
+
+
+def violinplot(df: pd.DataFrame, x: str, y: str, palette=None, width: float = .8, cut: float = 2,
+               ax=None):
+    """sns.violinplot(x=x, y=y, data=df, inner="quartile") drawn from per-group binned KDEs."""
+    ax = ax or plt.gca()
+    groups = [(name, finite_values(g)) for name, g in df.groupby(x, observed=True, sort=True)[y]]
+    groups = [(name, v) for name, v in groups if len(v)]
+    colors = [sns.desaturate(c, .75) for c in sns.color_palette(palette, len(groups))]
+    line = _line_color(colors)
+    lw = 1.25 * mpl.rcParams["patch.linewidth"]
+    shapes = [binned_kde(v, gridsize=100, cut=cut) for _, v in groups]
+    # density_norm="area": one scale for all groups, so violin areas are equal
+    peak = max((d.max() for _, d in shapes if len(d)), default=1.0)
+    for i, ((_, v), (grid, density), color) in enumerate(zip(groups, shapes, colors)):
+        if not len(grid):
+            ax.plot([i - width / 2, i + width / 2], [v[0], v[0]], color=line, linewidth=lw)
+            continue
+        half = density / peak * width / 2
+        ax.fill_betweenx(grid, i - half, i + half, facecolor=color, edgecolor=line, linewidth=lw)
+        for q, dashes in zip(np.percentile(v, [25, 50, 75]), [(1.25, .75), (2.5, 1), (1.25, .75)]):
+            w = np.interp(q, grid, half)
+            ax.plot([i - w, i + w], [q, q], color=line, linewidth=lw, dashes=dashes)
+    ax.set_xticks(range(len(groups)), [str(name) for name, _ in groups])
+    ax.set_xlim(-.5, len(groups) - .5)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    return ax
+
+
+def _xy(x: pd.Series, y: pd.Series) -> tuple:
+    xv = x.to_numpy(dtype="float64", na_value=np.nan)
+    yv = y.to_numpy(dtype="float64", na_value=np.nan)
+    both = np.isfinite(xv) & np.isfinite(yv)
+    return xv[both], yv[both]
+
+
+def _draw_grid(ax, counts: np.ndarray, xedges: np.ndarray, yedges: np.ndarray, cmap: str):
+    return ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts.T, 0), cmap=cmap, norm=mpl.colors.LogNorm(),
+                         rasterized=True)
+
+
+def density_scatter(x: pd.Series, y: pd.Series, bins: int = GRID_BINS, cmap: str = "Blues", ax=None):
+    """sns.scatterplot(x=x, y=y) as a 2-D count grid, with a colour bar of rows per cell."""
+    ax = ax or plt.gca()
+    counts, xedges, yedges = np.histogram2d(*_xy(x, y), bins=bins)
+    mesh = _draw_grid(ax, counts, xedges, yedges, cmap)
+    plt.colorbar(mesh, ax=ax, label="Rows")
+    ax.set_xlabel(x.name)
+    ax.set_ylabel(y.name)
+    return ax
+
+
+def pairplot(df: pd.DataFrame, columns: list, bins: int = GRID_BINS, height: float = 2.5, cmap: str = "Blues"):
+    """
+    sns.pairplot(df[columns], diag_kind="kde") with 2-D count grids off the
+    diagonal and binned KDEs on it; returns the figure.
+    """
+    n = len(columns)
+    ranges, kdes, limits = {}, {}, {}
+    for c in columns:
+        v = finite_values(df[c])
+        ranges[c] = (v.min(), v.max()) if len(v) else (0.0, 1.0)
+        kdes[c] = binned_kde(v, cut=3)
+        # Data range plus matplotlib's default 5% margins
+        pad = .05 * (ranges[c][1] - ranges[c][0])
+        limits[c] = (ranges[c][0] - pad, ranges[c][1] + pad)
+    color = sns.color_palette()[0]
+    fig, axes = plt.subplots(n, n, figsize=(height * n, height * n), sharex="col", squeeze=False)
+    for i, row in enumerate(columns):
+        for j, col in enumerate(columns):
+            ax = axes[i, j]
+            if i == j:
+                grid, density = kdes[col]
+                # Density on a twin axis; the panel keeps the row's value axis like pairplot
+                kde_ax = ax.twinx()
+                # twinx() turns the panel's left ticks on; keep the style's setting
+                ax.tick_params(left=mpl.rcParams["ytick.left"])
+                if len(grid):
+                    kde_ax.fill_between(grid, density, color=color, alpha=.25, linewidth=0)
+                    kde_ax.plot(grid, density, color=color)
+                    ax.set_xlim(min(limits[col][0], grid[0]), max(limits[col][1], grid[-1]))
+                kde_ax.set_ylim(bottom=0)
+                kde_ax.axis("off")
+            else:
+                counts, xedges, yedges = np.histogram2d(*_xy(df[col], df[row]), bins=bins,
+                                                        range=[ranges[col], ranges[row]])
+                _draw_grid(ax, counts, xedges, yedges, cmap)
+            ax.set_ylim(*limits[row])
+            if i == n - 1:
+                ax.set_xlabel(col)
+            if j == 0:
+                ax.set_ylabel(row)
+            else:
+                ax.tick_params(labelleft=False)
+    sns.despine(fig=fig)
+    fig.tight_layout()
+    return fig
@@ -1,13 +1,43 @@
+"""
+Every chart the visualization scripts produce, declared once.
+
+Each Chart names its PNG, the columns it draws directly and the shared
+aggregations (functions below marked with @aggregation) it uses; the
+scripts pick charts by file name with select(). Run directly to render
+charts (all, or the named ones) from a single load of just the columns
+they need:
+
+    python src/viz/charts.py [salary_boxplot.png ...] [--refresh-plots] [--large-data always]
+"""
+import argparse
+import sys
+import time
+import warnings
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 PROCESSED = BASE_DIR / 'data' / 'processed' / 'employees_unified.csv'
 
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.lazy_imports import lazy_import  # noqa: E402
+from src.viz import binned  # noqa: E402
+from src.viz.plot_cache import PlotCache  # noqa: E402
+from src.viz.registry import (LARGE_DATA_MODES, OUTPUT_PLOTS, Chart, aggregation, load,  # noqa: E402
+                              needed_columns, render_charts)
+
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+
+PAIRPLOT_COLUMNS = ["age", "salary", "bonus_percent", "performance_score"]
+
+
 def plot_headcount_by_dept():
-    df = pd.read_csv(PROCESSED)
-    counts = df['department'].fillna('Unknown').value_counts().head(20)
+    from src.analysis.engine_router import aggregate
+    counts = aggregate('headcount_by_dept', csv_path=PROCESSED).fillna({'department': 'Unknown'})
+    counts = counts.set_index('department')['headcount'].head(20)
     plt.figure(figsize=(10,5))
     counts.plot.bar()
     plt.title('Headcount by Department')
@@ -16,5 +46,217 @@ def plot_headcount_by_dept():
     plt.tight_layout()
     plt.show()
 
+
+# -----------------------
+# Shared aggregations
+# -----------------------
+@aggregation("department", "salary")
+def avg_salary_by_department(df: pd.DataFrame) -> pd.Series:
+    return df.groupby("department")["salary"].mean().sort_values(ascending=False)
+
+
+@aggregation("gender")
+def gender_counts(df: pd.DataFrame) -> pd.Series:
+    return df["gender"].value_counts(dropna=True)
+
+
+@aggregation("department", "gender")
+def gender_by_department(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.crosstab(df["department"], df["gender"])
+
+
+@aggregation()
+def numeric_correlation(df: pd.DataFrame) -> pd.DataFrame:
+    return df.select_dtypes(include=[np.number]).corr()
+
+
+# -----------------------
+# Draw functions
+# -----------------------
+def _draw_salary_distribution(data):
+    plt.figure(figsize=(8, 5))
+    sns.histplot(data.frame["salary"].dropna(), bins=30, kde=True)
+    plt.title("Salary Distribution")
+    plt.xlabel("Salary")
+    plt.tight_layout()
+
+
+def _draw_salary_distribution_binned(data):
+    plt.figure(figsize=(8, 5))
+    binned.histplot(data.frame["salary"], bins=30, kde=True)
+    plt.title("Salary Distribution")
+    plt.xlabel("Salary")
+    plt.tight_layout()
+
+
+def _draw_salary_boxplot(data):
+    plt.figure(figsize=(6, 4))
+    sns.boxplot(x=data.frame["salary"].dropna())
+    plt.title("Salary Boxplot")
+    plt.tight_layout()
+
+
+def _draw_salary_boxplot_binned(data):
+    plt.figure(figsize=(6, 4))
+    binned.boxplot(data.frame["salary"])
+    plt.title("Salary Boxplot")
+    plt.tight_layout()
+
+
+def _draw_salary_vs_bonus(data):
+    plt.figure(figsize=(7, 5))
+    sns.scatterplot(x="bonus_percent", y="salary", data=data.frame, alpha=0.6)
+    plt.title("Salary vs Bonus Percent")
+    plt.tight_layout()
+
+
+def _draw_salary_vs_bonus_binned(data):
+    plt.figure(figsize=(7, 5))
+    binned.density_scatter(data.frame["bonus_percent"], data.frame["salary"])
+    plt.title("Salary vs Bonus Percent")
+    plt.tight_layout()
+
+
+def _draw_gender_distribution(data):
+    plt.figure(figsize=(6, 4))
+    vc = data.agg(gender_counts)
+    sns.barplot(x=vc.index, y=vc.values)
+    plt.title("Gender Distribution")
+    plt.ylabel("Count")
+    plt.tight_layout()
+
+
+def _draw_correlation_heatmap(data):
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(data.agg(numeric_correlation), annot=True, cmap="coolwarm", fmt=".3f")
+    plt.title("Correlation Heatmap (numeric features)")
+    plt.tight_layout()
+
+
+def _draw_pairplot(data):
+    sns.pairplot(data.frame[PAIRPLOT_COLUMNS], diag_kind="kde")
+
+
+def _draw_pairplot_binned(data):
+    binned.pairplot(data.frame, PAIRPLOT_COLUMNS)
+
+
+def _draw_salary_violin(data):
+    plt.figure(figsize=(10, 6))
+    sns.violinplot(x="department", y="salary", data=data.frame, inner="quartile", palette="cool")
+    plt.title("Salary Distribution by Department (violin)")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+
+
+def _draw_salary_violin_binned(data):
+    plt.figure(figsize=(10, 6))
+    binned.violinplot(data.frame, "department", "salary", palette="cool")
+    plt.title("Salary Distribution by Department (violin)")
+    plt.xticks(rotation=45, ha="right")
+    plt.tight_layout()
+
+
+def _draw_avg_salary_by_department(data):
+    # Departments in label order, as sns.barplot orders a categorical x
+    avg = data.agg(avg_salary_by_department).sort_index()
+    plt.figure(figsize=(8, 4))
+    sns.barplot(x=avg.index, y=avg.values, hue=avg.index, palette="coolwarm", legend=False)
+    plt.title("Average Salary by Department")
+    plt.xlabel("department")
+    plt.ylabel("salary")
+    plt.xticks(rotation=30)
+
+
+def _draw_team_avg_salary(data):
+    plt.figure(figsize=(10, 6))
+    data.agg(avg_salary_by_department).plot(kind="bar", color="skyblue")
+    plt.title("Average Salary by Department")
+    plt.ylabel("Average Salary")
+    plt.tight_layout()
+
+
+def _draw_team_gender(data):
+    # DataFrame.plot opens its own (default-size) figure
+    data.agg(gender_by_department).plot(kind="bar", stacked=True)
+    plt.title("Gender Distribution by Department")
+    plt.tight_layout()
+
+
+def _draw_gender_by_department(data):
+    data.agg(gender_by_department).plot(kind="bar", stacked=True, figsize=(10, 6))
+    plt.title("Gender Distribution by Department")
+    plt.xlabel("Department")
+    plt.ylabel("Count")
+    plt.tight_layout()
+
+
+# -----------------------
+# Registry
+# -----------------------
+CHARTS = [
+    Chart("salary_distribution.png", ("salary",), _draw_salary_distribution,
+          draw_binned=_draw_salary_distribution_binned),
+    Chart("salary_boxplot.png", ("salary",), _draw_salary_boxplot, draw_binned=_draw_salary_boxplot_binned),
+    Chart("salary_vs_bonus.png", ("salary", "bonus_percent"), _draw_salary_vs_bonus,
+          draw_binned=_draw_salary_vs_bonus_binned),
+    Chart("gender_distribution.png", (), _draw_gender_distribution, aggregations=(gender_counts,)),
+    Chart("correlation_heatmap.png", (), _draw_correlation_heatmap, aggregations=(numeric_correlation,),
+          numeric=True),
+    Chart("pairplot_relationships.png", tuple(PAIRPLOT_COLUMNS), _draw_pairplot, draw_binned=_draw_pairplot_binned),
+    Chart("salary_violin_by_department.png", ("department", "salary"), _draw_salary_violin,
+          draw_binned=_draw_salary_violin_binned),
+    Chart("avg_salary_by_department.png", (), _draw_avg_salary_by_department,
+          aggregations=(avg_salary_by_department,)),
+    Chart("team_avg_salary_by_department.png", (), _draw_team_avg_salary, aggregations=(avg_salary_by_department,)),
+    Chart("team_gender_distribution_by_department.png", (), _draw_team_gender,
+          aggregations=(gender_by_department,)),
+    Chart("gender_distribution_by_department.png", (), _draw_gender_by_department,
+          aggregations=(gender_by_department,)),
+]
+BY_NAME = {chart.filename: chart for chart in CHARTS}
+
+
+def select(*filenames) -> list:
+    """Registered charts by output file name, in the order given."""
+    unknown = [f for f in filenames if f not in BY_NAME]
+    if unknown:
+        raise KeyError(f"no registered chart for {unknown}; known: {sorted(BY_NAME)}")
+    return [BY_NAME[f] for f in filenames]
+
+
 if __name__ == '__main__':
-    plot_headcount_by_dept()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Render registered charts from one load of the columns they need.")
+    parser.add_argument("charts", nargs="*", help="output file names to render (default: all)")
+    parser.add_argument("--csv", type=Path, default=PROCESSED, help="unified CSV (or its column store) to chart")
+    parser.add_argument("--list", action="store_true", help="list the registered charts and exit")
+    parser.add_argument("--refresh-plots", action="store_true", help="redraw every chart, ignoring the plot cache")
+    parser.add_argument("--large-data", choices=list(LARGE_DATA_MODES), default="auto",
+                        help=f"draw distribution/scatter/pair plots from bins: auto (from "
+                             f"{binned.LARGE_DATA_ROWS:,} rows), always or never")
+    parser.add_argument("--headcount", action="store_true",
+                        help="show the headcount-by-department chart (SQLite or pandas via the engine router)")
+    args = parser.parse_args()
+
+    if args.headcount:
+        plot_headcount_by_dept()
+        sys.exit(0)
+    if args.list:
+        for chart in CHARTS:
+            print(f"{chart.filename:<46}{', '.join(chart.declared_columns()) or 'numeric columns'}")
+        sys.exit(0)
+
+    plt.switch_backend("Agg")
+    sns.set(style="whitegrid")
+    # Same as the visualization scripts: seaborn deprecation notices don't affect the PNGs
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    charts = select(*args.charts) if args.charts else CHARTS
+    start = time.perf_counter()
+    data = load(charts, args.csv)
+    print(f"📁 Loaded {len(data):,} rows × {len(needed_columns(charts))} columns "
+          f"({', '.join(needed_columns(charts))}) in {time.perf_counter() - start:.2f}s")
+    cache = PlotCache(enabled=not args.refresh_plots)
+    for chart, seconds in render_charts(charts, data, OUTPUT_PLOTS, cache, binned_from=LARGE_DATA_MODES[args.large_data]):
+        print(f"{chart.filename:<46}{'cached' if seconds is None else f'{seconds:.2f}s':>9}")
+    print(f"ℹ️ {cache.summary()}")
+    print(f"✅ Charts saved to {OUTPUT_PLOTS} in {time.perf_counter() - start:.2f}s")
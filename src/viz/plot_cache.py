@@ -0,0 +1,155 @@
+"""
+Content-addressed cache for rendered figures.
+
+A figure's fingerprint combines
+- a hash of exactly the columns it reads (pd.util.hash_pandas_object over
+  each column, plus its name and dtype), and
+- its spec: figure type and parameters (function_source(): the source of
+  the draw function, of the module-level helpers it calls and of the project
+  (src.*) modules it uses, e.g. src/viz/binned.py), the matplotlib
+  rcParams in effect (styling) and the matplotlib/seaborn/pandas/numpy
+  versions.
+
+Each output directory keeps a manifest (.plot_cache.json) mapping PNG name
+to fingerprint, PNG content hash and the seconds the render took. A figure
+is skipped when its fingerprint matches and the PNG on disk is the one that
+was written. Rendering itself lives in src/viz/registry.py (render_charts
+checks fresh() and records new PNGs with store()); summary() reports hits
+and the render time they saved.
+"""
+from pathlib import Path
+from importlib import metadata
+import hashlib
+import inspect
+import json
+import sys
+import weakref
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.lazy_imports import lazy_import  # noqa: E402
+
+matplotlib = lazy_import("matplotlib")
+
+MANIFEST_NAME = ".plot_cache.json"
+# rcParams that do not change the PNG
+_IGNORED_RC = {"backend", "backend_fallback", "interactive", "savefig.directory"}
+
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def column_hash(s: pd.Series) -> str:
+    """Vectorized content hash of one column (values, order, name and dtype)."""
+    values = pd.util.hash_pandas_object(s, index=False).to_numpy()
+    return _digest(s.name, s.dtype, np.ascontiguousarray(values).tobytes())
+
+
+def _source(fn) -> str:
+    try:
+        return inspect.getsource(fn)
+    except (OSError, TypeError):
+        # No source file (interactive session): fall back to the compiled code
+        code = fn.__code__
+        return repr((code.co_code, code.co_consts, code.co_names))
+
+
+def function_source(fn) -> str:
+    """
+    Source of fn, of the functions defined in its module that it references
+    by name and of the project modules (src.*) it references.
+    """
+    sources = [_source(fn)]
+    for name in fn.__code__.co_names:
+        helper = fn.__globals__.get(name)
+        if inspect.isfunction(helper) and helper.__module__ == fn.__module__ and helper is not fn:
+            sources.append(_source(helper))
+        elif inspect.ismodule(helper) and helper.__name__.startswith("src."):
+            sources.append(inspect.getsource(helper))
+    return "\n".join(sources)
+
+
+def style_fingerprint() -> str:
+    """Current rcParams (styling) and plotting library versions."""
+    rc = sorted((k, repr(v)) for k, v in matplotlib.rcParams.items() if k not in _IGNORED_RC)
+    # seaborn's installed version: a fully cached run never needs to import it
+    versions = (matplotlib.__version__, metadata.version("seaborn"), pd.__version__, np.__version__)
+    return _digest(rc, versions)
+
+
+class PlotCache:
+    """Skip re-rendering figures whose inputs and spec are unchanged."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = self.misses = 0
+        self.saved_seconds = self.render_seconds = 0.0
+        self._manifests = {}
+        # id(frame) -> (weak reference to the frame, {column: hash})
+        self._columns = {}
+
+    # --- fingerprints ---
+    def _column_hash(self, df: pd.DataFrame, col: str) -> str:
+        # Columns are hashed once per frame per run, however many figures read
+        # them. The weak reference tells a live frame from a new one that got
+        # the id of a collected frame
+        ref, hashes = self._columns.get(id(df), (None, None))
+        if ref is None or ref() is not df:
+            self._columns = {k: v for k, v in self._columns.items() if v[0]() is not None}
+            ref, hashes = weakref.ref(df), {}
+            self._columns[id(df)] = (ref, hashes)
+        if col not in hashes:
+            hashes[col] = column_hash(df[col])
+        return hashes[col]
+
+    def key(self, df: pd.DataFrame, columns: list, spec) -> str:
+        """Fingerprint of a figure reading `columns` of df, drawn as described by spec."""
+        return _digest([(c, self._column_hash(df, c)) for c in columns], spec, style_fingerprint())
+
+    # --- manifest ---
+    def _manifest(self, out_dir: Path) -> dict:
+        out_dir = Path(out_dir)
+        if out_dir not in self._manifests:
+            try:
+                self._manifests[out_dir] = json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._manifests[out_dir] = {}
+        return self._manifests[out_dir]
+
+    def fresh(self, path: Path, key: str) -> bool:
+        """True (and counted as a hit) when path holds the PNG last rendered for key."""
+        path = Path(path)
+        entry = self._manifest(path.parent).get(path.name)
+        if not self.enabled or entry is None or entry["key"] != key or not path.exists():
+            self.misses += 1
+            return False
+        if entry["png"] != _digest(path.read_bytes()):
+            self.misses += 1
+            return False
+        self.hits += 1
+        self.saved_seconds += entry["seconds"]
+        return True
+
+    def store(self, path: Path, key: str, seconds: float):
+        """Record a freshly rendered PNG."""
+        path = Path(path)
+        self.render_seconds += seconds
+        manifest = self._manifest(path.parent)
+        manifest[path.name] = {"key": key, "png": _digest(path.read_bytes()), "seconds": round(seconds, 4)}
+        tmp = path.parent / (MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(path.parent / MANIFEST_NAME)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return (f"Plot cache: {self.hits} of {total} figures unchanged (cache hits), "
+                f"~{self.saved_seconds:.2f}s of rendering saved; {self.render_seconds:.2f}s spent rendering "
+                f"{self.misses} figures")
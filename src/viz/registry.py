@@ -0,0 +1,186 @@
+"""
+Declarative chart registry.
+
+Each Chart (defined in src/viz/charts.py) declares the output PNG, the
+columns it draws directly, the shared aggregations it uses and its draw
+function(s). From that:
+
+- needed_columns() plans the load: the union of the columns the selected
+  charts read, so load() maps or parses only those;
+- ChartData memoizes aggregations per frame, so e.g. the average salary by
+  department is computed once however many charts (and reports) use it;
+- render_charts() draws the applicable charts, skipping the ones whose PNG
+  is current in the plot cache (src/viz/plot_cache.py).
+
+Aggregations are plain functions of the frame decorated with
+@aggregation(columns...); draw functions take a ChartData.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+import sys
+import time
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.lazy_imports import lazy_import  # noqa: E402
+from src.etl.column_store import load_unified  # noqa: E402
+from src.etl.schema import COLUMN_NAMES, NUMERIC_COLUMNS, UNIFIED_CSV  # noqa: E402
+from src.viz import binned  # noqa: E402
+from src.viz.plot_cache import PlotCache, function_source  # noqa: E402
+
+plt = lazy_import("matplotlib.pyplot")
+
+OUTPUT_PLOTS = BASE_DIR / "outputs" / "plots"
+# --large-data choice -> row count from which charts are drawn from bins (None: never)
+LARGE_DATA_MODES = {"auto": binned.LARGE_DATA_ROWS, "always": 0, "never": None}
+
+
+def aggregation(*columns):
+    """Mark fn(frame) as a shared aggregation reading `columns`."""
+    def mark(fn):
+        fn.columns = columns
+        return fn
+    return mark
+
+
+def clean_labels(s: pd.Series, lower: bool = False) -> pd.Series:
+    """
+    Strip (and optionally lower-case) text labels, like s.astype(str).str.strip(),
+    but only once per distinct value, returning a categorical for fast groupbys.
+    """
+    codes, uniques = pd.factorize(s, use_na_sentinel=False)
+    labels = pd.Index(uniques).astype(str).str.strip()
+    if lower:
+        labels = labels.str.lower()
+    new_codes, categories = pd.factorize(labels, sort=True)
+    return pd.Series(pd.Categorical.from_codes(new_codes[codes], categories=categories),
+                     index=s.index, name=s.name)
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame the charts draw from: canonical (lower-case) column names, stripped
+    department labels and lower-case gender. df itself is left unchanged.
+    """
+    df = df.rename(columns=lambda c: c.strip().lower().replace(" ", "_"))
+    labels = {}
+    if "gender" in df.columns:
+        labels["gender"] = clean_labels(df["gender"], lower=True)
+    if "department" in df.columns:
+        labels["department"] = clean_labels(df["department"])
+    return df.assign(**labels)
+
+
+class ChartData:
+    """A prepared frame plus the shared aggregations computed from it so far."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._aggregates = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def agg(self, fn):
+        """fn(frame), computed on first use and shared by every later caller."""
+        if fn not in self._aggregates:
+            self._aggregates[fn] = fn(self.frame)
+        return self._aggregates[fn]
+
+    def numeric_columns(self) -> list:
+        return self.frame.select_dtypes(include="number").columns.tolist()
+
+
+@dataclass
+class Chart:
+    """
+    One output PNG: draw(data) renders it from the columns and aggregations it
+    declares; draw_binned(data), when given, is used for large frames.
+    numeric charts also read every numeric column (correlation heatmap).
+    """
+    filename: str
+    columns: tuple
+    draw: object
+    aggregations: tuple = ()
+    numeric: bool = False
+    draw_binned: object = None
+
+    def declared_columns(self) -> list:
+        columns = list(self.columns)
+        for fn in self.aggregations:
+            columns += [c for c in fn.columns if c not in columns]
+        return columns
+
+    def reads(self, data: ChartData) -> list:
+        """Columns of data the chart reads (the plot cache fingerprints these)."""
+        columns = self.declared_columns()
+        if self.numeric:
+            columns += [c for c in data.numeric_columns() if c not in columns]
+        return columns
+
+    def applies(self, data: ChartData) -> bool:
+        if not set(self.declared_columns()).issubset(data.frame.columns):
+            return False
+        return not self.numeric or bool(data.numeric_columns())
+
+    def drawer(self, data: ChartData, binned_from: int = None):
+        if self.draw_binned is not None and binned_from is not None and len(data) >= binned_from:
+            return self.draw_binned
+        return self.draw
+
+    def cache_key(self, cache: PlotCache, data: ChartData, binned_from: int = None) -> str:
+        return cache.key(data.frame, self.reads(data), function_source(self.drawer(data, binned_from)))
+
+
+def needed_columns(charts: list) -> list:
+    """Columns to load for charts, in schema order."""
+    needed = set()
+    for chart in charts:
+        needed.update(chart.declared_columns())
+        if chart.numeric:
+            needed.update(NUMERIC_COLUMNS)
+    return [c for c in COLUMN_NAMES if c in needed]
+
+
+def load(charts: list, path: Path = UNIFIED_CSV) -> ChartData:
+    """Load only the columns charts need and prepare them for drawing."""
+    return ChartData(prepare_frame(load_unified(path, columns=needed_columns(charts))))
+
+
+def render_chart(chart: Chart, data: ChartData, out_dir: Path = OUTPUT_PLOTS, show: bool = False,
+                 binned_from: int = None) -> float:
+    """Draw and save one chart; returns the seconds drawing and saving took."""
+    t0 = time.perf_counter()
+    chart.drawer(data, binned_from)(data)
+    plt.savefig(Path(out_dir) / chart.filename)
+    seconds = time.perf_counter() - t0
+    if show:
+        plt.show()
+    plt.close("all")
+    return seconds
+
+
+def render_charts(charts: list, data: ChartData, out_dir: Path = OUTPUT_PLOTS, cache: PlotCache = None,
+                  show: bool = False, binned_from: int = LARGE_DATA_MODES["auto"]) -> list:
+    """
+    Render the applicable charts, skipping those current in cache. Returns
+    (chart, seconds) per applicable chart; seconds is None for cache hits.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for chart in charts:
+        if not chart.applies(data):
+            continue
+        path = out_dir / chart.filename
+        key = chart.cache_key(cache, data, binned_from) if cache is not None else None
+        if cache is not None and cache.fresh(path, key):
+            results.append((chart, None))
+            continue
+        seconds = render_chart(chart, data, out_dir, show, binned_from)
+        if cache is not None:
+            cache.store(path, key, seconds)
+        results.append((chart, seconds))
+    return results
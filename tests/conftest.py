@@ -0,0 +1,83 @@
+"""
+Shared fixtures. Tests import the project the way the scripts do (src.* from
+the repository root) and never touch data/ or outputs/: every fixture works
+on copies under pytest's tmp_path.
+"""
+from functools import partial
+from pathlib import Path
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+
+@pytest.fixture
+def etl_env(tmp_path, monkeypatch):
+    """clean_data.py pointed at a copy of data/raw and a scratch processed directory."""
+    from src.etl import clean_data
+
+    raw = tmp_path / "raw"
+    shutil.copytree(BASE_DIR / "data" / "raw", raw)
+    processed = tmp_path / "processed"
+    monkeypatch.setattr(clean_data, "RAW_DIR", raw)
+    monkeypatch.setattr(clean_data, "PROCESSED_DIR", processed)
+    monkeypatch.setattr(clean_data, "MANIFEST_PATH", processed / "manifest.json")
+    monkeypatch.setattr(clean_data, "INTERMEDIATE_DIR", processed / "intermediate")
+    monkeypatch.setattr(clean_data, "LINKAGE_REPORT", processed / "dedupe_decisions.csv")
+    monkeypatch.setattr(clean_data, "SOURCES_FILE", raw / "sources.json")
+    monkeypatch.setattr(clean_data, "REGISTRY_DB", processed / "id_registry.db")
+    monkeypatch.setattr(clean_data, "Quarantine", partial(clean_data.Quarantine, processed / "quarantine.csv"))
+    processed.mkdir()
+    return clean_data
+
+
+@pytest.fixture
+def unified_csv(tmp_path):
+    """A small unified CSV with a missing and a non-ASCII employee_id."""
+    df = pd.DataFrame({
+        "employee_id": ["1001", None, "GEN_1000", "Zoë-名", "1002"],
+        "first_name": ["Ann", "Bob", None, "Zoë", "Ann"],
+        "age": [25, None, 40, 33, 51],
+        "gender": ["Female", "Male", "Other", None, "Female"],
+        "department": ["HR", "Sales", "HR", "Finance", None],
+        "job_level": ["Entry", "Mid", None, "Lead", "Senior"],
+        "years_experience": [1.5, 3, None, 10, 29],
+        "salary": [50000.5, 62000, 71000, None, 99000],
+        "bonus_percent": [7.98, 5, 12.25, None, 3.3],
+        "performance_score": [9, 7.5, None, 8, 6],
+        "source_file": ["a.csv", "a.csv", "b.csv", "b.csv", "a.csv"],
+    })
+    path = tmp_path / "employees_unified.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def employees_csv(tmp_path):
+    """A seeded 400-row unified CSV, large enough for the statistics and charts."""
+    rng = np.random.default_rng(7)
+    n = 400
+    df = pd.DataFrame({
+        "employee_id": [f"E{i:04d}" for i in range(n)],
+        "first_name": rng.choice(["Ann", "Bob", "Cy", "Dee"], n),
+        "age": rng.integers(21, 65, n).astype(float),
+        "gender": rng.choice(["Female", "male ", "Other"], n),
+        "department": rng.choice(["HR", " Sales", "Finance", "IT"], n),
+        "job_level": rng.choice(["Entry", "Mid", "Senior", "Lead"], n),
+        "years_experience": rng.integers(0, 40, n).astype(float),
+        "salary": rng.normal(70000, 15000, n).round(2),
+        "bonus_percent": rng.uniform(0, 20, n).round(2),
+        "performance_score": rng.uniform(1, 10, n).round(1),
+        "source_file": rng.choice(["a.csv", "b.csv"], n),
+    })
+    df.loc[::37, "salary"] = None
+    df.loc[::53, "department"] = None
+    path = tmp_path / "employees_unified.csv"
+    df.to_csv(path, index=False)
+    return path
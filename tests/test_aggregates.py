@@ -0,0 +1,91 @@
+import pytest
+
+from src.etl import aggregates, to_sql
+from src.etl.schema import TABLE
+from src.etl.star_schema import DIMENSIONS, FACT_TABLE, is_star
+
+
+@pytest.fixture(params=["wide", "star"])
+def conn(request, tmp_path, unified_csv):
+    conn = to_sql.connect(tmp_path / "employees.db")
+    to_sql.bulk_load(conn, unified_csv, layout=request.param)
+    yield conn
+    conn.close()
+
+
+def departments(conn) -> dict:
+    return {row[0]: row[1] for row in conn.execute(f"SELECT department, headcount FROM {aggregates.DEPT_VIEW}")}
+
+
+def test_bulk_load_builds_rollups_matching_the_base_table(conn):
+    assert aggregates.has_views(conn)
+    assert aggregates.check(conn) == []
+    assert departments(conn) == {"HR": 2, "Sales": 1, "Finance": 1, None: 1}
+
+
+def dimension_id(conn, column: str, value):
+    """Id of value in its dimension table (added if new); None stays NULL."""
+    if value is None:
+        return None
+    dim = DIMENSIONS[column]
+    conn.execute(f"INSERT OR IGNORE INTO {dim} (name) VALUES (?)", (value,))
+    return conn.execute(f"SELECT id FROM {dim} WHERE name = ?", (value,)).fetchone()[0]
+
+
+def insert(conn, employee_id: str, department, gender, salary: float):
+    if is_star(conn):
+        conn.execute(f"INSERT INTO {FACT_TABLE} (employee_id, department_id, gender_id, salary) VALUES (?, ?, ?, ?)",
+                     (employee_id, dimension_id(conn, "department", department),
+                      dimension_id(conn, "gender", gender), salary))
+    else:
+        conn.execute(f"INSERT INTO {TABLE} (employee_id, department, gender, salary) VALUES (?, ?, ?, ?)",
+                     (employee_id, department, gender, salary))
+
+
+def move(conn, employee_id: str, department):
+    if is_star(conn):
+        conn.execute(f"UPDATE {FACT_TABLE} SET department_id = ? WHERE employee_id = ?",
+                     (dimension_id(conn, "department", department), employee_id))
+    else:
+        conn.execute(f"UPDATE {TABLE} SET department = ? WHERE employee_id = ?", (department, employee_id))
+
+
+def test_triggers_keep_empty_and_missing_departments_apart(conn):
+    with conn:
+        insert(conn, "e1", "", "", 10)
+        insert(conn, "e2", None, None, 20)
+    assert departments(conn) == {"HR": 2, "Sales": 1, "Finance": 1, None: 2, "": 1}
+    genders = dict(conn.execute(f"SELECT gender, total FROM {aggregates.GENDER_VIEW}").fetchall())
+    assert genders[""] == 1 and genders[None] == 2
+
+    with conn:
+        move(conn, "e1", "HR")
+        conn.execute(f"DELETE FROM {FACT_TABLE if is_star(conn) else TABLE} WHERE employee_id = 'e2'")
+    assert departments(conn) == {"HR": 3, "Sales": 1, "Finance": 1, None: 1}
+    assert aggregates.check(conn) == []
+
+
+def test_check_reports_drift_and_rebuild_repairs_it(conn):
+    with conn:
+        conn.execute(f"UPDATE {aggregates.DEPT_SUMMARY} SET headcount = 7 WHERE department_key IS NULL")
+    assert aggregates.check(conn) == [(aggregates.DEPT_SUMMARY, None, "headcount", 7, 1)]
+    with conn:
+        assert aggregates.install(conn, rebuild_all=True)
+    assert aggregates.check(conn) == []
+
+
+def test_rollups_defined_differently_are_recreated(conn):
+    with conn:
+        conn.execute(f"DROP VIEW {aggregates.DEPT_VIEW}")
+        conn.execute(f"DROP TABLE {aggregates.DEPT_SUMMARY}")
+        # The earlier layout: '' stood for a missing department
+        conn.execute(f"CREATE TABLE {aggregates.DEPT_SUMMARY} (department_key TEXT PRIMARY KEY, headcount INTEGER, "
+                     f"salary_count INTEGER, salary_sum REAL, salary_sumsq REAL)")
+        conn.execute(f"CREATE VIEW {aggregates.DEPT_VIEW} AS SELECT NULLIF(department_key, '') AS department "
+                     f"FROM {aggregates.DEPT_SUMMARY}")
+    with conn:
+        assert aggregates.install(conn)
+    assert aggregates.check(conn) == []
+    assert departments(conn)[None] == 1
+    with conn:
+        assert not aggregates.install(conn)
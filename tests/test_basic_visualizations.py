@@ -0,0 +1,36 @@
+import time
+
+import pytest
+
+from src.viz.plot_cache import PlotCache
+from src.viz.registry import ChartData
+from visualizations import basic_visualizations_1 as bv1
+
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    """basic_visualizations_1 writing to tmp_path, headless and without the plot cache."""
+    monkeypatch.setattr(bv1, "OUTPUT_PLOTS", tmp_path / "plots")
+    monkeypatch.setattr(bv1, "OUTPUT_REPORTS", tmp_path / "reports")
+    monkeypatch.setattr(bv1, "PLOT_CACHE", PlotCache(enabled=False))
+    bv1._setup_outputs()
+    bv1.plt.switch_backend("Agg")
+    return tmp_path
+
+
+def pngs(directory) -> dict:
+    return {p.name: p.read_bytes() for p in directory.glob("*.png")}
+
+
+# --- batch rendering (user-020) ---
+def test_batch_renders_the_same_pngs_as_serial(outputs, employees_csv, monkeypatch):
+    data = ChartData(bv1.load_data(employees_csv))
+    bv1._render_figures(bv1.FIGURES, data, show=False)
+    serial = pngs(outputs / "plots")
+    assert len(serial) == len(bv1.FIGURES)
+
+    monkeypatch.setattr(bv1, "OUTPUT_PLOTS", outputs / "batch")
+    bv1._setup_outputs()
+    pool = bv1.start_batch_render(ChartData(data.frame), workers=2, path=employees_csv)
+    bv1.finish_batch_render(*pool, wall_start=time.perf_counter())
+    assert pngs(outputs / "batch") == serial
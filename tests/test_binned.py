@@ -0,0 +1,79 @@
+import matplotlib.pyplot as plt
+from matplotlib import cbook
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+import seaborn as sns
+
+from src.viz import binned
+from src.viz.charts import CHARTS
+from src.viz.registry import ChartData, prepare_frame, render_charts
+
+plt.switch_backend("Agg")
+
+
+@pytest.fixture
+def salaries() -> pd.Series:
+    rng = np.random.default_rng(3)
+    return pd.Series(np.concatenate([rng.normal(60000, 9000, 20000), rng.normal(95000, 5000, 5000)]),
+                     name="salary")
+
+
+@pytest.fixture(autouse=True)
+def close_figures():
+    yield
+    plt.close("all")
+
+
+def test_finite_values_drops_missing_and_infinite_values():
+    s = pd.Series([1.5, None, np.inf, 2.5], dtype="float32")
+    assert binned.finite_values(s).tolist() == [1.5, 2.5]
+    assert binned.finite_values(pd.Series([1, None], dtype="Int64")).tolist() == [1.0]
+
+
+def test_binned_kde_matches_the_kde_of_the_rows(salaries):
+    values = salaries.to_numpy()
+    grid, density = binned.binned_kde(values)
+    exact = stats.gaussian_kde(values)(grid)
+    assert np.abs(density - exact).max() < 0.01 * exact.max()
+    assert binned.binned_kde(np.array([5.0, 5.0])) == (pytest.approx([]), pytest.approx([]))
+
+
+def test_histogram_bars_match_seaborn(salaries):
+    binned.histplot(salaries, bins=30)
+    ours = [p.get_height() for p in plt.gca().patches]
+    plt.figure()
+    sns.histplot(salaries, bins=30, kde=True)
+    assert ours == pytest.approx([p.get_height() for p in plt.gca().patches])
+
+
+def test_box_has_the_quartiles_and_whiskers_of_the_rows(salaries):
+    with_outliers = pd.concat([salaries, pd.Series(np.linspace(2e5, 3e5, 1000))], ignore_index=True)
+    binned.boxplot(with_outliers)
+    [expected] = cbook.boxplot_stats(with_outliers.to_numpy())
+    ax = plt.gca()
+    median = ax.lines[4].get_xdata()[0]
+    whiskers = sorted(line.get_xdata()[1] for line in ax.lines[:2])
+    assert median == pytest.approx(expected["med"])
+    assert whiskers == pytest.approx([expected["whislo"], expected["whishi"]])
+    # 1,000 outliers are drawn as at most FLIER_BINS markers
+    assert 0 < len(ax.lines[5].get_xdata()) <= binned.FLIER_BINS
+
+
+def test_density_grids_count_every_complete_row():
+    df = pd.DataFrame({"a": [1.0, 2.0, None, 4.0, 5.0], "b": [1.0, np.inf, 3.0, 4.0, 2.0]})
+    binned.density_scatter(df["a"], df["b"], bins=4)
+    mesh = plt.gca().collections[0]
+    assert mesh.get_array().sum() == 3
+    fig = binned.pairplot(df, ["a", "b"], bins=4)
+    assert len(fig.axes) >= 4
+
+
+def test_every_large_data_chart_renders_from_bins(employees_csv, tmp_path):
+    data = ChartData(prepare_frame(pd.read_csv(employees_csv)))
+    charts = [c for c in CHARTS if c.draw_binned is not None]
+    assert charts
+    results = render_charts(charts, data, tmp_path, binned_from=0)
+    assert len(results) == len(charts)
+    assert all((tmp_path / c.filename).stat().st_size for c in charts)
@@ -0,0 +1,114 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.etl.clean_data import SeenKeys
+
+
+def read_unified(clean_data) -> pd.DataFrame:
+    return pd.read_csv(clean_data.PROCESSED_DIR / "employees_unified.csv")
+
+
+# --- streaming mode (user-001) ---
+def test_seen_keys_keeps_first_occurrence_across_chunks():
+    seen = SeenKeys()
+    first = seen.first_seen(pd.Series(["a", "b", "a", "c"]))
+    assert first.tolist() == [True, True, False, True]
+    assert seen.first_seen(pd.Series(["c", "d", "d"])).tolist() == [False, True, False]
+    assert len(seen) == 4
+    assert seen.nbytes == 4 * 8
+
+
+def test_seen_keys_refuses_to_grow_past_its_cap():
+    seen = SeenKeys(max_bytes=3 * 8)
+    seen.first_seen(pd.Series(["a", "b", "c"]))
+    with pytest.raises(MemoryError, match="--external"):
+        seen.first_seen(pd.Series(["d"]))
+    # The failed chunk is not half-added
+    assert len(seen) == 3
+    assert seen.first_seen(pd.Series(["a"])).tolist() == [False]
+
+
+def test_stream_mode_matches_in_memory_mode(etl_env):
+    etl_env.main(link=False)
+    in_memory = read_unified(etl_env)
+    etl_env.stream_main(chunksize=700)
+    streamed = read_unified(etl_env)
+    assert len(streamed) == streamed["employee_id"].nunique()
+    pd.testing.assert_frame_equal(streamed, in_memory)
+
+
+def test_stream_mode_stops_when_key_index_exceeds_its_share(etl_env, monkeypatch):
+    # 3,000 distinct keys need 24 KB; allow ~10 KB of the 1 GB budget
+    monkeypatch.setattr(etl_env, "KEY_INDEX_BUDGET_SHARE", 1e-5)
+    with pytest.raises(MemoryError, match="seen-key index"):
+        etl_env.stream_main(chunksize=500, memory_budget_mb=1024)
+    assert not (etl_env.PROCESSED_DIR / "employees_unified.csv").exists()
+    assert not list(etl_env.PROCESSED_DIR.glob("*.tmp"))
+
+
+# --- raw-file manifest (user-002) ---
+def test_unchanged_sources_come_from_cached_intermediates(etl_env, capsys):
+    etl_env.main(link=False)
+    first = read_unified(etl_env)
+    capsys.readouterr()
+    etl_env.main(link=False)
+    assert capsys.readouterr().out.count("Unchanged, using cached intermediate") == len(etl_env.SOURCES)
+    pd.testing.assert_frame_equal(read_unified(etl_env), first)
+
+
+def test_touched_file_is_fresh_but_edited_file_is_not(etl_env):
+    etl_env.main(link=False)
+    manifest = etl_env.load_manifest()
+    touched, edited = etl_env.SOURCES[0], etl_env.SOURCES[1]
+
+    path = etl_env.RAW_DIR / touched.file
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert etl_env.is_fresh(touched, manifest)
+
+    path = etl_env.RAW_DIR / edited.file
+    path.write_text(path.read_text(encoding="utf-8").replace("Marketing", "Marketinq", 1), encoding="utf-8")
+    assert not etl_env.is_fresh(edited, manifest)
+
+
+def test_manifest_from_another_pipeline_version_is_ignored(etl_env, monkeypatch):
+    etl_env.main(link=False)
+    monkeypatch.setattr(etl_env, "PIPELINE_VERSION", etl_env.PIPELINE_VERSION + 1)
+    assert etl_env.load_manifest()["sources"] == {}
+
+
+# --- source registry and parallel ingestion (user-003) ---
+def test_sources_json_overrides_the_builtin_registry(etl_env):
+    etl_env.SOURCES_FILE.write_text(json.dumps([
+        {"file": "employees.csv", "renames": {"team": "department"}, "label": "legacy"},
+    ]), encoding="utf-8")
+    sources = etl_env.load_sources(etl_env.SOURCES_FILE)
+    assert [(s.file, s.label) for s in sources] == [("employees.csv", "legacy")]
+    assert "employee_id" not in sources[0].key_columns
+
+    etl_env.stream_main(sources=sources)
+    unified = read_unified(etl_env)
+    assert set(unified["source_file"]) == {"legacy"}
+    assert unified["department"].notna().any()
+
+
+def test_parallel_ingestion_matches_serial(etl_env):
+    etl_env.main(full=True, workers=1, link=False)
+    serial = read_unified(etl_env)
+    etl_env.main(full=True, workers=3, link=False)
+    pd.testing.assert_frame_equal(read_unified(etl_env), serial)
+
+
+# --- out-of-core merge (user-007) ---
+def test_external_mode_keeps_the_rows_of_in_memory_mode(etl_env):
+    etl_env.main(link=False)
+    in_memory = read_unified(etl_env)
+    etl_env.external_main(chunksize=700, partitions=4, workers=1)
+    external = read_unified(etl_env)
+    assert not list(etl_env.PROCESSED_DIR.glob("spill-*"))
+    # Grouped by partition instead of source order, but the same surviving rows
+    pd.testing.assert_frame_equal(external.sort_values("employee_id", ignore_index=True),
+                                  in_memory.sort_values("employee_id", ignore_index=True))
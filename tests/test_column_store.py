@@ -0,0 +1,51 @@
+import pandas as pd
+
+from src.etl import column_store
+from src.etl.column_store import (ColumnStoreWriter, is_fresh, load_store, load_unified, read_schema,
+                                  store_dir_for)
+from src.etl.schema import read_csv_kwargs
+
+
+def write_store_in_chunks(csv_path, rows_per_chunk: int = 2):
+    df = pd.read_csv(csv_path, **read_csv_kwargs())
+    writer = ColumnStoreWriter(store_dir_for(csv_path))
+    for start in range(0, len(df), rows_per_chunk):
+        writer.append(df.iloc[start:start + rows_per_chunk])
+    writer.close(csv_path)
+    return df
+
+
+def test_round_trip_matches_csv_values_and_dtypes(unified_csv):
+    from_csv = write_store_in_chunks(unified_csv)
+    assert is_fresh(unified_csv)
+    from_store = load_unified(unified_csv)
+    pd.testing.assert_frame_equal(from_store, from_csv)
+    assert from_store["employee_id"].dtype == "string"
+
+
+def test_text_columns_round_trip_without_pyarrow(unified_csv, monkeypatch):
+    monkeypatch.setattr(column_store, "_pyarrow", lambda: None)
+    from_csv = write_store_in_chunks(unified_csv)
+    from_store = load_store(unified_csv)
+    assert from_store["employee_id"].tolist() == from_csv["employee_id"].tolist()
+    assert from_store["employee_id"].dtype == "string"
+
+
+def test_schema_does_not_list_text_values(unified_csv):
+    write_store_in_chunks(unified_csv)
+    meta = {m["name"]: m for m in read_schema(unified_csv)["columns"]}
+    assert meta["employee_id"]["kind"] == "text"
+    assert "categories" not in meta["employee_id"]
+    assert meta["department"]["categories"] == ["Finance", "HR", "Sales"]
+
+
+def test_column_subset_and_stale_store_fall_back_to_csv(unified_csv, capsys):
+    write_store_in_chunks(unified_csv)
+    subset = load_unified(unified_csv, columns=["salary", "employee_id"])
+    assert set(subset.columns) == {"salary", "employee_id"}
+
+    unified_csv.write_text(unified_csv.read_text(encoding="utf-8").replace("Ann", "Anne"), encoding="utf-8")
+    assert not is_fresh(unified_csv)
+    reloaded = load_unified(unified_csv)
+    assert "stale" in capsys.readouterr().out
+    assert reloaded["first_name"].iloc[0] == "Anne"
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from src.etl.dedupe import link_records
+
+
+def records(*rows) -> pd.DataFrame:
+    """Records in one department and gender; each row is (employee_id, salary, age, source_file)."""
+    return pd.DataFrame({
+        "employee_id": [r[0] for r in rows],
+        "first_name": None,
+        "age": [r[2] for r in rows],
+        "gender": "Female",
+        "department": "HR",
+        "salary": [r[1] for r in rows],
+        "bonus_percent": 10.0,
+        "source_file": [r[3] for r in rows],
+    })
+
+
+def test_generated_record_merges_into_matching_natural_record():
+    df = records(("GEN_1", 60000, 30, "b.csv"), ("E1", 60100, None, "a.csv"), ("E9", 90000, 30, "a.csv"))
+    out, decisions = link_records(df)
+    assert out["employee_id"].tolist() == ["E1", "E9"]
+    # The earliest row survives, takes the natural ID and keeps its own fields
+    assert out["source_file"].tolist() == ["b.csv", "a.csv"]
+    assert out["age"].tolist() == [30, 30]
+    assert decisions[["kept_id", "dropped_id", "rule"]].values.tolist() == [["GEN_1", "E1", "near"]]
+
+
+def test_identical_natural_records_stay_distinct():
+    df = records(("E1", 60000, 30, "a.csv"), ("E2", 60000, 30, "b.csv"))
+    out, decisions = link_records(df)
+    assert out["employee_id"].tolist() == ["E1", "E2"]
+    assert decisions.empty
+
+
+def test_generated_record_does_not_chain_two_natural_ids():
+    df = records(("E1", 50000, 30, "a.csv"), ("GEN_1", 50100, 30, "b.csv"), ("E2", 50200, 30, "a.csv"))
+    out, decisions = link_records(df)
+    assert out["employee_id"].tolist() == ["E1", "E2"]
+    assert decisions[["kept_id", "dropped_id"]].values.tolist() == [["E1", "GEN_1"]]
+
+
+def test_exact_duplicates_under_a_generated_record_keep_natural_ids_apart():
+    df = records(("GEN_1", 50000, 30, "b.csv"), ("E1", 50000, 30, "a.csv"),
+                 ("GEN_2", 50000, 30, "c.csv"), ("E2", 50000, 30, "a.csv"))
+    out, decisions = link_records(df)
+    assert sorted(out["employee_id"]) == ["E1", "E2"]
+    assert set(decisions["rule"]) == {"exact"}
+    assert len(decisions) == 2
@@ -0,0 +1,70 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src.analysis import engine_router
+from src.analysis.engine_router import AGGREGATIONS, DEFAULT_ENGINE, EngineRouter, _normalized, equivalent
+from src.etl import to_sql
+
+
+@pytest.fixture
+def router(tmp_path, unified_csv):
+    db = tmp_path / "employees.db"
+    conn = to_sql.connect(db)
+    to_sql.bulk_load(conn, unified_csv)
+    conn.close()
+    return EngineRouter(db, unified_csv, tmp_path / "calibration.json", repeat=1)
+
+
+def test_engines_agree_on_every_aggregation(router):
+    entries = router.calibrate()
+    assert set(entries) == set(AGGREGATIONS)
+    assert all(e["equivalent"] for e in entries.values())
+    for name in AGGREGATIONS:
+        assert equivalent(AGGREGATIONS[name], router.aggregate(name, "sqlite"), router.aggregate(name, "pandas"))
+
+
+def test_normalized_sorts_missing_keys_last_whatever_the_dtype():
+    df = pd.DataFrame({"department": pd.Categorical(["Sales", None, "HR"]), "n": [1, 2, 3]})
+    out = _normalized(df, ["department"])
+    assert out["department"].tolist() == ["HR", "Sales", None]
+    assert out["n"].tolist() == [3, 1, 2]
+    mixed = pd.DataFrame({"gender": ["b", None, "a"], "n": [1.0, None, 3.0]})
+    assert _normalized(mixed, ["gender"])["n"].tolist() == [3.0, 1.0, None]
+
+
+def test_choose_uses_the_calibration_without_measuring(router, monkeypatch):
+    assert router.choose("headcount_by_dept") == DEFAULT_ENGINE
+    router.calibrate(["headcount_by_dept"])
+    entries = json.loads(router.calibration_path.read_text(encoding="utf-8"))
+    entries["headcount_by_dept"]["engine"] = "sqlite"
+    router.calibration_path.write_text(json.dumps(entries), encoding="utf-8")
+
+    def fail(*args):
+        raise AssertionError("routing ran an engine")
+
+    monkeypatch.setattr(engine_router, "_timed", fail)
+    assert router.choose("headcount_by_dept") == "sqlite"
+    assert EngineRouter(router.db_path, router.csv_path, router.calibration_path).choose("headcount_by_dept") \
+        == "sqlite"
+
+
+def test_calibration_is_stale_after_a_reload(router, unified_csv):
+    router.calibrate(["salary_overview"])
+    assert router.current_entry("salary_overview") is not None
+    conn = to_sql.connect(router.db_path)
+    to_sql.bulk_load(conn, unified_csv)
+    conn.close()
+    fresh = EngineRouter(router.db_path, router.csv_path, router.calibration_path)
+    assert fresh.current_entry("salary_overview") is None
+    assert fresh.choose("salary_overview") == DEFAULT_ENGINE
+
+
+def test_differing_results_route_to_pandas(router, tmp_path, capsys):
+    changed = tmp_path / "changed.csv"
+    pd.read_csv(router.csv_path).assign(salary=1.0).to_csv(changed, index=False)
+    entry = EngineRouter(router.db_path, changed, router.calibration_path, repeat=1).calibrate(["salary_overview"])
+    assert entry["salary_overview"]["equivalent"] is False
+    assert entry["salary_overview"]["engine"] == "pandas"
+    assert "results differ" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from src.etl.external_merge import external_merge, partition_of
+
+
+def chunks():
+    yield pd.DataFrame({"employee_id": ["1", "2", "3"], "source": "first"})
+    yield pd.DataFrame({"employee_id": ["3", "4", "1"], "source": "second"})
+    yield pd.DataFrame({"employee_id": ["4", "5", "1"], "source": "third"})
+
+
+def merged(tmp_path, **kwargs) -> pd.DataFrame:
+    parts = [df for df, _, _ in external_merge(chunks(), tmp_path / "spill", **kwargs)]
+    return pd.concat(parts, ignore_index=True)
+
+
+def test_each_id_keeps_its_first_row_in_source_order(tmp_path):
+    df = merged(tmp_path, partitions=3, workers=1)
+    assert df.set_index("employee_id")["source"].sort_index().to_dict() == {
+        "1": "first", "2": "first", "3": "first", "4": "second", "5": "third"}
+    assert "_seq" not in df.columns
+    assert not list((tmp_path / "spill").iterdir())
+
+
+def test_rows_keep_source_order_within_a_partition(tmp_path):
+    df = merged(tmp_path, partitions=1, workers=1)
+    assert df["employee_id"].tolist() == ["1", "2", "3", "4", "5"]
+
+
+def test_parallel_dedupe_matches_serial(tmp_path):
+    serial = merged(tmp_path / "serial", partitions=4, workers=1)
+    parallel = merged(tmp_path / "parallel", partitions=4, workers=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_every_copy_of_an_id_lands_in_the_same_partition():
+    ids = pd.Series(["7", "7", "8", "7"])
+    part = partition_of(ids, 16)
+    assert part[0] == part[1] == part[3]
+    assert ((part >= 0) & (part < 16)).all()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from src.etl.id_registry import FIRST_SEQ, IdRegistry, assign_ids, fingerprint
+
+KEYS = ["first_name", "department"]
+
+
+def people(*names) -> pd.DataFrame:
+    return pd.DataFrame({"employee_id": None, "first_name": list(names), "department": "HR"}, dtype=object)
+
+
+def test_new_fingerprints_get_sequential_ids_and_repeats_share_one(tmp_path):
+    with IdRegistry(tmp_path / "ids.db") as registry:
+        ids = registry.resolve(np.array([5, -3, 5], dtype=np.int64), source="a.csv")
+        assert ids.tolist() == [f"GEN_{FIRST_SEQ + 1}", f"GEN_{FIRST_SEQ}", f"GEN_{FIRST_SEQ + 1}"]
+        assert len(registry) == 2
+
+
+def test_ids_survive_reordering_and_new_rows(tmp_path):
+    path = tmp_path / "ids.db"
+    with IdRegistry(path) as registry:
+        first = assign_ids(people("Ann", "Bob"), registry, KEYS)
+    # A later run with the file reordered and grown, on a reopened registry
+    with IdRegistry(path) as registry:
+        second = assign_ids(people("Cid", "Bob", "Ann"), registry, KEYS)
+    ids = dict(zip(first["first_name"], first["employee_id"]))
+    assert second.set_index("first_name")["employee_id"].to_dict() == {
+        "Ann": ids["Ann"], "Bob": ids["Bob"], "Cid": f"GEN_{FIRST_SEQ + 2}"}
+
+
+def test_natural_ids_are_kept_and_not_registered(tmp_path):
+    df = people("Ann", "Bob")
+    df.loc[0, "employee_id"] = "E7"
+    with IdRegistry(tmp_path / "ids.db") as registry:
+        out = assign_ids(df, registry, KEYS)
+        assert out["employee_id"].tolist() == ["E7", f"GEN_{FIRST_SEQ}"]
+        assert len(registry) == 1
+    assert df.loc[1, "employee_id"] is None
+
+
+def test_fingerprint_depends_on_the_key_columns_only():
+    a = people("Ann", "Ann").assign(employee_id=["x", "y"])
+    fp = fingerprint(a, KEYS)
+    assert fp.dtype == np.int64 and fp[0] == fp[1]
+    assert fingerprint(a.assign(department="IT"), KEYS)[0] != fp[0]
@@ -0,0 +1,54 @@
+import pytest
+
+from src.etl import to_sql
+from src.etl.index_advisor import advise, ensure_indexes, plan_issues
+from src.etl.schema import INDEX_PREFIX, INDEXES, TABLE
+
+
+@pytest.fixture
+def conn(tmp_path, unified_csv):
+    conn = to_sql.connect(tmp_path / "employees.db")
+    to_sql.bulk_load(conn, unified_csv)
+    yield conn
+    conn.close()
+
+
+def indexes(conn) -> set:
+    return {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+
+
+def test_managed_indexes_are_synced_and_hand_made_ones_kept(conn):
+    conn.execute(f"CREATE INDEX my_first_name ON {TABLE} (first_name)")
+    conn.execute(f"CREATE INDEX {INDEX_PREFIX}stale ON {TABLE} (age)")
+    conn.execute(f"CREATE INDEX idx_employees_gender ON {TABLE} (gender)")
+    conn.execute(f"DROP INDEX {INDEXES[0][0]}")
+
+    changes = ensure_indexes(conn)
+    assert changes == {"created": [INDEXES[0][0]], "dropped": ["idx_auto_stale", "idx_employees_gender"]}
+    assert indexes(conn) == {name for name, _ in INDEXES} | {"my_first_name"}
+    assert ensure_indexes(conn) == {"created": [], "dropped": []}
+
+
+def test_star_layout_indexes_the_fact_table(tmp_path, unified_csv):
+    conn = to_sql.connect(tmp_path / "star.db")
+    to_sql.bulk_load(conn, unified_csv, layout="star")
+    tables = {tbl for (tbl,) in conn.execute("SELECT tbl_name FROM sqlite_master WHERE name LIKE 'idx_auto_%'")}
+    assert tables == {"employee_facts"}
+    conn.close()
+
+
+def test_plan_issues():
+    assert plan_issues([f"SCAN {TABLE}"]) == ["full table scan"]
+    assert plan_issues([f"SEARCH {TABLE} USING INDEX x", "USE TEMP B-TREE FOR ORDER BY"]) == [
+        "use temp b-tree for order by"]
+    # Sorting aggregated groups, or summary rows from the rollups, is not a row sort
+    assert plan_issues([f"SCAN {TABLE}", "USE TEMP B-TREE FOR ORDER BY"], "SELECT ... GROUP BY x ORDER BY y") == [
+        "full table scan"]
+    assert plan_issues(["SCAN dept_salary_stats", "USE TEMP B-TREE FOR ORDER BY"]) == []
+
+
+def test_shipped_queries_have_no_plan_issues(conn):
+    results = advise(conn)
+    assert results
+    assert {name: issues for name, (_, issues) in results.items() if issues} == {}
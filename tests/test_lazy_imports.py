@@ -0,0 +1,69 @@
+from pathlib import Path
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from src.analysis.startup_time import parse_importtime, probe
+from src.lazy_imports import lazy_import, load
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+def run_fresh(code: str) -> str:
+    """stdout of code run in a new interpreter from the repository root."""
+    proc = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=BASE_DIR,
+                          capture_output=True, text=True, check=True)
+    return proc.stdout
+
+
+def test_submodule_and_parent_load_on_first_attribute_access():
+    out = run_fresh("""
+        import sys
+        from src.lazy_imports import lazy_import
+        minidom = lazy_import("xml.dom.minidom")
+        print("xml.dom.minicompat" in sys.modules, type(sys.modules["xml.dom"]).__name__)
+        document = minidom.parseString("<a/>")
+        print("xml.dom.minicompat" in sys.modules, sys.modules["xml.dom"].minidom is minidom,
+              document.documentElement.tagName)
+    """)
+    assert out.splitlines() == ["False _LazyModule", "True True a"]
+
+
+def test_load_runs_the_deferred_import():
+    out = run_fresh("""
+        import sys
+        from src.lazy_imports import lazy_import, load
+        tomllib = lazy_import("tomllib")
+        print("tomllib._parser" in sys.modules)
+        print(load(tomllib) is tomllib, "tomllib._parser" in sys.modules, type(tomllib).__name__)
+    """)
+    assert out.splitlines() == ["False", "True True module"]
+
+
+def test_imported_and_missing_modules():
+    assert lazy_import("json") is sys.modules["json"]
+    assert load(lazy_import("json")).dumps([1]) == "[1]"
+    with pytest.raises(ModuleNotFoundError, match="no_such_module"):
+        lazy_import("no_such_module")
+
+
+def test_probe_counts_only_the_imports_of_the_script(tmp_path):
+    script = tmp_path / "entry.py"
+    script.write_text("import argparse\nimport colorsys\nargparse.ArgumentParser().parse_args()\n",
+                      encoding="utf-8")
+    names = [name for name, _ in probe(script)]
+    assert "colorsys" in names
+    assert not {"runpy", "pkgutil"} & set(names)
+
+
+def test_parse_importtime_keeps_top_level_imports_after_the_marker():
+    stderr = "\n".join([
+        "import time:       100 |        100 | early",
+        "--- startup probe ---",
+        "import time: self [us] | cumulative | imported package",
+        "import time:       200 |        200 |   nested",
+        "import time:       300 |       1500 | top",
+    ])
+    assert parse_importtime(stderr) == [("top", 1.5)]
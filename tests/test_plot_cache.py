@@ -0,0 +1,65 @@
+import matplotlib.pyplot as plt
+import pandas as pd
+import pytest
+
+from src.viz.plot_cache import MANIFEST_NAME, PlotCache, function_source
+from src.viz.registry import Chart, ChartData, render_charts
+
+plt.switch_backend("Agg")
+
+
+def bar_height(df: pd.DataFrame) -> float:
+    return df["salary"].mean()
+
+
+def draw_salary(data: ChartData):
+    plt.figure(figsize=(2, 2))
+    plt.bar([0], [bar_height(data.frame)])
+
+
+CHART = Chart("salary.png", ("salary",), draw_salary)
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    return pd.DataFrame({"salary": [1.0, 2.0, 3.0], "age": [20, 30, 40]})
+
+
+def render(frame, out_dir, cache):
+    [(_, seconds)] = render_charts([CHART], ChartData(frame), out_dir, cache)
+    return seconds
+
+
+def test_unchanged_inputs_are_not_redrawn(frame, tmp_path):
+    cache = PlotCache()
+    assert render(frame, tmp_path, cache) is not None
+    png = (tmp_path / "salary.png").read_bytes()
+    # A new run reads the manifest; columns the chart does not read do not matter
+    cache = PlotCache()
+    assert render(frame.assign(age=0), tmp_path, cache) is None
+    assert (tmp_path / "salary.png").read_bytes() == png
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert "1 of 1 figures unchanged" in cache.summary()
+
+
+def test_changed_column_edited_png_or_disabled_cache_redraws(frame, tmp_path):
+    render(frame, tmp_path, PlotCache())
+    assert render(frame.assign(salary=[1.0, 2.0, 4.0]), tmp_path, PlotCache()) is not None
+    (tmp_path / "salary.png").write_bytes(b"not a png")
+    assert render(frame, tmp_path, PlotCache()) is not None
+    assert render(frame, tmp_path, PlotCache(enabled=False)) is not None
+    assert (tmp_path / MANIFEST_NAME).exists()
+
+
+def test_spec_covers_the_helpers_the_draw_function_calls():
+    assert "def bar_height" in function_source(draw_salary)
+    assert "def draw_salary" not in function_source(bar_height)
+
+
+def test_column_hashes_follow_the_frame_not_its_id():
+    cache = PlotCache()
+    keys = set()
+    for salary in range(5):
+        # Each frame is collected before the next, so ids are often reused
+        keys.add(cache.key(pd.DataFrame({"salary": [float(salary)]}), ["salary"], "spec"))
+    assert len(keys) == 5
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.analysis.query_cache import QueryCache, data_version, normalize_sql, read_sql_cached
+from src.etl import to_sql
+
+SQL = "SELECT department, COUNT(*) AS n FROM employees GROUP BY department ORDER BY department"
+
+
+@pytest.fixture
+def db(tmp_path, unified_csv):
+    path = tmp_path / "employees.db"
+    conn = to_sql.connect(path)
+    to_sql.bulk_load(conn, unified_csv)
+    conn.close()
+    return path
+
+
+def test_normalized_text_ignores_comments_whitespace_and_semicolons():
+    assert normalize_sql("-- top\nSELECT  1 /* one */\n;") == normalize_sql("SELECT 1") == "SELECT 1"
+
+
+def test_hits_until_the_database_is_reloaded(db, unified_csv, tmp_path):
+    cache = QueryCache(tmp_path / "cache")
+    first = read_sql_cached(SQL, db, cache)
+    assert read_sql_cached(SQL + ";", db, cache).equals(first)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    conn = to_sql.connect(db)
+    to_sql.bulk_load(conn, unified_csv)
+    conn.close()
+    read_sql_cached(SQL, db, cache)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_rebuilt_database_gets_a_new_version(db, unified_csv):
+    before = data_version(db)
+    assert before.startswith("gen:1:")
+    db.unlink()
+    conn = to_sql.connect(db)
+    to_sql.bulk_load(conn, unified_csv)
+    conn.close()
+    after = data_version(db)
+    assert after.startswith("gen:1:") and after != before
+
+
+def test_database_without_meta_table_uses_file_stats(tmp_path):
+    path = tmp_path / "plain.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE employees (id TEXT)")
+    conn.commit()
+    before = data_version(path)
+    assert before.startswith("stat:")
+    conn.execute("INSERT INTO employees VALUES ('1')")
+    conn.commit()
+    conn.close()
+    assert data_version(path) != before
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    df = pd.DataFrame({"x": range(100)})
+    cache = QueryCache(tmp_path / "cache")
+    cache.put("a", df)
+    size = cache._path("a").stat().st_size
+    cache.max_bytes = 2 * size
+    cache.put("b", df)
+    os.utime(cache._path("a"), ns=(0, 0))
+    os.utime(cache._path("b"), ns=(1, 1))
+    assert cache.get("a") is not None  # refreshed: now the most recent
+    cache.put("c", df)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
@@ -0,0 +1,53 @@
+import sqlite3
+
+from src.analysis.query_history import append, format_report, load, plan_digest, regressions
+from src.analysis.run_sql_queries import QueryResult
+
+
+def record(ms: float, status: str = "ok", plan: str = "p1", version: str = "gen:1", rows: int = 10) -> dict:
+    return {"query": "q.sql", "db": "/db", "status": status, "ms": ms, "rows": rows, "plan": plan,
+            "data_version": version}
+
+
+def test_latest_run_is_compared_with_the_median_of_the_window():
+    records = [record(ms) for ms in (100, 10, 12, 11)] + [record(30)]
+    [row] = regressions(records, window=3)
+    assert (row["runs"], row["baseline_ms"], row["latest_ms"]) == (3, 11, 30)
+    assert row["regressed"] and row["changed"] == []
+
+
+def test_small_slowdowns_cache_hits_and_errors_are_ignored():
+    records = [record(1.0), record(1.1), record(0.1, status="cached"), record(2.0, status="error"), record(3.0)]
+    [row] = regressions(records)
+    assert row["runs"] == 2 and row["ratio"] > 1.5
+    assert not row["regressed"]  # only 1.95 ms slower
+    assert regressions([record(1.0)]) == []
+
+
+def test_plan_data_and_row_changes_are_noted():
+    records = [record(10), record(10, plan="p2", version="gen:2", rows=12)]
+    [row] = regressions(records)
+    assert row["changed"] == ["plan", "data", "rows 10->12"]
+    assert "plan, data, rows 10->12" in format_report([row])
+
+
+def test_append_and_load_round_trip(tmp_path):
+    path = tmp_path / "history.jsonl"
+    results = [QueryResult("a.sql", "ok", rows=3, seconds=0.0123, plan_digest="abc", data_version="gen:1")]
+    append(results, tmp_path / "x.db", path)
+    append(results, tmp_path / "x.db", path)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    records = load(path)
+    assert len(records) == 2
+    assert records[0]["ms"] == 12.3 and records[0]["query"] == "a.sql"
+    assert load(tmp_path / "missing.jsonl") == []
+
+
+def test_plan_digest_changes_with_the_plan():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a, b)")
+    before = plan_digest(conn, "SELECT * FROM t WHERE a = 1")
+    conn.execute("CREATE INDEX t_a ON t (a)")
+    assert plan_digest(conn, "SELECT * FROM t WHERE a = 1") not in (before, "")
+    assert plan_digest(conn, "SELECT nope") == ""
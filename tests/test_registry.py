@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from src.viz import registry
+from src.viz.charts import BY_NAME, avg_salary_by_department, select
+from src.viz.registry import Chart, ChartData, clean_labels, needed_columns, prepare_frame
+
+
+def test_needed_columns_is_the_union_in_schema_order():
+    charts = select("team_avg_salary_by_department.png", "gender_distribution.png", "salary_vs_bonus.png")
+    assert needed_columns(charts) == ["gender", "department", "salary", "bonus_percent"]
+    heatmap = needed_columns(select("correlation_heatmap.png"))
+    assert "salary" in heatmap and "employee_id" not in heatmap
+
+
+def test_load_reads_only_the_needed_columns(employees_csv):
+    data = registry.load(select("salary_violin_by_department.png"), employees_csv)
+    assert list(data.frame.columns) == ["department", "salary"]
+    assert data.frame["department"].dtype == "category"
+
+
+def test_aggregations_are_computed_once_per_frame():
+    calls = []
+
+    def mean_salary(df):
+        calls.append(1)
+        return df["salary"].mean()
+
+    data = ChartData(pd.DataFrame({"salary": [1.0, 3.0]}))
+    assert data.agg(mean_salary) == data.agg(mean_salary) == 2.0
+    assert len(calls) == 1
+    ChartData(data.frame).agg(mean_salary)
+    assert len(calls) == 2
+
+
+def test_prepare_frame_cleans_labels_once_per_value():
+    raw = pd.DataFrame({"Department ": [" HR", "HR ", None], "Gender": ["Female", "male ", "MALE"]})
+    df = prepare_frame(raw)
+    assert list(df.columns) == ["department", "gender"]
+    assert df["department"].cat.categories.tolist() == ["HR"]
+    assert df["gender"].tolist() == ["female", "male", "male"]
+    # Same labels as the scripts' former astype(str).str.strip()
+    expected = raw["Department "].astype(str).str.strip()
+    pd.testing.assert_series_equal(clean_labels(raw["Department "]).astype(expected.dtype), expected)
+    assert list(raw.columns) == ["Department ", "Gender"]
+
+
+def test_charts_skip_frames_without_their_columns():
+    data = ChartData(pd.DataFrame({"salary": [1.0, 2.0]}))
+    assert BY_NAME["salary_boxplot.png"].applies(data)
+    assert not BY_NAME["salary_violin_by_department.png"].applies(data)
+    assert not BY_NAME["correlation_heatmap.png"].applies(ChartData(pd.DataFrame({"department": ["HR"]})))
+
+
+def test_large_frames_use_the_binned_drawer():
+    chart = BY_NAME["salary_boxplot.png"]
+    data = ChartData(pd.DataFrame({"salary": [1.0, 2.0, 3.0]}))
+    assert chart.drawer(data, binned_from=None) is chart.draw
+    assert chart.drawer(data, binned_from=4) is chart.draw
+    assert chart.drawer(data, binned_from=3) is chart.draw_binned
+    plain = Chart("x.png", ("salary",), chart.draw)
+    assert plain.drawer(data, binned_from=0) is plain.draw
+
+
+def test_shared_aggregation_declares_its_columns():
+    assert avg_salary_by_department.columns == ("department", "salary")
+    with pytest.raises(KeyError, match="no registered chart"):
+        select("missing.png")
@@ -0,0 +1,63 @@
+import hashlib
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.analysis.run_sql_queries import check_schema, discover_queries, run_all
+from src.etl import to_sql
+from src.etl.schema import TABLE
+
+
+@pytest.fixture
+def plain_db(tmp_path, unified_csv):
+    """A database written by df.to_sql alone: no key, no rollup tables or views."""
+    path = tmp_path / "plain.db"
+    conn = sqlite3.connect(path)
+    pd.read_csv(unified_csv).to_sql(TABLE, conn, index=False)
+    conn.close()
+    return path
+
+
+def digest(path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_runner_does_not_modify_a_database_without_rollups(plain_db, tmp_path):
+    before = digest(plain_db)
+    assert check_schema(plain_db)
+    results = run_all(discover_queries(), plain_db, workers=2, out_dir=tmp_path / "results")
+    assert {r.status for r in results} == {"ok"}
+    assert digest(plain_db) == before
+    conn = sqlite3.connect(plain_db)
+    assert [name for (name,) in conn.execute("SELECT name FROM sqlite_master")] == [TABLE]
+    conn.close()
+
+
+def test_rollup_and_base_table_queries_agree(plain_db, unified_csv, tmp_path):
+    conn = to_sql.connect(tmp_path / "loaded.db")
+    to_sql.bulk_load(conn, unified_csv)
+    conn.close()
+    plain = run_all(discover_queries(), plain_db, out_dir=tmp_path / "plain")
+    rollups = run_all(discover_queries(), tmp_path / "loaded.db", out_dir=tmp_path / "rollups")
+    for a, b in zip(plain, rollups):
+        pd.testing.assert_frame_equal(pd.read_csv(b.output), pd.read_csv(a.output), check_dtype=False)
+
+
+def test_missing_database_is_reported_not_created(tmp_path):
+    assert not check_schema(tmp_path / "missing.db")
+    assert not (tmp_path / "missing.db").exists()
+
+
+def test_failing_and_slow_queries_do_not_stop_the_others(plain_db, tmp_path):
+    queries = tmp_path / "queries"
+    queries.mkdir()
+    (queries / "a_bad.sql").write_text("SELECT nope FROM employees;", encoding="utf-8")
+    (queries / "b_slow.sql").write_text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n;", encoding="utf-8")
+    (queries / "c_good.sql").write_text("SELECT COUNT(*) AS n FROM employees;", encoding="utf-8")
+    results = run_all(discover_queries(queries), plain_db, workers=3, out_dir=tmp_path / "results", timeout=0.2)
+    assert [(r.name, r.status) for r in results] == [
+        ("a_bad.sql", "error"), ("b_slow.sql", "timeout"), ("c_good.sql", "ok")]
+    assert "no such column" in results[0].error
+    assert pd.read_csv(results[2].output)["n"].tolist() == [5]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis.stream_stats import frame_chunks, summarize
+from src.etl.schema import DTYPES, apply_dtypes, read_csv_kwargs, widen_dtypes, widen_float
+
+
+def test_compact_dtypes_on_read(unified_csv):
+    df = pd.read_csv(unified_csv, **read_csv_kwargs())
+    assert df.dtypes.astype(str).to_dict() == DTYPES
+    pd.testing.assert_frame_equal(apply_dtypes(pd.read_csv(unified_csv)), df)
+
+
+def test_widen_float_keeps_the_parsed_decimals():
+    widened = widen_float(pd.Series([7.98, None, 12.51], dtype="float32"))
+    assert widened.dtype == "float64"
+    assert widened.iloc[0] == 7.98 and widened.iloc[2] == 12.51
+    assert widened.isna().iloc[1]
+
+
+def test_widen_dtypes_gives_the_numbers_of_a_plain_read_csv(unified_csv):
+    plain = pd.read_csv(unified_csv)
+    compact = pd.read_csv(unified_csv, **read_csv_kwargs()).assign(job_level=pd.Categorical([None] * len(plain)))
+    widened = widen_dtypes(compact)
+    for col in ["years_experience", "salary", "bonus_percent", "performance_score"]:
+        pd.testing.assert_series_equal(widened[col], plain[col])
+    # A column without values is numeric, as read_csv infers it
+    assert widened["job_level"].dtype == "float64"
+    assert widened["department"].dtype == "category"
+
+
+def test_statistics_of_compact_chunks_match_float64(unified_csv):
+    plain = pd.read_csv(unified_csv)
+    summary = summarize(pd.read_csv(unified_csv, chunksize=2, **read_csv_kwargs()))
+    for col in ["age", "years_experience", "salary", "bonus_percent", "performance_score"]:
+        values = plain[col].dropna()
+        assert summary.moments[col].mean == values.mean()
+        assert np.isclose(summary.moments[col].std, values.std(), rtol=1e-12)
+        assert summary.median(col) == values.median()
+    # Same statistics whether the frame was loaded compact or widened
+    widened = summarize(frame_chunks(widen_dtypes(pd.read_csv(unified_csv, **read_csv_kwargs()))))
+    pd.testing.assert_frame_equal(widened.statistical_summary(), summary.statistical_summary())
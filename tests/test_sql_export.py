@@ -0,0 +1,68 @@
+import csv
+import gzip
+import sqlite3
+
+import pytest
+
+from src.analysis.sql_export import ExportOptions, column_types, export_query
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def conn(tmp_path):
+    path = tmp_path / "export.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id TEXT, n INTEGER, x REAL)")
+    # NULL throughout the first fetch batch, values afterwards
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)",
+                     [(str(i), None if i < 3 else i, None if i < 3 else i / 2) for i in range(6)])
+    conn.commit()
+    conn.close()
+    ro = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+    yield ro
+    ro.close()
+
+
+def test_declared_types_survive_a_null_first_batch(conn, tmp_path):
+    out = tmp_path / "t.parquet"
+    rows = export_query(conn, "SELECT id, n, x, n * 2 AS doubled FROM t ORDER BY id", out,
+                        ExportOptions("parquet", fetch_rows=2))
+    assert rows == 6
+    table = pq.read_table(out)
+    assert [str(t) for t in table.schema.types[:3]] == ["string", "int64", "double"]
+    assert table.column("n").to_pylist() == [None, None, None, 3, 4, 5]
+    assert pq.ParquetFile(out).num_row_groups == 3
+
+
+def test_column_types_on_a_read_only_connection(conn):
+    assert column_types(conn, "SELECT id, x, n + 1 FROM t;") == ["TEXT", "REAL", ""]
+    assert column_types(conn, "SELECT 1; SELECT 2") == []
+
+
+def test_gzipped_csv_and_empty_results(conn, tmp_path):
+    out = tmp_path / "t.csv.gz"
+    assert export_query(conn, "SELECT id, n FROM t WHERE n > 3", out, ExportOptions("csv", compress=True)) == 2
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert list(csv.reader(f)) == [["id", "n"], ["4", "4"], ["5", "5"]]
+
+    empty = tmp_path / "empty.parquet"
+    assert export_query(conn, "SELECT id, n FROM t WHERE 0", empty, ExportOptions("parquet")) == 0
+    assert [str(t) for t in pq.read_table(empty).schema.types] == ["string", "int64"]
+
+
+def test_mixed_expression_values_are_written_as_text(conn, tmp_path):
+    out = tmp_path / "mixed.parquet"
+    export_query(conn, "SELECT n + 0 AS v FROM t WHERE n = 3 UNION ALL SELECT 'text'", out, ExportOptions("parquet"))
+    assert pq.read_table(out).column("v").to_pylist() == ["3", "text"]
+
+
+def test_failed_export_leaves_no_file(tmp_path):
+    conn = sqlite3.connect(tmp_path / "bad.db")
+    conn.execute("CREATE TABLE t (n INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(1,), ("not a number",)])
+    out = tmp_path / "bad.parquet"
+    with pytest.raises(RuntimeError, match="CAST it in the query"):
+        export_query(conn, "SELECT n FROM t", out, ExportOptions("parquet"))
+    conn.close()
+    assert not out.exists() and not list(tmp_path.glob("*.part"))
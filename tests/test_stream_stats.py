@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.stream_stats import Moments, QuantileSketch, StreamSummary, frame_chunks, summarize
+from src.etl.column_store import load_unified
+from src.etl.schema import widen_dtypes
+from src.viz.registry import prepare_frame
+
+
+def reference_eda(df: pd.DataFrame) -> str:
+    """eda_summary.txt as basic_visualizations_1.py wrote it with one pandas call per statistic."""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = [c for c in df.columns if c not in numeric_cols]
+    lines = ["Exploratory Data Analysis (EDA) Summary", "=" * 60, f"Rows: {len(df)}, Columns: {len(df.columns)}",
+             f"Numeric columns: {numeric_cols}", f"Categorical columns: {categorical_cols}", "",
+             "Numeric summaries (mean, median, std, min, max, non-null):"]
+    for col in numeric_cols:
+        s = df[col].dropna()
+        lines.append(f"{col}: mean={s.mean():.2f}, median={s.median():.2f}, std={s.std():.2f}, "
+                     f"min={s.min():.2f}, max={s.max():.2f}, count={s.count()}")
+    lines += ["", "Categorical summaries (top 3 values):"]
+    for col in categorical_cols:
+        top = df[col].value_counts(dropna=True).head(3)
+        lines.append(f"{col}: " + "; ".join([f"{idx}({val})" for idx, val in top.items()]))
+    lines += ["", "Missing values (per column):"]
+    lines += [f"{col}: {cnt}" for col, cnt in df.isna().sum().items() if cnt > 0]
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def values() -> np.ndarray:
+    rng = np.random.default_rng(11)
+    return np.concatenate([rng.lognormal(10, 0.5, 30000), rng.normal(5000, 10, 5000)])
+
+
+def test_merged_moments_match_pandas(values):
+    s = pd.Series(values)
+    m = Moments()
+    for part in np.array_split(values, 7):
+        m.merge(Moments.of(part))
+    assert m.count == len(values) and m.min == values.min() and m.max == values.max()
+    assert m.mean == pytest.approx(s.mean(), rel=1e-12)
+    assert m.std == pytest.approx(s.std(), rel=1e-10)
+    assert m.skew == pytest.approx(s.skew(), rel=1e-9)
+    assert m.kurt == pytest.approx(s.kurt(), rel=1e-9)
+    # Constant data has no shape, whatever rounding error the moment sums pick up
+    constant = Moments.of(np.full(10, 0.1)).merge(Moments.of(np.full(5, 0.1)))
+    assert (constant.skew, constant.kurt) == (0.0, 0.0)
+
+
+def test_median_sketch_is_exact_when_small_and_close_when_large(values):
+    small = QuantileSketch(size=1000)
+    small.update(values[:999])
+    assert small.exact and small.quantile(0.5) == np.median(values[:999])
+
+    sketches = [QuantileSketch(size=1024) for _ in range(4)]
+    for sketch, part in zip(sketches, np.array_split(values, 4)):
+        for chunk in np.array_split(part, 10):
+            sketch.update(chunk)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    assert not merged.exact
+    # Rank error of at most a few percent
+    rank = np.searchsorted(np.sort(values), merged.quantile(0.5)) / len(values)
+    assert abs(rank - 0.5) < 0.02
+
+
+def test_merged_summaries_equal_one_pass(employees_csv):
+    df = prepare_frame(widen_dtypes(load_unified(employees_csv)))
+    whole = summarize(frame_chunks(df, 1000))
+    halves = summarize(frame_chunks(df.iloc[:150], 40)).merge(summarize(frame_chunks(df.iloc[150:], 70)))
+    assert halves.eda_report() == whole.eda_report()
+    pd.testing.assert_frame_equal(halves.statistical_summary(), whole.statistical_summary(), rtol=1e-12)
+
+
+def test_reports_match_the_per_column_pandas_reports(employees_csv):
+    df = prepare_frame(widen_dtypes(load_unified(employees_csv)))
+    summary = summarize(frame_chunks(df, 64))
+    plain = pd.read_csv(employees_csv)
+    plain["gender"] = plain["gender"].astype(str).str.strip().str.lower()
+    plain["department"] = plain["department"].astype(str).str.strip()
+    assert summary.eda_report() == reference_eda(plain)
+    stats = summary.statistical_summary().set_index("column")
+    for col in stats.index:
+        s = plain[col].dropna()
+        assert stats.loc[col].tolist() == pytest.approx([s.mean(), s.median(), s.std(), s.skew(), s.kurt()],
+                                                        rel=1e-9)
+
+
+def test_categorical_ties_keep_first_appearance_order():
+    text = pd.Series(["other", "male", "female", "male", "other", "female"], name="gender")
+    summary = StreamSummary()
+    for chunk in frame_chunks(text.astype("category").to_frame(), 2):
+        summary.update(chunk)
+    assert summary.value_counts("gender").index.tolist() == text.value_counts().index.tolist()
+    assert summary.value_counts("gender").index.tolist() == ["other", "male", "female"]
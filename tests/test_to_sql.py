@@ -0,0 +1,159 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.etl import to_sql
+from src.etl.schema import COLUMN_NAMES, META_TABLE, TABLE
+from src.etl.star_schema import DIMENSIONS, FACT_TABLE, is_star
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = to_sql.connect(tmp_path / "employees.db", to_sql.LOAD_PRAGMAS)
+    yield conn
+    conn.close()
+
+
+def table(conn, name: str = TABLE) -> pd.DataFrame:
+    return pd.read_sql_query(f"SELECT * FROM {name} ORDER BY employee_id", conn)
+
+
+def csv_rows(csv_path) -> pd.DataFrame:
+    df = next(to_sql.read_chunks(csv_path))
+    return df.sort_values("employee_id", na_position="first", ignore_index=True)
+
+
+def load_generation(conn) -> int:
+    return conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = 'load_generation'").fetchone()[0]
+
+
+# --- bulk loader (user-010) ---
+def test_bulk_load_keeps_the_schema_and_values(conn, unified_csv):
+    assert to_sql.bulk_load(conn, unified_csv, chunksize=2) == 5
+    assert to_sql.has_primary_key(conn)
+    declared = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({TABLE})")}
+    assert declared["salary"] == "REAL" and declared["age"] == "INTEGER"
+    loaded = table(conn)
+    assert loaded.columns.tolist() == COLUMN_NAMES
+    expected = csv_rows(unified_csv)
+    pd.testing.assert_frame_equal(loaded.astype(expected.dtypes.to_dict()), expected)
+    assert conn.execute(f"SELECT COUNT(*) FROM {TABLE}_row_hash").fetchone()[0] == 5
+
+
+def test_reload_replaces_the_table_and_bumps_the_load_generation(conn, unified_csv, tmp_path):
+    to_sql.bulk_load(conn, unified_csv)
+    first = load_generation(conn)
+    smaller = tmp_path / "smaller.csv"
+    pd.read_csv(unified_csv).head(2).to_csv(smaller, index=False)
+    assert to_sql.bulk_load(conn, smaller) == 2
+    assert len(table(conn)) == 2
+    assert load_generation(conn) == first + 1
+    assert not conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%__load'").fetchall()
+
+
+def test_pandas_load_writes_the_same_values(conn, unified_csv, tmp_path):
+    to_sql.bulk_load(conn, unified_csv)
+    other = sqlite3.connect(tmp_path / "pandas.db")
+    to_sql.pandas_load(other, unified_csv)
+    pd.testing.assert_frame_equal(table(other), table(conn), check_dtype=False)
+    other.close()
+
+
+# --- upsert load (user-011) ---
+@pytest.fixture
+def keyed_csv(unified_csv):
+    """unified_csv with an ID on every row, as clean_data.py writes it."""
+    df = pd.read_csv(unified_csv, dtype={"employee_id": str})
+    df.dropna(subset=["employee_id"]).to_csv(unified_csv, index=False)
+    return unified_csv
+
+
+def test_upsert_counts_inserted_updated_unchanged_and_deleted(conn, keyed_csv, tmp_path):
+    to_sql.bulk_load(conn, keyed_csv)
+    df = pd.read_csv(keyed_csv, dtype={"employee_id": str})
+    df.loc[df["employee_id"] == "1001", "salary"] = 1.0
+    df = pd.concat([df[df["employee_id"] != "1002"], df.head(1).assign(employee_id="2000")])
+    changed = tmp_path / "changed.csv"
+    df.to_csv(changed, index=False)
+
+    counts = to_sql.upsert_load(conn, changed, delete_missing=True)
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 2, "deleted": 1}
+    loaded = table(conn).set_index("employee_id")
+    assert loaded.loc["1001", "salary"] == 1.0 and "2000" in loaded.index and "1002" not in loaded.index
+
+    generation = load_generation(conn)
+    assert to_sql.upsert_load(conn, changed)["unchanged"] == 4
+    assert load_generation(conn) == generation
+
+
+def test_upsert_rekeys_a_table_without_the_primary_key(conn, keyed_csv):
+    df = pd.read_csv(keyed_csv, dtype={"employee_id": str})
+    # As written by df.to_sql: no key, and a duplicated employee_id
+    pd.concat([df, df.head(1).assign(salary=2.0)]).to_sql(TABLE, conn, index=False)
+    assert not to_sql.has_primary_key(conn)
+
+    counts = to_sql.upsert_load(conn, keyed_csv)
+    assert to_sql.has_primary_key(conn)
+    # Rows lost their hashes in the rebuild, so every one counts as updated
+    assert counts == {"inserted": 0, "updated": 4, "unchanged": 0, "deleted": 0}
+    assert len(table(conn)) == 4
+    assert table(conn).set_index("employee_id").loc["1001", "salary"] == 50000.5
+
+
+def test_rekey_needs_an_employee_id_column(conn):
+    conn.execute(f"CREATE TABLE {TABLE} (name TEXT)")
+    with pytest.raises(RuntimeError, match="no employee_id column"):
+        to_sql.upsert_load(conn, None)
+
+
+# --- star-schema layout (user-018) ---
+def schema_names(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+
+
+def test_star_layout_reads_back_like_the_wide_layout(conn, unified_csv, tmp_path):
+    to_sql.bulk_load(conn, unified_csv, chunksize=2, layout="star")
+    assert is_star(conn)
+    wide = to_sql.connect(tmp_path / "wide.db")
+    to_sql.bulk_load(wide, unified_csv)
+    pd.testing.assert_frame_equal(table(conn), table(wide))
+    wide.close()
+    assert conn.execute("SELECT COUNT(*) FROM dim_department").fetchone()[0] == 3
+
+
+def test_dimension_ids_stay_stable_across_star_loads(conn, unified_csv, tmp_path):
+    to_sql.bulk_load(conn, unified_csv, layout="star")
+    ids = dict(conn.execute("SELECT name, id FROM dim_department"))
+    reordered = tmp_path / "reordered.csv"
+    pd.read_csv(unified_csv).iloc[::-1].to_csv(reordered, index=False)
+    to_sql.bulk_load(conn, reordered, layout="star")
+    assert dict(conn.execute("SELECT name, id FROM dim_department")) == ids
+
+
+def test_loading_one_layout_drops_the_other(conn, unified_csv, tmp_path):
+    star_tables = {FACT_TABLE, *DIMENSIONS.values()}
+    to_sql.bulk_load(conn, unified_csv, layout="star")
+    assert star_tables <= schema_names(conn)
+    to_sql.bulk_load(conn, unified_csv)
+    assert not is_star(conn)
+    assert not star_tables & schema_names(conn)
+
+    to_sql.bulk_load(conn, unified_csv, layout="star")
+    other = to_sql.connect(tmp_path / "pandas.db")
+    to_sql.bulk_load(other, unified_csv, layout="star")
+    to_sql.pandas_load(other, unified_csv)
+    assert not star_tables & schema_names(other)
+    other.close()
+
+
+def test_upsert_keeps_the_star_layout(conn, keyed_csv, tmp_path):
+    to_sql.bulk_load(conn, keyed_csv, layout="star")
+    df = pd.read_csv(keyed_csv, dtype={"employee_id": str})
+    df.loc[df["employee_id"] == "1001", "department"] = "Legal"
+    changed = tmp_path / "changed.csv"
+    df.to_csv(changed, index=False)
+
+    assert to_sql.upsert_load(conn, changed)["updated"] == 1
+    assert is_star(conn)
+    assert table(conn).set_index("employee_id").loc["1001", "department"] == "Legal"
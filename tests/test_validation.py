@@ -0,0 +1,66 @@
+import pandas as pd
+
+from src.etl.schema import COLUMN_NAMES
+from src.etl.validation import REASON_COLUMN, Quarantine, RuleStats, validate
+
+
+def raw(**overrides) -> pd.DataFrame:
+    """Two valid raw rows (text values, as read from a source) with overridden columns."""
+    df = pd.DataFrame({
+        "employee_id": ["1", "2"], "first_name": ["Ann", "Bob"], "age": ["30", "41"],
+        "gender": ["Female", "Male"], "department": ["HR", "Sales"], "job_level": ["Mid", None],
+        "years_experience": ["5", "12.5"], "salary": ["50000", "61000.5"], "bonus_percent": ["7.98", "10"],
+        "performance_score": ["8", "6.5"], "source_file": "a.csv",
+    }, dtype=object)
+    return df.assign(**overrides)
+
+
+def test_valid_rows_are_cast_to_the_schema_dtypes():
+    clean, rejected, stats = validate(raw())
+    assert rejected.empty and len(clean) == 2
+    assert clean.columns.tolist() == COLUMN_NAMES
+    assert str(clean["age"].dtype) == "Int16" and clean["salary"].iloc[1] == 61000.5
+
+
+def test_each_rule_quarantines_with_its_reason_and_raw_value():
+    df = pd.concat([
+        raw(age=["abc", "30"]),
+        raw(salary=["-5", "50000"]),
+        raw(gender=["Robot", "Male"], bonus_percent=["500", "1"]),
+        raw(performance_score=["85", "8"]),
+    ], ignore_index=True)
+    clean, rejected, stats = validate(df)
+    assert len(clean) == 4
+    assert rejected[REASON_COLUMN].tolist() == [
+        "age:not_numeric",
+        "salary:out_of_range",
+        "bonus_percent:out_of_range;gender:not_allowed",
+        "performance_score:scale",
+    ]
+    assert rejected.loc[0, "age"] == "abc"
+    assert stats.rules["age:not_numeric"][:2] == [8, 1]
+
+
+def test_sources_on_another_scale_are_rescaled():
+    clean, rejected, _ = validate(raw(performance_score=["85", "60"]), performance_scale=100)
+    assert rejected.empty
+    assert clean["performance_score"].tolist() == [8.5, 6.0]
+
+
+def test_quarantine_collects_chunks_into_one_file(tmp_path):
+    quarantine = Quarantine(tmp_path / "quarantine.csv")
+    for chunk in (raw(age=["abc", "30"]), raw(), raw(salary=["0", "1"])):
+        _, rejected, stats = validate(chunk)
+        quarantine.add(rejected, stats)
+    quarantine.close()
+    written = pd.read_csv(tmp_path / "quarantine.csv")
+    assert written[REASON_COLUMN].tolist() == ["age:not_numeric", "salary:out_of_range"]
+    assert quarantine.stats.rules["salary:out_of_range"][:2] == [6, 1]
+    assert not quarantine.tmp.exists()
+
+
+def test_empty_quarantine_still_writes_a_header(tmp_path):
+    quarantine = Quarantine(tmp_path / "quarantine.csv")
+    quarantine.add(validate(raw())[1], RuleStats())
+    quarantine.close()
+    assert pd.read_csv(tmp_path / "quarantine.csv").columns.tolist() == COLUMN_NAMES + [REASON_COLUMN]
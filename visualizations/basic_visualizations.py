@@ -1,12 +1,21 @@
 import os
+import sys
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 from pathlib import Path
 import warnings
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+from src.lazy_imports import lazy_import  # noqa: E402
+from src.analysis.stream_stats import summarize_frame  # noqa: E402
+from src.etl.column_store import load_unified  # noqa: E402
+from src.etl.schema import widen_dtypes  # noqa: E402
+from src.viz.charts import numeric_correlation, select  # noqa: E402
+from src.viz.registry import ChartData, prepare_frame, render_charts  # noqa: E402
+
+stats = lazy_import("scipy.stats")
+
 warnings.filterwarnings("ignore")
 
 
@@ -15,7 +24,8 @@ warnings.filterwarnings("ignore")
 # ---------------------------------------------------------------------
 def load_data(file_path):
     print(f"Loading data from: {file_path}")
-    df = pd.read_csv(file_path)
+    # The dtypes of a plain read_csv, so the reports do not change with the compact load dtypes
+    df = widen_dtypes(load_unified(file_path))
     print(f"Data loaded successfully: {df.shape[0]} rows × {df.shape[1]} columns\n")
     return df
 
@@ -32,10 +42,12 @@ def save_report(content, filename):
 # ---------------------------------------------------------------------
 # Exploratory Data Analysis (EDA)
 # ---------------------------------------------------------------------
-def exploratory_data_analysis(df):
+def exploratory_data_analysis(data):
     print("Running Exploratory Data Analysis (EDA)...")
     report = []
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    # One chunked pass (src/analysis/stream_stats.py), shared with statistical_analysis()
+    summary = data.agg(summarize_frame)
+    numeric_cols = summary.numeric_columns
 
     if not numeric_cols:
         print("No numeric columns found for EDA.")
@@ -44,11 +56,11 @@ def exploratory_data_analysis(df):
     report.append(f"Numeric columns with valid data: {numeric_cols}\n")
 
     for col in numeric_cols:
-        series = df[col].dropna()
-        if not series.empty:
+        m = summary.moments[col]
+        if m.count:
             report.append(
-                f"{col}: Mean={series.mean():.2f}, Median={series.median():.2f}, "
-                f"Std={series.std():.2f}, Var={series.var():.2f}"
+                f"{col}: Mean={m.mean:.2f}, Median={summary.median(col):.2f}, "
+                f"Std={m.std:.2f}, Var={m.var:.2f}"
             )
 
     eda_path = Path("outputs/reports/eda_summary.txt")
@@ -64,70 +76,32 @@ def exploratory_data_analysis(df):
 # ---------------------------------------------------------------------
 # Basic Visualizations
 # ---------------------------------------------------------------------
-def basic_visualizations(df):
+def basic_visualizations(data):
     print("Generating Basic Visualizations...")
-    output_dir = Path("outputs/plots")
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Salary Distribution
-    if "salary" in df.columns:
-        plt.figure(figsize=(8, 5))
-        sns.histplot(df["salary"], bins=30, kde=True, color="skyblue")
-        plt.title("Salary Distribution")
-        plt.xlabel("Salary")
-        plt.ylabel("Frequency")
-        plt.tight_layout()
-        plt.savefig(output_dir / "salary_distribution.png")
-        plt.close()
-
-        # Salary Boxplot
-        plt.figure(figsize=(6, 4))
-        sns.boxplot(x=df["salary"], color="lightgreen")
-        plt.title("Salary Boxplot")
-        plt.tight_layout()
-        plt.savefig(output_dir / "salary_boxplot.png")
-        plt.close()
-
-    # Bonus vs Salary
-    if {"bonus_percent", "salary"}.issubset(df.columns):
-        plt.figure(figsize=(8, 5))
-        sns.scatterplot(x="bonus_percent", y="salary", data=df, alpha=0.6)
-        plt.title("Salary vs Bonus Percent")
-        plt.tight_layout()
-        plt.savefig(output_dir / "salary_vs_bonus.png")
-        plt.close()
-
-    # Gender Count
-    if "gender" in df.columns:
-        plt.figure(figsize=(6, 4))
-        df["gender"].value_counts().plot(kind="bar", color="salmon", edgecolor="black")
-        plt.title("Gender Distribution")
-        plt.tight_layout()
-        plt.savefig(output_dir / "gender_distribution.png")
-        plt.close()
-
+    render_charts(select("salary_distribution.png", "salary_boxplot.png", "salary_vs_bonus.png",
+                         "gender_distribution.png"), data, Path("outputs/plots"))
     print("Basic Visualizations Generated Successfully.\n")
 
 
 # ---------------------------------------------------------------------
 # Statistical Analysis
 # ---------------------------------------------------------------------
-def statistical_analysis(df):
+def statistical_analysis(data):
     print("Running Statistical Analysis...")
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    summary = data.agg(summarize_frame)
 
     summary_data = []
-    for col in numeric_cols:
-        series = df[col].dropna()
-        if series.empty:
+    for col in summary.numeric_columns:
+        m = summary.moments[col]
+        if not m.count:
             continue
         summary_data.append({
             "Column": col,
-            "Mean": series.mean(),
-            "Median": series.median(),
-            "StdDev": series.std(),
-            "Skewness": series.skew(),
-            "Kurtosis": series.kurt()
+            "Mean": m.mean,
+            "Median": summary.median(col),
+            "StdDev": m.std,
+            "Skewness": m.skew,
+            "Kurtosis": m.kurt
         })
 
     summary_df = pd.DataFrame(summary_data)
@@ -142,32 +116,16 @@ def statistical_analysis(df):
 # ---------------------------------------------------------------------
 # Advanced Statistical Analysis
 # ---------------------------------------------------------------------
-def advanced_statistical_analysis(df):
+def advanced_statistical_analysis(data):
     print("Running Advanced Statistical Analysis...")
-    output_dir = Path("outputs/plots")
-    output_dir.mkdir(parents=True, exist_ok=True)
+    df = data.frame
 
-    # Correlation Matrix
-    corr = df.corr(numeric_only=True)
+    # Correlation Matrix (shared with the heatmap)
     print("\nCorrelation Matrix:")
-    print(corr, "\n")
-
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(corr, annot=True, cmap="coolwarm")
-    plt.title("Correlation Heatmap")
-    plt.tight_layout()
-    plt.savefig(output_dir / "correlation_heatmap.png")
-    plt.close()
+    print(data.agg(numeric_correlation), "\n")
 
-    # Violin Plot: Salary distribution by department
-    if "department" in df.columns and "salary" in df.columns:
-        plt.figure(figsize=(10, 6))
-        sns.violinplot(x="department", y="salary", data=df, inner="quartile", palette="cool")
-        plt.title("Salary Distribution by Department")
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(output_dir / "salary_violin_by_department.png")
-        plt.close()
+    # Heatmap and violin plot of salary by department
+    render_charts(select("correlation_heatmap.png", "salary_violin_by_department.png"), data, Path("outputs/plots"))
 
     # ANOVA: Salary across departments
     if "department" in df.columns and "salary" in df.columns:
@@ -207,34 +165,11 @@ def hypothesis_testing(df):
 # ---------------------------------------------------------------------
 # Team Analysis
 # ---------------------------------------------------------------------
-def team_analysis_tools(df):
+def team_analysis_tools(data):
     print("Running Team Analysis...")
-    output_dir = Path("outputs/plots")
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Average salary by department
-    if {"department", "salary"}.issubset(df.columns):
-        avg_salary = df.groupby("department")["salary"].mean().sort_values()
-        plt.figure(figsize=(8, 5))
-        avg_salary.plot(kind="bar", color="skyblue")
-        plt.title("Average Salary by Department")
-        plt.xlabel("Department")
-        plt.ylabel("Average Salary")
-        plt.tight_layout()
-        plt.savefig(output_dir / "avg_salary_by_department.png")
-        plt.close()
-
-    # Gender distribution by department
-    if {"department", "gender"}.issubset(df.columns):
-        gender_dist = pd.crosstab(df["department"], df["gender"])
-        gender_dist.plot(kind="bar", stacked=True, figsize=(10, 6))
-        plt.title("Gender Distribution by Department")
-        plt.xlabel("Department")
-        plt.ylabel("Count")
-        plt.tight_layout()
-        plt.savefig(output_dir / "gender_distribution_by_department.png")
-        plt.close()
-
+    # Average salary and gender distribution by department
+    render_charts(select("avg_salary_by_department.png", "gender_distribution_by_department.png"),
+                  data, Path("outputs/plots"))
     print("Team Analysis Completed.\n")
 
 
@@ -246,13 +181,15 @@ def main():
     data_path = base_dir / "data" / "processed" / "employees_unified.csv"
 
     df = load_data(data_path)
+    # Charts come from the registry (src/viz/charts.py) and share its aggregations
+    data = ChartData(prepare_frame(df))
 
-    exploratory_data_analysis(df)
-    basic_visualizations(df)
-    statistical_analysis(df)
-    advanced_statistical_analysis(df)
+    exploratory_data_analysis(data)
+    basic_visualizations(data)
+    statistical_analysis(data)
+    advanced_statistical_analysis(data)
     hypothesis_testing(df)
-    team_analysis_tools(df)
+    team_analysis_tools(data)
 
     print("All reports and visualizations generated successfully.")
 
@@ -10,17 +10,39 @@ Professional single-file pipeline for Employee Data Analysis:
 - Runs team-level analyses and saves plots & report
 - Minimal, clean console output with section timings
 - Uses only standard data-science libraries + colorama for colored but professional logs
+
+Every figure is a Chart from the registry in src/viz/charts.py (output file,
+columns and shared aggregations it needs, draw function); figures and the
+reports share aggregations such as the average salary by department.
+With --batch the charts are rendered headless (Agg) in a process pool while
+the statistics run in the main process; workers inherit the prepared
+DataFrame and computed aggregations through fork (or memory-map the column
+store where fork is not available) instead of receiving a pickled copy. PNGs are byte-for-byte the
+same as from serial rendering (--no-show renders serially without windows).
+
+Figures whose input columns and spec are unchanged since they were last
+rendered are not redrawn (src/viz/plot_cache.py); --refresh-plots redraws all.
+
+The EDA and statistical summary reports come from one chunked pass over the
+frame with mergeable moment accumulators and a median sketch
+(src/analysis/stream_stats.py), instead of a dropna() copy and separate
+mean/median/std/skew/kurt passes per column.
+
+From binned.LARGE_DATA_ROWS rows (or always/never with --large-data) the
+histogram, box, violin, scatter and pair plots are drawn from pre-aggregated
+bins (src/viz/binned.py), so their cost follows the bin count, not the rows.
 """
 
+import argparse
+import multiprocessing as mp
+import os
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import warnings
 
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 from colorama import init as colorama_init, Fore, Style
 
 # Initialize colorama (keeps output professional and readable)
@@ -35,15 +57,33 @@ warnings.filterwarnings("ignore")
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_PATH = BASE_DIR / "data" / "processed" / "employees_unified.csv"
 
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+from src.analysis.stream_stats import summarize_frame  # noqa: E402
+from src.etl.column_store import load_unified  # noqa: E402
+from src.etl.schema import widen_dtypes  # noqa: E402
+from src.lazy_imports import lazy_import  # noqa: E402
+from src.viz import binned  # noqa: E402
+from src.viz.charts import avg_salary_by_department, gender_by_department, numeric_correlation, select  # noqa: E402
+from src.viz.plot_cache import PlotCache  # noqa: E402
+from src.viz.registry import (LARGE_DATA_MODES, ChartData, prepare_frame, render_chart,  # noqa: E402
+                              render_charts)
+
+# Imported on first use, so --help and imports of this module stay fast
+plt = lazy_import("matplotlib.pyplot")
+sns = lazy_import("seaborn")
+stats = lazy_import("scipy.stats")
+
 OUTPUT_PLOTS = BASE_DIR / "outputs" / "plots"
 OUTPUT_REPORTS = BASE_DIR / "outputs" / "reports"
 
-# Create output directories if missing
-OUTPUT_PLOTS.mkdir(parents=True, exist_ok=True)
-OUTPUT_REPORTS.mkdir(parents=True, exist_ok=True)
 
-# Matplotlib styling
-sns.set(style="whitegrid")
+def _setup_outputs():
+    """Create the output directories and apply the figure style (main process and pool workers)."""
+    OUTPUT_PLOTS.mkdir(parents=True, exist_ok=True)
+    OUTPUT_REPORTS.mkdir(parents=True, exist_ok=True)
+    # Matplotlib styling
+    sns.set(style="whitegrid")
 
 
 # -----------------------
@@ -75,6 +115,102 @@ def _timeit(func):
     return wrapper
 
 
+# -----------------------
+# Figures (declared in src/viz/charts.py)
+# -----------------------
+BASIC_FIGURES = select("salary_distribution.png", "salary_boxplot.png", "salary_vs_bonus.png",
+                       "gender_distribution.png")
+ADVANCED_FIGURES = select("correlation_heatmap.png", "pairplot_relationships.png",
+                          "salary_violin_by_department.png")
+TEAM_FIGURES = select("team_avg_salary_by_department.png", "team_gender_distribution_by_department.png")
+FIGURES = BASIC_FIGURES + ADVANCED_FIGURES + TEAM_FIGURES
+
+
+# Skips figures whose inputs are unchanged; main() disables it for --refresh-plots
+PLOT_CACHE = PlotCache()
+# Frames with at least this many rows are drawn from bins (None: never); set by main()
+_binned_from = LARGE_DATA_MODES["auto"]
+
+
+def _render_figures(charts: list, data: ChartData, show: bool) -> None:
+    for chart, seconds in render_charts(charts, data, OUTPUT_PLOTS, PLOT_CACHE, show, _binned_from):
+        p = OUTPUT_PLOTS / chart.filename
+        if seconds is None:
+            _log(f"Unchanged: {p} (cached)", "info")
+        else:
+            _log(f"Saved: {p} ({seconds:.2f}s)", "ok")
+
+
+# Data the pool workers render from: set before the pool forks, so workers
+# share the parent's pages (and computed aggregations) instead of unpickling a copy
+_DATA = None
+
+
+def _init_worker(path: Path, binned_from: int):
+    """Non-fork start methods: memory-map the column store and prepare it like the parent."""
+    global _DATA, _binned_from
+    if _DATA is None:
+        _DATA = ChartData(prepare_frame(widen_dtypes(load_unified(path))))
+    _binned_from = binned_from
+    _setup_outputs()
+    plt.switch_backend("Agg")
+
+
+def _render_task(index: int) -> tuple:
+    chart = FIGURES[index]
+    return chart.filename, os.getpid(), render_chart(chart, _DATA, OUTPUT_PLOTS, binned_from=_binned_from)
+
+
+def start_batch_render(data: ChartData, workers: int = None, path: Path = DATA_PATH):
+    """
+    Submit every applicable figure that is not cached to a process pool and
+    return (executor, futures with their cache keys, cached file names); the
+    caller keeps working and collects them with finish_batch_render().
+    """
+    global _DATA
+    _DATA = data
+    pending, cached = [], []
+    for i, chart in enumerate(FIGURES):
+        if chart.applies(data):
+            key = chart.cache_key(PLOT_CACHE, data, _binned_from)
+            if PLOT_CACHE.fresh(OUTPUT_PLOTS / chart.filename, key):
+                cached.append(chart.filename)
+            else:
+                pending.append((i, key))
+    if not pending:
+        return None, [], cached
+    # Compute shared aggregations once, before the fork
+    for i, _ in pending:
+        for fn in FIGURES[i].aggregations:
+            data.agg(fn)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    method = "fork" if "fork" in mp.get_all_start_methods() else None
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context(method),
+                                   initializer=_init_worker, initargs=(path, _binned_from))
+    return executor, [(executor.submit(_render_task, i), key) for i, key in pending], cached
+
+
+def finish_batch_render(executor: ProcessPoolExecutor, futures: list, cached: list, wall_start: float) -> None:
+    """Wait for the pool, record the new PNGs in the plot cache and print per-figure render times."""
+    results = []
+    for future, key in futures:
+        filename, pid, seconds = future.result()
+        PLOT_CACHE.store(OUTPUT_PLOTS / filename, key, seconds)
+        results.append((filename, pid, seconds))
+    if executor is not None:
+        executor.shutdown()
+    wall = time.perf_counter() - wall_start
+    _log(f"{'figure':<46}{'pid':>8}{'seconds':>9}", "info")
+    for filename, pid, seconds in results:
+        print(f"{filename:<46}{pid:>8}{seconds:>9.2f}")
+    for filename in cached:
+        print(f"{filename:<46}{'-':>8}{'cached':>9}")
+    total = sum(seconds for _, _, seconds in results)
+    _log(f"Rendered {len(results)} figures to {OUTPUT_PLOTS}: {total:.2f}s of rendering "
+         f"in {wall:.2f}s wall time", "ok")
+    print("")
+
+
 # -----------------------
 # Core pipeline pieces
 # -----------------------
@@ -82,140 +218,35 @@ def _timeit(func):
 def load_data(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"Processed file not found at: {path}")
-    df = pd.read_csv(path)
-    # Basic canonicalization: lower-case column names and strip
-    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
-    return df
+    # Canonical column names, stripped departments, lower-case gender;
+    # the dtypes of a plain read_csv, so the reports do not change with the compact load dtypes
+    return prepare_frame(widen_dtypes(load_unified(path)))
 
 
 @_timeit
-def exploratory_data_analysis(df: pd.DataFrame) -> None:
+def exploratory_data_analysis(data: ChartData) -> None:
     """Saves a compact EDA summary to outputs/reports/eda_summary.txt"""
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_cols = [c for c in df.columns if c not in numeric_cols]
-
-    lines = []
-    lines.append("Exploratory Data Analysis (EDA) Summary")
-    lines.append("=" * 60)
-    lines.append(f"Rows: {len(df)}, Columns: {len(df.columns)}")
-    lines.append(f"Numeric columns: {numeric_cols}")
-    lines.append(f"Categorical columns: {categorical_cols}")
-    lines.append("")
-
-    # Numeric summaries
-    if numeric_cols:
-        lines.append("Numeric summaries (mean, median, std, min, max, non-null):")
-        for col in numeric_cols:
-            s = df[col].dropna()
-            if s.empty:
-                lines.append(f"{col}: no valid numeric values")
-                continue
-            lines.append(
-                f"{col}: mean={s.mean():.2f}, median={s.median():.2f}, std={s.std():.2f}, "
-                f"min={s.min():.2f}, max={s.max():.2f}, count={s.count()}"
-            )
-        lines.append("")
-
-    # Categorical summaries (top values)
-    if categorical_cols:
-        lines.append("Categorical summaries (top 3 values):")
-        for col in categorical_cols:
-            top = df[col].value_counts(dropna=True).head(3)
-            top_str = "; ".join([f"{idx}({val})" for idx, val in top.items()])
-            lines.append(f"{col}: {top_str}")
-        lines.append("")
-
-    # Missing values overview
-    lines.append("Missing values (per column):")
-    mv = df.isna().sum()
-    for col, cnt in mv.items():
-        if cnt > 0:
-            lines.append(f"{col}: {cnt}")
+    # One chunked pass over the frame, shared with statistical_summary()
+    summary = data.agg(summarize_frame)
 
     # Write to file
     out = OUTPUT_REPORTS / "eda_summary.txt"
     with out.open("w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        f.write(summary.eda_report())
 
     _log(f"EDA summary written: {out}", "ok")
 
 
 @_timeit
-def basic_visualizations(df: pd.DataFrame, show: bool = True) -> None:
+def basic_visualizations(data: ChartData, show: bool = True) -> None:
     """Generate and save basic visualizations. Optionally plt.show() them."""
-    # Salary distribution histogram
-    if "salary" in df.columns:
-        plt.figure(figsize=(8, 5))
-        sns.histplot(df["salary"].dropna(), bins=30, kde=True)
-        plt.title("Salary Distribution")
-        plt.xlabel("Salary")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "salary_distribution.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
-
-        # Boxplot
-        plt.figure(figsize=(6, 4))
-        sns.boxplot(x=df["salary"].dropna())
-        plt.title("Salary Boxplot")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "salary_boxplot.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
-
-    # Salary vs Bonus scatter
-    if {"salary", "bonus_percent"}.issubset(df.columns):
-        plt.figure(figsize=(7, 5))
-        sns.scatterplot(x="bonus_percent", y="salary", data=df, alpha=0.6)
-        plt.title("Salary vs Bonus Percent")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "salary_vs_bonus.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
-
-    # Gender distribution bar
-    if "gender" in df.columns:
-        plt.figure(figsize=(6, 4))
-        vc = df["gender"].value_counts(dropna=True)
-        sns.barplot(x=vc.index, y=vc.values)
-        plt.title("Gender Distribution")
-        plt.ylabel("Count")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "gender_distribution.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
+    _render_figures(BASIC_FIGURES, data, show)
 
 
 @_timeit
-def statistical_summary(df: pd.DataFrame) -> pd.DataFrame:
+def statistical_summary(data: ChartData) -> pd.DataFrame:
     """Create a CSV summary for numeric columns (mean, median, std, skew, kurt)."""
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    rows = []
-    for col in numeric_cols:
-        s = df[col].dropna()
-        if s.empty:
-            continue
-        rows.append({
-            "column": col,
-            "mean": s.mean(),
-            "median": s.median(),
-            "std": s.std(),
-            "skew": s.skew(),
-            "kurtosis": s.kurt()
-        })
-    summary_df = pd.DataFrame(rows)
+    summary_df = data.agg(summarize_frame).statistical_summary()
     out = OUTPUT_REPORTS / "statistical_summary.csv"
     summary_df.to_csv(out, index=False)
     _log(f"Statistical summary saved: {out}", "ok")
@@ -223,42 +254,20 @@ def statistical_summary(df: pd.DataFrame) -> pd.DataFrame:
 
 
 @_timeit
-def advanced_statistical_analysis(df: pd.DataFrame, show: bool = True) -> None:
+def advanced_statistical_analysis(data: ChartData, show: bool = True, plots: bool = True) -> None:
     """
     Correlation matrix, ANOVA across departments (salary),
     violin plot per department, and a correlation pair check.
     """
-    # Correlation matrix
-    numeric_df = df.select_dtypes(include=[np.number])
-    if not numeric_df.empty:
-        corr = numeric_df.corr()
+    df = data.frame
+    # Correlation matrix (shared with the heatmap)
+    if data.numeric_columns():
         _log("Correlation matrix (numeric columns):", "info")
-        print(corr.to_string())
-        plt.figure(figsize=(8, 6))
-        sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".3f")
-        plt.title("Correlation Heatmap (numeric features)")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "correlation_heatmap.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
-
-    # Violin plot salary by department
-    if {"department", "salary"}.issubset(df.columns):
-        plt.figure(figsize=(10, 6))
-        sns.violinplot(x="department", y="salary", data=df, inner="quartile", palette="cool")
-        plt.title("Salary Distribution by Department (violin)")
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "salary_violin_by_department.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
+        print(data.agg(numeric_correlation).to_string())
+    if plots:
+        _render_figures(ADVANCED_FIGURES, data, show)
 
+    if {"department", "salary"}.issubset(df.columns):
         # ANOVA: salary across departments
         groups = [g["salary"].dropna().values for _, g in df.groupby("department") if not g["salary"].dropna().empty]
         if len(groups) > 1:
@@ -316,8 +325,9 @@ def hypothesis_tests(df: pd.DataFrame) -> None:
 
 
 @_timeit
-def team_analysis(df: pd.DataFrame, show: bool = True) -> None:
+def team_analysis(data: ChartData, show: bool = True, plots: bool = True) -> None:
     """Produce team-level summaries and plots automatically (no input prompts)."""
+    df = data.frame
     lines = []
     if "department" not in df.columns:
         _log("Team analysis skipped: 'department' column not found.", "warn")
@@ -330,40 +340,19 @@ def team_analysis(df: pd.DataFrame, show: bool = True) -> None:
 
     # avg salary by department
     if "salary" in df.columns:
-        avg_salary = df.groupby("department")["salary"].mean().sort_values(ascending=False)
+        avg_salary = data.agg(avg_salary_by_department)
         lines.append("\nAverage salary by department (top 10):")
         lines.append(avg_salary.head(10).to_string())
 
-        # save bar plot
-        plt.figure(figsize=(10, 6))
-        avg_salary.plot(kind="bar", color="skyblue")
-        plt.title("Average Salary by Department")
-        plt.ylabel("Average Salary")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "team_avg_salary_by_department.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
-
     # gender pivot
     if "gender" in df.columns:
-        pivot = pd.crosstab(df["department"], df["gender"])
+        pivot = data.agg(gender_by_department)
         lines.append("\nGender counts by department (sample):")
         lines.append(pivot.head(10).to_string())
 
-        # save stacked bar
-        plt.figure(figsize=(10, 6))
-        pivot.plot(kind="bar", stacked=True)
-        plt.title("Gender Distribution by Department")
-        plt.tight_layout()
-        p = OUTPUT_PLOTS / "team_gender_distribution_by_department.png"
-        plt.savefig(p)
-        if show:
-            plt.show()
-        plt.close()
-        _log(f"Saved: {p}", "ok")
+    # bar plot and stacked bar
+    if plots:
+        _render_figures(TEAM_FIGURES, data, show)
 
     # write team report
     out = OUTPUT_REPORTS / "team_analysis_report.txt"
@@ -375,31 +364,51 @@ def team_analysis(df: pd.DataFrame, show: bool = True) -> None:
 # -----------------------
 # Main
 # -----------------------
-def main(show_plots: bool = True):
+def main(show_plots: bool = True, batch: bool = False, workers: int = None, refresh_plots: bool = False,
+         large_data: str = "auto"):
+    global _binned_from
     total_start = time.perf_counter()
     _log("Employee Data Analysis pipeline starting...", "info")
+    _setup_outputs()
+    if batch or not show_plots:
+        plt.switch_backend("Agg")
+    PLOT_CACHE.enabled = not refresh_plots
+    _binned_from = LARGE_DATA_MODES[large_data]
 
-    # Load
+    # Load; figures and reports share the aggregations computed from data
     df = load_data(DATA_PATH)
+    data = ChartData(df)
 
-    # Clean a few expected columns: ensure lower-case gender/department
-    if "gender" in df.columns:
-        df["gender"] = df["gender"].astype(str).str.strip().str.lower()
-    if "department" in df.columns:
-        df["department"] = df["department"].astype(str).str.strip()
+    # Batch mode: figures render in worker processes while the steps below run
+    pool = start_batch_render(data, workers) if batch else None
 
     # Steps
-    exploratory_data_analysis(df)
-    basic_visualizations(df, show=show_plots)
-    statistical_summary(df)
-    advanced_statistical_analysis(df, show=show_plots)
+    exploratory_data_analysis(data)
+    if not batch:
+        basic_visualizations(data, show=show_plots)
+    statistical_summary(data)
+    advanced_statistical_analysis(data, show=show_plots, plots=not batch)
     hypothesis_tests(df)
-    team_analysis(df, show=show_plots)
+    team_analysis(data, show=show_plots, plots=not batch)
+    if pool:
+        finish_batch_render(*pool, wall_start=total_start)
+    _log(PLOT_CACHE.summary(), "info")
 
     total_end = time.perf_counter()
     _log(f"Pipeline completed in {total_end - total_start:.2f} seconds", "ok")
 
 
 if __name__ == "__main__":
-    # show_plots=True will both save and display each plot (good for PyCharm)
-    main(show_plots=True)
+    parser = argparse.ArgumentParser(description="Employee data analysis pipeline.")
+    parser.add_argument("--batch", action="store_true",
+                        help="render figures headless (Agg) in a process pool; no windows are shown")
+    parser.add_argument("--workers", type=int, default=None, help="--batch: render processes (default: CPU count)")
+    parser.add_argument("--no-show", action="store_true", help="render serially without showing the plots")
+    parser.add_argument("--refresh-plots", action="store_true", help="redraw every figure, ignoring the plot cache")
+    parser.add_argument("--large-data", choices=list(LARGE_DATA_MODES), default="auto",
+                        help=f"draw distribution/scatter/pair plots from bins: auto (from "
+                             f"{binned.LARGE_DATA_ROWS:,} rows), always or never")
+    args = parser.parse_args()
+    # By default every plot is saved and displayed (good for PyCharm)
+    main(show_plots=not (args.no_show or args.batch), batch=args.batch, workers=args.workers,
+         refresh_plots=args.refresh_plots, large_data=args.large_data)
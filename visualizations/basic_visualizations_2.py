@@ -1,25 +1,48 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
 from tabulate import tabulate
+import argparse
 import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+from src.lazy_imports import lazy_import  # noqa: E402
+from src.etl.column_store import load_unified  # noqa: E402
+from src.etl.schema import widen_dtypes  # noqa: E402
+from src.viz.charts import numeric_correlation, select  # noqa: E402
+from src.viz.plot_cache import PlotCache  # noqa: E402
+from src.viz.registry import ChartData, prepare_frame, render_charts  # noqa: E402
+
+# Imported on first use, after the arguments are parsed
+plt = lazy_import("matplotlib.pyplot")
+stats = lazy_import("scipy.stats")
+
+parser = argparse.ArgumentParser(description="EDA, statistics and basic plots of the unified employees data.")
+parser.add_argument("--refresh-plots", action="store_true", help="redraw every figure, ignoring the plot cache")
+args = parser.parse_args()
 
 # ==============================================================
 # BASIC CONFIG
 # ==============================================================
 plt.style.use('seaborn-v0_8-whitegrid')
 pd.set_option('display.max_columns', None)
+# Figures whose input columns and spec are unchanged are not redrawn
+plot_cache = PlotCache(enabled=not args.refresh_plots)
 
-DATA_PATH = r"D:\EmployeeDataAnalysis_Insights_Trends_Visualization\data\processed\employees_unified.csv"
+DATA_PATH = ROOT_DIR / "data" / "processed" / "employees_unified.csv"
 PLOTS_DIR = "outputs/plots"
 REPORTS_DIR = "outputs/reports"
 os.makedirs(PLOTS_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
 print(f"\n📁 Loading data from: {DATA_PATH}")
-data = pd.read_csv(DATA_PATH)
+# The dtypes of a plain read_csv, so the reports do not change with the compact load dtypes
+data = widen_dtypes(load_unified(DATA_PATH))
 print(f"✅ Data loaded successfully: {data.shape[0]} rows × {data.shape[1]} columns\n")
+# Charts come from the registry (src/viz/charts.py) and share its aggregations
+chart_data = ChartData(prepare_frame(data))
 
 
 # ==============================================================
@@ -48,28 +71,8 @@ print(tabulate(data.describe().T.head(5), headers="keys", tablefmt="fancy_grid")
 # ==============================================================
 print("📊 Generating Basic Visualizations...")
 
-# 1. Gender Distribution
-plt.figure(figsize=(6, 4))
-sns.countplot(x='gender', data=data, hue='gender', palette='Set2', legend=False)
-plt.title("Gender Distribution")
-plt.savefig(f"{PLOTS_DIR}/gender_distribution.png")
-plt.show()
-
-# 2. Salary Distribution
-plt.figure(figsize=(6, 4))
-sns.histplot(data['salary'], bins=30, kde=True, color='blue')
-plt.title("Salary Distribution")
-plt.savefig(f"{PLOTS_DIR}/salary_distribution.png")
-plt.show()
-
-# 3. Department-wise Average Salary
-plt.figure(figsize=(8, 4))
-sns.barplot(x='department', y='salary', data=data, hue='department',
-            errorbar=None, palette='coolwarm', legend=False)
-plt.title("Average Salary by Department")
-plt.xticks(rotation=30)
-plt.savefig(f"{PLOTS_DIR}/avg_salary_by_department.png")
-plt.show()
+render_charts(select("gender_distribution.png", "salary_distribution.png", "avg_salary_by_department.png"),
+              chart_data, PLOTS_DIR, plot_cache, show=True)
 
 print("✅ Basic Visualizations Generated Successfully.\n")
 
@@ -92,16 +95,12 @@ print("\n✅ Statistical summary saved successfully.\n")
 # ==============================================================
 print("📊 Running Advanced Statistical Analysis...")
 
-corr_matrix = data.corr(numeric_only=True)
+corr_matrix = chart_data.agg(numeric_correlation)
 print("Correlation Matrix:\n")
 print(tabulate(corr_matrix, headers="keys", tablefmt="grid", floatfmt=".3f"))
 
 # Save correlation heatmap
-plt.figure(figsize=(8, 6))
-sns.heatmap(corr_matrix, annot=True, cmap="coolwarm", fmt=".2f")
-plt.title("Correlation Heatmap")
-plt.savefig(f"{PLOTS_DIR}/correlation_heatmap.png")
-plt.show()
+render_charts(select("correlation_heatmap.png"), chart_data, PLOTS_DIR, plot_cache, show=True)
 
 # ANOVA: Salary across departments
 anova_result = stats.f_oneway(*[group["salary"].values for name, group in data.groupby("department")])
@@ -156,4 +155,5 @@ print(tabulate(team_summary.head(10), headers="keys", tablefmt="fancy_grid", flo
 team_summary.to_csv(f"{REPORTS_DIR}/team_analysis.csv", index=False)
 print("\n✅ Team Analysis Completed.\n")
 
+print(f"ℹ️ {plot_cache.summary()}")
 print("🏁 All reports and visualizations generated successfully.")